@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Adaptive Quiz Algorithm Testing for Squiz Platform
+Tests the IRT calibration and item selection, without a running server:
+1. 2PL calibration recovers the difficulties of simulated items
+2. Calibrated parameters stay within their configured bounds, even for items everyone gets right or wrong
+3. The most informative item at the current ability is selected first
+4. Administered and unavailable items are never selected again
+5. Selection returns None once no item is left
+6. The posterior summary of the prior is centered with unit spread
+"""
+
+import os
+import sys
+
+import numpy as np
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "squiz_test")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import server  # noqa: E402
+
+def simulated_responses(difficulties, discriminations, respondents=400, seed=7):
+    rng = np.random.default_rng(seed)
+    theta = rng.standard_normal(respondents)
+    p = 1 / (1 + np.exp(-np.array(discriminations) * (theta[:, None] - np.array(difficulties))))
+    return rng.random(p.shape) < p
+
+def cat_tables(discriminations, difficulties, question_ids):
+    return server.build_cat_tables([
+        {"question_id": question_id, "discrimination": a, "difficulty": b}
+        for question_id, a, b in zip(question_ids, discriminations, difficulties)
+    ])
+
+class AdaptiveQuizTester:
+    def __init__(self):
+        self.tests_run = 0
+        self.tests_passed = 0
+
+    def log_test(self, name, success, details=""):
+        self.tests_run += 1
+        if success:
+            self.tests_passed += 1
+        print(f"{'✅ PASS' if success else '❌ FAIL'}: {name}")
+        if details:
+            print(f"   Details: {details}")
+
+    def test_calibration(self):
+        # Joint estimation needs a realistic number of items to pin down each person's ability
+        difficulties = np.linspace(-2.0, 2.0, 20)
+        a, b = server.calibrate_2pl(simulated_responses(difficulties, [1.2] * 20, respondents=1000))
+        correlation = float(np.corrcoef(difficulties, b)[0, 1])
+        self.log_test(
+            "Calibration recovers the item difficulties",
+            correlation > 0.98 and abs(b[0] + 2.0) < 0.5 and abs(b[-1] - 2.0) < 0.5,
+            f"Correlation: {correlation:.3f}, easiest: {b[0]:.2f}, hardest: {b[-1]:.2f}"
+        )
+        in_bounds = (
+            np.all(a >= server.IRT_MIN_DISCRIMINATION) and np.all(a <= server.IRT_MAX_DISCRIMINATION)
+            and np.all(np.abs(b) <= server.IRT_THETA_GRID[-1])
+        )
+        self.log_test(
+            "Calibrated parameters stay in bounds and near the truth",
+            bool(in_bounds) and 0.8 < float(a.mean()) < 1.8,
+            f"Mean discrimination: {a.mean():.2f}"
+        )
+
+    def test_calibration_extremes(self):
+        # Items everyone gets right or wrong must not diverge
+        responses = simulated_responses([0.0, 0.5, -0.5], [1.0] * 3)
+        responses = np.column_stack([responses, np.ones(len(responses), bool), np.zeros(len(responses), bool)])
+        a, b = server.calibrate_2pl(responses)
+        self.log_test(
+            "Calibration handles all-correct and all-wrong items",
+            bool(np.all(np.isfinite(a)) and np.all(np.isfinite(b))) and b[3] < b[0] < b[4],
+            f"Difficulties: {np.round(b, 2).tolist()}"
+        )
+
+    def test_selection(self):
+        ids = ["easy", "medium", "hard"]
+        tables = cat_tables([1.5, 1.5, 1.5], [-2.0, 0.0, 2.0], ids)
+        available = {question_id: None for question_id in ids}
+        first = server.select_next_item(tables, 0.0, [], available)
+        self.log_test("Most informative item is selected", first == "medium", f"Selected: {first}")
+        high = server.select_next_item(tables, 2.0, [], available)
+        self.log_test("Selection follows the ability estimate", high == "hard", f"Selected: {high}")
+        after = server.select_next_item(tables, 0.0, ["medium"], {"easy": None, "medium": None})
+        self.log_test("Administered and unavailable items are skipped", after == "easy", f"Selected: {after}")
+        done = server.select_next_item(tables, 0.0, ["medium", "easy"], {"easy": None, "medium": None})
+        self.log_test("Selection returns None when no item is left", done is None, f"Selected: {done}")
+
+    def test_posterior_summary(self):
+        ability, standard_error = server.summarize_posterior(-0.5 * server.IRT_THETA_GRID ** 2)
+        self.log_test(
+            "Prior summary is centered with unit spread",
+            abs(ability) < 1e-6 and abs(standard_error - 1.0) < 0.01,
+            f"Ability: {ability:.4f}, SE: {standard_error:.4f}"
+        )
+        tables = cat_tables([1.5], [0.0], ["item"])
+        correct = -0.5 * server.IRT_THETA_GRID ** 2 + tables["log_p"][:, 0]
+        ability_after, standard_error_after = server.summarize_posterior(correct)
+        self.log_test(
+            "A correct answer raises the estimate and narrows it",
+            ability_after > 0 and standard_error_after < standard_error,
+            f"Ability: {ability_after:.3f}, SE: {standard_error_after:.3f}"
+        )
+
+    def run_all_tests(self):
+        print("🚀 Starting Adaptive Quiz Algorithm Tests")
+        self.test_calibration()
+        self.test_calibration_extremes()
+        self.test_selection()
+        self.test_posterior_summary()
+        print(f"\n📊 Tests passed: {self.tests_passed}/{self.tests_run}")
+        return self.tests_passed == self.tests_run
+
+if __name__ == "__main__":
+    tester = AdaptiveQuizTester()
+    sys.exit(0 if tester.run_all_tests() else 1)
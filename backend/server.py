@@ -1,14 +1,27 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from typing import Dict, List, Optional
 import uuid
+import time
+import re
+import json
+import gzip
+import hashlib
+import asyncio
+import bisect
+import zlib
+import numpy as np
 from datetime import datetime, timedelta
 import jwt
 import bcrypt
@@ -192,7 +205,8 @@ class Quiz(BaseModel):
     category: str
     subject: str  # Main subject (e.g., "Mathematics", "Science")
     subcategory: str = "General"  # Subcategory (e.g., "Triangle", "Algebra")
-    questions: List[QuizQuestion]
+    questions: List[QuizQuestion]  # Resolved from the question bank when question_ids is set
+    question_ids: List[str] = []  # Question bank references, in quiz order
     created_by: str  # User ID (admin or regular user)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -203,6 +217,7 @@ class Quiz(BaseModel):
     allowed_users: List[str] = []  # List of user IDs who can access public quiz
     total_attempts: int = 0  # Track how many times quiz was taken
     average_score: float = 0.0  # Average score across all attempts
+    view_count: int = 0  # Flushed periodically from the per-worker view buffers
     
     # Ownership fields
     quiz_owner_type: str = "admin"  # "admin" or "user"
@@ -214,6 +229,11 @@ class Quiz(BaseModel):
     shuffle_questions: bool = False  # Randomize question order
     shuffle_options: bool = False  # Randomize option order
     
+    # Adaptive testing (questions picked per user from calibrated IRT parameters)
+    is_adaptive: bool = False
+    adaptive_max_questions: Optional[int] = None  # Defaults to every question in the quiz
+    adaptive_target_se: float = 0.3  # Stop once the ability estimate is this precise
+    
     # Preview and publishing
     is_draft: bool = True  # Quiz starts as draft until published
     preview_token: Optional[str] = None  # Token for preview access
@@ -231,6 +251,9 @@ class QuizCreate(BaseModel):
     time_limit_minutes: Optional[int] = None
     shuffle_questions: bool = False
     shuffle_options: bool = False
+    is_adaptive: bool = False
+    adaptive_max_questions: Optional[int] = None
+    adaptive_target_se: float = 0.3
 
 class QuizUpdate(BaseModel):
     title: Optional[str] = None
@@ -247,6 +270,9 @@ class QuizUpdate(BaseModel):
     shuffle_questions: Optional[bool] = None
     shuffle_options: Optional[bool] = None
     is_draft: Optional[bool] = None
+    is_adaptive: Optional[bool] = None
+    adaptive_max_questions: Optional[int] = None
+    adaptive_target_se: Optional[float] = None
 
 class QuizValidationError(BaseModel):
     field: str
@@ -285,6 +311,7 @@ class QuizAttempt(BaseModel):
     quiz_id: str
     user_id: str
     answers: List[str]
+    question_time_seconds: List[Optional[int]] = []  # Time spent per question, when reported
     correct_answers: List[str] = []  # Store correct answers for review
     question_results: List[dict] = []  # Detailed question results
     score: int  # Number of questions correct
@@ -308,6 +335,11 @@ class UserQuizAccess(BaseModel):
 class QuizAttemptCreate(BaseModel):
     quiz_id: str
     answers: List[str]
+    question_time_seconds: List[Optional[int]] = []  # Optional time spent per question
+
+class PracticeAnswerRequest(BaseModel):
+    question_id: str
+    answer: str
 
 # Real-time Quiz Session Models
 class QuizSessionStatus(str, Enum):
@@ -316,6 +348,7 @@ class QuizSessionStatus(str, Enum):
     PAUSED = "paused"
     COMPLETED = "completed"
     EXPIRED = "expired"
+    ABANDONED = "abandoned"
 
 class QuizSession(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -328,6 +361,7 @@ class QuizSession(BaseModel):
     time_remaining_seconds: Optional[int] = None  # Current remaining time
     current_question_index: int = 0  # Track current question
     answers: List[str] = []  # Current answers (partial submission)
+    question_time_seconds: List[Optional[int]] = []  # Time spent per question so far
     is_auto_submit: bool = False  # Whether session will auto-submit
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -340,6 +374,7 @@ class QuizSessionCreate(BaseModel):
 class QuizSessionUpdate(BaseModel):
     current_question_index: Optional[int] = None
     answers: Optional[List[str]] = None
+    question_time_seconds: Optional[List[Optional[int]]] = None
     status: Optional[QuizSessionStatus] = None
 
 class QuizSessionResponse(BaseModel):
@@ -376,12 +411,12 @@ class Question(BaseModel):
     tags: List[str] = []
     upvotes: int = 0
     downvotes: int = 0
-    upvoted_by: List[str] = []  # List of user IDs who upvoted
-    downvoted_by: List[str] = []  # List of user IDs who downvoted
     status: QuestionStatus = QuestionStatus.OPEN
     answer_count: int = 0
     has_accepted_answer: bool = False
     is_pinned: bool = False  # Admin can pin important questions
+    hot_score: float = 0.0  # Feed ranking, see question_hot_score
+    view_count: int = 0  # Flushed periodically from the per-worker view buffers
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -411,8 +446,7 @@ class Answer(BaseModel):
     user_id: str
     upvotes: int = 0
     downvotes: int = 0
-    upvoted_by: List[str] = []
-    downvoted_by: List[str] = []
+    reaction_counts: Dict[str, int] = {}  # Emoji -> number of reactions
     is_accepted: bool = False  # Marked as best answer by question author
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -433,10 +467,13 @@ class Discussion(BaseModel):
     message: str
     image: Optional[str] = None  # Base64 encoded image
     reply_to_id: Optional[str] = None  # For threaded conversations
+    thread_id: Optional[str] = None  # Top-level message this reply belongs to
+    path: str = ""  # Materialized path, sorts a thread depth-first in posting order
+    depth: int = 0
+    reply_count: int = 0  # Direct replies
+    thread_reply_count: int = 0  # Every reply under a top-level message
     upvotes: int = 0
     downvotes: int = 0
-    upvoted_by: List[str] = []
-    downvoted_by: List[str] = []
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -458,6 +495,20 @@ class VoteType(str, Enum):
 class VoteRequest(BaseModel):
     vote_type: VoteType
 
+class VoteTargetType(str, Enum):
+    QUESTION = "question"
+    ANSWER = "answer"
+    DISCUSSION = "discussion"
+
+class Vote(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    target_type: VoteTargetType
+    target_id: str
+    user_id: str
+    vote_type: VoteType  # upvote or downvote; removed votes are deleted
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
 # Emoji Reaction Models
 class EmojiType(str, Enum):
     THUMBS_UP = "👍"
@@ -753,7 +804,18 @@ def decode_access_token(token: str) -> dict:
 # Dependencies
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Get current user from JWT token"""
-    token = credentials.credentials
+    return await get_user_from_token(credentials.credentials)
+
+async def get_stream_user(request: Request, token: Optional[str] = None):
+    """Get current user for EventSource requests, which cannot send headers"""
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return await get_user_from_token(token)
+
+async def get_user_from_token(token: str) -> "User":
     payload = decode_access_token(token)
     
     user_id = payload.get("sub")
@@ -797,6 +859,8 @@ async def register(user_data: UserCreate):
     user_dict["password"] = hashed_password
     
     await db.users.insert_one(user_dict)
+    index_search_document(SearchDocumentType.USER, user_dict)
+    track_user_autocomplete(user.id, user.name, user.role)
     
     return UserResponse(**user.dict())
 
@@ -897,7 +961,13 @@ async def create_quiz(quiz_data: QuizCreate, admin_user: User = Depends(get_admi
     quiz.quiz_owner_type = "admin"
     quiz.quiz_owner_id = admin_user.id
     
-    await db.quizzes.insert_one(quiz.dict())
+    # Store questions in the shared bank and reference them by id
+    quiz.questions = await import_questions_to_bank(quiz.questions, admin_user.id, quiz.subject)
+    quiz.question_ids = [question.id for question in quiz.questions]
+    
+    await db.quizzes.insert_one(bank_backed_quiz_doc(quiz))
+    index_search_document(SearchDocumentType.QUIZ, quiz.dict())
+    track_quiz_autocomplete(None, quiz.dict())
     
     # Note: We'll notify followers when the quiz is published, not when created as draft
     return quiz
@@ -905,7 +975,7 @@ async def create_quiz(quiz_data: QuizCreate, admin_user: User = Depends(get_admi
 @api_router.post("/admin/quiz/{quiz_id}/publish")
 async def publish_quiz(quiz_id: str, admin_user: User = Depends(get_admin_user)):
     """Publish quiz (make it available to users)"""
-    quiz = await db.quizzes.find_one({"id": quiz_id})
+    quiz = await find_quiz({"id": quiz_id})
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
     
@@ -929,9 +999,12 @@ async def publish_quiz(quiz_id: str, admin_user: User = Depends(get_admin_user))
             "updated_at": datetime.utcnow()
         }}
     )
+    invalidate_practice_plan(quiz_id)
+    await refresh_search_document(SearchDocumentType.QUIZ, quiz_id)
     
     # Notify followers when admin publishes a new quiz
     await notify_followers_of_new_quiz(admin_user.id, quiz["title"], quiz_id)
+    await record_activity(quiz_published_activity({**quiz, "created_at": datetime.utcnow()}, admin_user.name))
     
     return {"message": "Quiz published successfully"}
 
@@ -964,7 +1037,7 @@ async def generate_preview_token(quiz_id: str, admin_user: User = Depends(get_ad
 @api_router.get("/admin/quiz/{quiz_id}/validate")
 async def validate_quiz(quiz_id: str, admin_user: User = Depends(get_admin_user)):
     """Validate quiz and return any errors"""
-    quiz = await db.quizzes.find_one({"id": quiz_id})
+    quiz = await find_quiz({"id": quiz_id})
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
     
@@ -1005,22 +1078,36 @@ async def update_quiz(quiz_id: str, quiz_data: QuizUpdate, admin_user: User = De
     
     # Recalculate total questions if questions are updated
     if "questions" in update_data:
-        update_data["total_questions"] = len(update_data["questions"])
+        bank_questions = await import_questions_to_bank(
+            quiz_data.questions, admin_user.id, update_data.get("subject", existing_quiz.get("subject")), quiz_id
+        )
+        update_data["questions"] = []
+        update_data["question_ids"] = [question.id for question in bank_questions]
+        update_data["total_questions"] = len(bank_questions)
+        update_data["total_points"] = sum(question.points for question in bank_questions)
         
         # If questions are updated, reset statistics
         update_data["total_attempts"] = 0
         update_data["average_score"] = 0.0
+        update_data["questions_updated_at"] = update_data["updated_at"]
+        await db.question_stats.delete_many({"quiz_id": quiz_id})
+        await db.item_parameters.delete_many({"quiz_id": quiz_id, "question_id": {"$nin": update_data["question_ids"]}})
+        item_analysis_cache.pop(quiz_id, None)
+        cat_table_cache.pop(quiz_id, None)
     
     await db.quizzes.update_one({"id": quiz_id}, {"$set": update_data})
+    invalidate_practice_plan(quiz_id)
+    await refresh_search_document(SearchDocumentType.QUIZ, quiz_id)
+    track_quiz_autocomplete(existing_quiz, {**existing_quiz, **update_data})
     
     # Return updated quiz
-    updated_quiz = await db.quizzes.find_one({"id": quiz_id})
+    updated_quiz = await find_quiz({"id": quiz_id})
     return Quiz(**updated_quiz)
 
 @api_router.get("/admin/quiz/{quiz_id}/edit-details")
 async def get_quiz_edit_details(quiz_id: str, admin_user: User = Depends(get_admin_user)):
     """Get detailed quiz information for editing including all questions"""
-    quiz = await db.quizzes.find_one({"id": quiz_id})
+    quiz = await find_quiz({"id": quiz_id})
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
     
@@ -1049,6 +1136,8 @@ async def set_quiz_access(quiz_id: str, access_data: UserQuizAccess, admin_user:
         {"id": quiz_id}, 
         {"$set": {"allowed_users": access_data.user_ids, "updated_at": datetime.utcnow()}}
     )
+    invalidate_practice_plan(quiz_id)
+    await refresh_search_document(SearchDocumentType.QUIZ, quiz_id)
     
     return {"message": "Quiz access updated successfully"}
 
@@ -1085,10 +1174,276 @@ async def get_quiz_leaderboard(quiz_id: str, admin_user: User = Depends(get_admi
     
     return leaderboard
 
+@api_router.get("/admin/quiz/{quiz_id}/question-stats")
+async def get_quiz_question_stats(quiz_id: str, admin_user: User = Depends(get_admin_user)):
+    """Get per-question statistics for a quiz (admin only)"""
+    quiz = await find_quiz({"id": quiz_id}, {"_id": 0, "title": 1, "questions": 1})
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    
+    stats_docs = await db.question_stats.find({"quiz_id": quiz_id}, {"_id": 0}).to_list(1000)
+    stats_by_question = {doc["question_id"]: doc for doc in stats_docs}
+    
+    question_stats = []
+    for i, question_doc in enumerate(quiz.get("questions", [])):
+        question = QuizQuestion(**question_doc)
+        stats = stats_by_question.get(question.id, {})
+        attempts = stats.get("attempts", 0)
+        time_samples = stats.get("time_samples", 0)
+        option_counts = stats.get("option_counts", {})
+        
+        entry = {
+            "question_id": question.id,
+            "question_number": i + 1,
+            "question_text": question.question_text,
+            "question_type": question.question_type,
+            "points_possible": question.points,
+            "attempts": attempts,
+            "correct_count": stats.get("correct_count", 0),
+            "skipped_count": stats.get("skipped_count", 0),
+            "accuracy": round(stats.get("correct_count", 0) / attempts * 100, 1) if attempts else 0.0,
+            "average_points": round(stats.get("points_sum", 0.0) / attempts, 2) if attempts else 0.0,
+            "average_time_seconds": round(stats.get("time_spent_sum", 0) / time_samples, 1) if time_samples else None
+        }
+        
+        if question.question_type == QuestionType.MULTIPLE_CHOICE:
+            entry["options"] = [
+                {
+                    "text": opt.text,
+                    "is_correct": opt.is_correct,
+                    "selected_count": option_counts.get(str(j), 0),
+                    "selected_rate": round(option_counts.get(str(j), 0) / attempts * 100, 1) if attempts else 0.0
+                }
+                for j, opt in enumerate(question.options)
+            ]
+        
+        question_stats.append(entry)
+    
+    return {
+        "quiz_id": quiz_id,
+        "quiz_title": quiz["title"],
+        "questions": question_stats,
+        "hardest_questions": [
+            entry["question_id"]
+            for entry in sorted((e for e in question_stats if e["attempts"]), key=lambda e: e["accuracy"])[:5]
+        ]
+    }
+
+# Item Analysis (classical test theory over first attempts)
+ITEM_ANALYSIS_GROUP_FRACTION = 0.27  # Upper/lower group size for distractor analysis
+item_analysis_cache = {}  # quiz_id -> accumulated score matrix for the current quiz version
+item_analysis_locks = {}
+
+def quiz_questions_fingerprint(questions: List[QuizQuestion]) -> str:
+    """Fingerprint the gradable content of a quiz so cached analysis is tied to one version"""
+    payload = [
+        [q.id, q.question_type, q.points, q.multiple_correct, [[opt.text, opt.is_correct] for opt in q.options]]
+        for q in questions
+    ]
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+def new_item_analysis_state(fingerprint: str, questions: List[QuizQuestion]) -> dict:
+    """Create an empty analysis state for one version of a quiz"""
+    return {
+        "fingerprint": fingerprint,
+        "watermark": None,  # attempted_at of the newest attempt already loaded
+        "user_ids": set(),
+        "scores": np.zeros((0, len(questions))),
+        # Chosen options per multiple choice question, encoded as a bitmask over option indexes
+        "choices": np.zeros((0, len(questions)), dtype=np.int64),
+        "choice_masks": [{} for _ in questions]  # answer string -> bitmask memo
+    }
+
+def answer_choice_mask(state: dict, question: QuizQuestion, question_index: int, user_answer: str) -> int:
+    """Encode the options chosen in an answer as a bitmask, memoized per answer string"""
+    memo = state["choice_masks"][question_index]
+    mask = memo.get(user_answer)
+    if mask is None:
+        mask = 0
+        for option_index in selected_option_indexes(question, user_answer):
+            mask |= 1 << option_index
+        memo[user_answer] = mask
+    return mask
+
+def append_attempts_to_state(state: dict, questions: List[QuizQuestion], attempts: List[dict]):
+    """Append each new user's first attempt as a row of the users x questions matrices"""
+    k = len(questions)
+    multiple_choice = [j for j, q in enumerate(questions) if q.question_type == QuestionType.MULTIPLE_CHOICE]
+    rows = []
+    choice_rows = []
+    
+    for attempt in attempts:
+        if attempt["user_id"] in state["user_ids"]:
+            continue
+        state["user_ids"].add(attempt["user_id"])
+        
+        results = attempt.get("question_results", [])[:k]
+        row = [result.get("points_earned", 0) for result in results]
+        row.extend([0] * (k - len(row)))
+        rows.append(row)
+        
+        answers = attempt.get("answers", [])
+        choice_row = [0] * k
+        for j in multiple_choice:
+            if j < len(answers) and answers[j]:
+                choice_row[j] = answer_choice_mask(state, questions[j], j, answers[j])
+        choice_rows.append(choice_row)
+    
+    if attempts:
+        state["watermark"] = attempts[-1]["attempted_at"]
+    if rows:
+        state["scores"] = np.vstack([state["scores"], np.asarray(rows, dtype=float)])
+        state["choices"] = np.vstack([state["choices"], np.asarray(choice_rows, dtype=np.int64)])
+
+def option_selection_rates(masks: np.ndarray, option_count: int) -> np.ndarray:
+    """Share of rows selecting each option, from bitmask-encoded choices"""
+    if masks.size == 0:
+        return np.zeros(option_count)
+    counts = np.bincount(masks, minlength=1 << option_count)
+    mask_bits = (np.arange(counts.size)[:, None] >> np.arange(option_count)) & 1
+    return counts @ mask_bits / masks.size
+
+def compute_item_analysis(state: dict, questions: List[QuizQuestion]) -> dict:
+    """Compute difficulty, discrimination, reliability and distractor rates in vectorized form"""
+    scores = state["scores"]
+    n, k = scores.shape
+    max_points = np.array([q.points for q in questions], dtype=float)
+    
+    totals = scores.sum(axis=1)
+    p_values = scores.mean(axis=0) / max_points if n else np.zeros(k)
+    
+    # Corrected point-biserial: correlate each item with the total of the remaining items
+    rest = totals[:, None] - scores
+    item_centered = scores - scores.mean(axis=0) if n else scores
+    rest_centered = rest - rest.mean(axis=0) if n else rest
+    numerator = (item_centered * rest_centered).sum(axis=0)
+    denominator = np.sqrt((item_centered ** 2).sum(axis=0) * (rest_centered ** 2).sum(axis=0))
+    discrimination = np.divide(numerator, denominator, out=np.zeros(k), where=denominator > 0)
+    
+    # Cronbach's alpha, overall and with each item deleted
+    alpha = None
+    alpha_if_deleted = np.full(k, np.nan)
+    if n > 1 and k > 1:
+        item_variances = scores.var(axis=0, ddof=1)
+        total_variance = totals.var(ddof=1)
+        if total_variance > 0:
+            alpha = k / (k - 1) * (1 - item_variances.sum() / total_variance)
+        if k > 2:
+            rest_variances = rest.var(axis=0, ddof=1)
+            remaining_item_variance = item_variances.sum() - item_variances
+            alpha_if_deleted = np.divide(
+                (k - 1) / (k - 2) * (rest_variances - remaining_item_variance),
+                rest_variances,
+                out=np.full(k, np.nan),
+                where=rest_variances > 0
+            )
+    
+    # Upper and lower scoring groups for distractor analysis
+    group_size = max(1, int(round(n * ITEM_ANALYSIS_GROUP_FRACTION))) if n else 0
+    order = np.argsort(totals, kind="stable")
+    lower_group, upper_group = order[:group_size], order[n - group_size:]
+    
+    items = []
+    for j, question in enumerate(questions):
+        flags = []
+        if n:
+            if p_values[j] < 0.2:
+                flags.append("very_difficult")
+            elif p_values[j] > 0.9:
+                flags.append("very_easy")
+            if discrimination[j] < 0.2:
+                flags.append("low_discrimination")
+            if alpha is not None and not np.isnan(alpha_if_deleted[j]) and alpha_if_deleted[j] > alpha:
+                flags.append("lowers_reliability")
+        
+        item = {
+            "question_id": question.id,
+            "question_number": j + 1,
+            "question_text": question.question_text,
+            "question_type": question.question_type,
+            "p_value": round(float(p_values[j]), 4),
+            "discrimination": round(float(discrimination[j]), 4),
+            "alpha_if_deleted": None if np.isnan(alpha_if_deleted[j]) else round(float(alpha_if_deleted[j]), 4),
+            "flags": flags
+        }
+        
+        if question.question_type == QuestionType.MULTIPLE_CHOICE:
+            masks = state["choices"][:, j]
+            overall = option_selection_rates(masks, len(question.options))
+            upper = option_selection_rates(masks[upper_group], len(question.options))
+            lower = option_selection_rates(masks[lower_group], len(question.options))
+            item["options"] = [
+                {
+                    "text": opt.text,
+                    "is_correct": opt.is_correct,
+                    "selection_rate": round(float(overall[o]), 4),
+                    "upper_group_rate": round(float(upper[o]), 4),
+                    "lower_group_rate": round(float(lower[o]), 4),
+                    # A working distractor attracts more low scorers than high scorers
+                    "is_functional": bool(opt.is_correct or (overall[o] >= 0.05 and lower[o] >= upper[o]))
+                }
+                for o, opt in enumerate(question.options)
+            ]
+        
+        items.append(item)
+    
+    total_sd = float(totals.std(ddof=1)) if n > 1 else 0.0
+    return {
+        "examinees": n,
+        "mean_score": round(float(totals.mean()), 4) if n else 0.0,
+        "score_sd": round(total_sd, 4),
+        "cronbach_alpha": None if alpha is None else round(float(alpha), 4),
+        "standard_error_of_measurement": None if alpha is None else round(total_sd * float(np.sqrt(max(0.0, 1 - alpha))), 4),
+        "items": items
+    }
+
+async def load_item_analysis_state(quiz_id: str, quiz: dict, questions: List[QuizQuestion]) -> dict:
+    """Bring the cached score matrix of a quiz up to date and return a snapshot of it"""
+    fingerprint = quiz_questions_fingerprint(questions)
+    
+    lock = item_analysis_locks.setdefault(quiz_id, asyncio.Lock())
+    async with lock:
+        state = item_analysis_cache.get(quiz_id)
+        if not state or state["fingerprint"] != fingerprint:
+            state = new_item_analysis_state(fingerprint, questions)
+            item_analysis_cache[quiz_id] = state
+        
+        # Only attempts newer than the last load (or the last question replacement) are read;
+        # $gte covers timestamp ties and already-seen users are skipped
+        attempt_filter = {"quiz_id": quiz_id}
+        since = state["watermark"] or quiz.get("questions_updated_at")
+        if since is not None:
+            attempt_filter["attempted_at"] = {"$gte": since}
+        new_attempts = await db.quiz_attempts.find(
+            attempt_filter,
+            {"_id": 0, "user_id": 1, "attempted_at": 1, "answers": 1, "question_results.points_earned": 1}
+        ).sort("attempted_at", 1).to_list(None)
+        
+        append_attempts_to_state(state, questions, new_attempts)
+        return {"scores": state["scores"], "choices": state["choices"]}
+
+@api_router.get("/admin/quiz/{quiz_id}/item-analysis")
+async def get_quiz_item_analysis(quiz_id: str, admin_user: User = Depends(get_admin_user)):
+    """Get item analysis for a quiz based on users' first attempts (admin only)"""
+    quiz = await find_quiz({"id": quiz_id}, {"_id": 0, "title": 1, "questions": 1, "questions_updated_at": 1})
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    
+    questions = [QuizQuestion(**q) for q in quiz.get("questions", [])]
+    snapshot = await load_item_analysis_state(quiz_id, quiz, questions)
+    analysis = compute_item_analysis(snapshot, questions)
+    
+    return {
+        "quiz_id": quiz_id,
+        "quiz_title": quiz["title"],
+        "analysis_note": "Based on each user's first attempt",
+        **analysis
+    }
+
 @api_router.get("/admin/quizzes", response_model=List[Quiz])
 async def get_all_quizzes_admin(admin_user: User = Depends(get_admin_user)):
     """Get all quizzes (admin only) - sorted by creation date with enhanced fields"""
-    quizzes = await db.quizzes.find().to_list(1000)
+    quizzes = await resolve_quiz_questions(await db.quizzes.find().to_list(1000))
     valid_quizzes = []
     for quiz in quizzes:
         # Handle old quizzes without required fields
@@ -1133,9 +1488,19 @@ async def get_all_quizzes_admin(admin_user: User = Depends(get_admin_user)):
 @api_router.delete("/admin/quiz/{quiz_id}")
 async def delete_quiz(quiz_id: str, admin_user: User = Depends(get_admin_user)):
     """Delete quiz (admin only)"""
-    result = await db.quizzes.delete_one({"id": quiz_id})
-    if result.deleted_count == 0:
+    quiz = await db.quizzes.find_one_and_delete({"id": quiz_id}, projection={"_id": 0, "subject": 1, "subcategory": 1})
+    if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
+    track_quiz_autocomplete(quiz, None)
+    invalidate_practice_plan(quiz_id)
+    item_analysis_cache.pop(quiz_id, None)
+    cat_table_cache.pop(quiz_id, None)
+    await db.question_stats.delete_many({"quiz_id": quiz_id})
+    await db.item_parameters.delete_many({"quiz_id": quiz_id})
+    search_index.remove(SearchDocumentType.QUIZ.value, quiz_id)
+    await delete_activities([quiz_id])
+    # Completions are recorded per attempt but link to the quiz
+    await delete_activities_matching({"activity_type": ActivityType.QUIZ_COMPLETED, "related_id": quiz_id})
     return {"message": "Quiz deleted successfully"}
 
 @api_router.post("/admin/category", response_model=Category)
@@ -1151,12 +1516,327 @@ async def get_categories(admin_user: User = Depends(get_admin_user)):
     categories = await db.categories.find().to_list(1000)
     return [Category(**cat) for cat in categories]
 
+# Question Bank (questions shared across quizzes)
+class BankQuestion(QuizQuestion):
+    content_hash: str = ""  # Hash of the normalized question content, used to dedupe imports
+    created_by: str = ""
+    subject: Optional[str] = None
+
+class QuestionBankImport(BaseModel):
+    questions: List[QuizQuestion]
+    subject: Optional[str] = None
+
+def normalize_question_text(text: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace"""
+    return " ".join(re.sub(r"[^\w\s]", " ", (text or "").lower()).split())
+
+def question_content_hash(question: QuizQuestion) -> str:
+    """Hash the gradable content of a question so identical items map to one bank entry"""
+    open_ended = question.open_ended_answer
+    payload = {
+        "type": question.question_type,
+        "text": normalize_question_text(question.question_text),
+        "options": sorted([normalize_question_text(opt.text), opt.is_correct] for opt in question.options),
+        "multiple_correct": question.multiple_correct,
+        "expected_answers": sorted(normalize_question_text(a) for a in open_ended.expected_answers) if open_ended else [],
+        "image_url": question.image_url,
+        "pdf_url": question.pdf_url,
+        "points": question.points
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+def quiz_question_count(quiz: dict) -> int:
+    """Number of questions in a quiz document, whether bank-backed or embedded"""
+    return len(quiz.get("question_ids") or quiz.get("questions", []))
+
+def bank_backed_quiz_doc(quiz: Quiz) -> dict:
+    """Quiz document as stored: bank references instead of embedded questions"""
+    quiz_doc = quiz.dict()
+    quiz_doc["questions"] = []
+    return quiz_doc
+
+async def resolve_quiz_questions(quizzes: List[dict]) -> List[dict]:
+    """Fill in the questions of bank-backed quiz documents with one batched bank read"""
+    question_ids = {qid for quiz in quizzes for qid in quiz.get("question_ids") or []}
+    if not question_ids:
+        return quizzes
+    
+    bank_docs = await db.question_bank.find(
+        {"id": {"$in": list(question_ids)}},
+        {"_id": 0, "content_hash": 0, "created_by": 0, "subject": 0}
+    ).to_list(None)
+    bank = {doc["id"]: doc for doc in bank_docs}
+    
+    for quiz in quizzes:
+        if quiz.get("question_ids"):
+            quiz["questions"] = [bank[qid] for qid in quiz["question_ids"] if qid in bank]
+    return quizzes
+
+async def find_quiz(filter_dict: dict, projection: Optional[dict] = None) -> Optional[dict]:
+    """Find one quiz with its questions resolved from the question bank"""
+    if projection is not None and projection.get("questions"):
+        projection = {**projection, "question_ids": 1}
+    quiz = await db.quizzes.find_one(filter_dict, projection)
+    if quiz:
+        await resolve_quiz_questions([quiz])
+    return quiz
+
+async def propagate_bank_question_change(question_id: str, points_delta: int = 0, exclude_quiz_id: Optional[str] = None):
+    """Reset statistics, caches and totals of the quizzes that reference an edited bank question
+    
+    The edit changes the question in every one of them, so their results are reset
+    the same way as when the owning quiz's questions are edited.
+    """
+    quiz_filter = {"question_ids": question_id}
+    if exclude_quiz_id:
+        quiz_filter["id"] = {"$ne": exclude_quiz_id}
+    
+    quiz_ids = await db.quizzes.distinct("id", quiz_filter)
+    if not quiz_ids:
+        return
+    update = {"$set": {
+        "total_attempts": 0,
+        "average_score": 0.0,
+        "questions_updated_at": datetime.utcnow()
+    }}
+    if points_delta:
+        update["$inc"] = {"total_points": points_delta}
+    await db.quizzes.update_many({"id": {"$in": quiz_ids}}, update)
+    
+    # Option counts are keyed by index and item parameters describe the old wording
+    await db.question_stats.delete_many({"quiz_id": {"$in": quiz_ids}, "question_id": question_id})
+    await db.item_parameters.delete_many({"quiz_id": {"$in": quiz_ids}, "question_id": question_id})
+    for quiz_id in quiz_ids:
+        invalidate_practice_plan(quiz_id)
+        item_analysis_cache.pop(quiz_id, None)
+        cat_table_cache.pop(quiz_id, None)
+
+def bank_question_unchanged(existing: dict, question: QuizQuestion) -> bool:
+    """Whether an edit leaves a bank question exactly as stored"""
+    timestamps = {"created_at", "updated_at"}
+    return QuizQuestion(**existing).dict(exclude=timestamps) == question.dict(exclude=timestamps)
+
+async def used_by_other_owners(question_id: str, user_id: str) -> bool:
+    """Whether a bank question is referenced by quizzes another admin created"""
+    quiz = await db.quizzes.find_one({"question_ids": question_id, "created_by": {"$ne": user_id}}, {"_id": 0, "id": 1})
+    return quiz is not None
+
+async def save_bank_question(existing: dict, question: QuizQuestion, content_hash: str, exclude_quiz_id: Optional[str] = None) -> QuizQuestion:
+    """Update a bank question in place so the edit reaches every quiz using it"""
+    if bank_question_unchanged(existing, question):
+        return QuizQuestion(**existing)
+    
+    update_data = question.dict(exclude={"id", "created_at"})
+    update_data["content_hash"] = content_hash
+    update_data["updated_at"] = datetime.utcnow()
+    await db.question_bank.update_one({"id": existing["id"]}, {"$set": update_data})
+    await propagate_bank_question_change(
+        existing["id"], question.points - existing.get("points", 1), exclude_quiz_id
+    )
+    return QuizQuestion(**{**existing, **update_data})
+
+async def import_questions_to_bank(
+    questions: List[QuizQuestion], user_id: str, subject: Optional[str] = None, quiz_id: Optional[str] = None
+) -> List[QuizQuestion]:
+    """Store questions in the bank, reusing identical entries, and return them in order
+    
+    Questions whose id already exists in the bank are edits of that entry, unless the entry is
+    also used by another admin's quiz: then the edit is stored as a new entry instead. Other
+    questions reuse a bank entry with the same normalized content, or are inserted as new
+    entries. A quiz never references the same bank entry twice.
+    """
+    hashes = [question_content_hash(q) for q in questions]
+    existing_by_id = {
+        doc["id"]: doc
+        for doc in await db.question_bank.find({"id": {"$in": [q.id for q in questions]}}, {"_id": 0}).to_list(None)
+    }
+    existing_by_hash = {}
+    for doc in await db.question_bank.find({"content_hash": {"$in": hashes}}, {"_id": 0}).to_list(None):
+        existing_by_hash.setdefault(doc["content_hash"], doc)
+    
+    bank_questions = []
+    new_docs = []
+    used_ids = set()
+    for question, content_hash in zip(questions, hashes):
+        existing = existing_by_id.get(question.id) if question.id not in used_ids else None
+        if existing and not bank_question_unchanged(existing, question) and await used_by_other_owners(question.id, user_id):
+            # Copy on write: other admins' quizzes keep the entry as it was
+            existing = None
+        
+        if existing:
+            bank_question = await save_bank_question(existing, question, content_hash, quiz_id)
+        elif content_hash in existing_by_hash and existing_by_hash[content_hash]["id"] not in used_ids:
+            bank_question = QuizQuestion(**existing_by_hash[content_hash])
+        else:
+            if question.id in used_ids or question.id in existing_by_id:
+                question = question.copy(update={"id": str(uuid.uuid4())})
+            bank_doc = BankQuestion(**question.dict(), content_hash=content_hash, created_by=user_id, subject=subject).dict()
+            new_docs.append(bank_doc)
+            existing_by_hash.setdefault(content_hash, bank_doc)
+            bank_question = question
+        
+        used_ids.add(bank_question.id)
+        bank_questions.append(bank_question)
+    
+    if new_docs:
+        await db.question_bank.insert_many(new_docs)
+    return bank_questions
+
+@api_router.get("/admin/question-bank")
+async def get_question_bank(
+    subject: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 50,
+    admin_user: User = Depends(get_admin_user)
+):
+    """List shared bank questions (admin only)"""
+    query = {}
+    if subject:
+        query["subject"] = subject
+    
+    questions = await db.question_bank.find(query, {"_id": 0}).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
+    return {
+        "questions": [BankQuestion(**q) for q in questions],
+        "total": await db.question_bank.count_documents(query)
+    }
+
+@api_router.post("/admin/question-bank/import")
+async def import_question_bank(import_data: QuestionBankImport, admin_user: User = Depends(get_admin_user)):
+    """Import questions into the bank, deduplicating by normalized content (admin only)"""
+    validation_errors = []
+    for i, question in enumerate(import_data.questions):
+        validation_errors.extend(validate_question(question, i))
+    if validation_errors:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "message": "Question validation failed",
+                "validation_errors": [error.dict() for error in validation_errors]
+            }
+        )
+    
+    # Imports never edit existing entries in place, so ids are always fresh
+    fresh_questions = [q.copy(update={"id": str(uuid.uuid4())}) for q in import_data.questions]
+    bank_questions = await import_questions_to_bank(fresh_questions, admin_user.id, import_data.subject)
+    duplicates = sum(1 for fresh, stored in zip(fresh_questions, bank_questions) if fresh.id != stored.id)
+    
+    return {
+        "message": "Questions imported successfully",
+        "question_ids": [q.id for q in bank_questions],
+        "imported": len(bank_questions) - duplicates,
+        "duplicates": duplicates
+    }
+
+@api_router.put("/admin/question-bank/{question_id}", response_model=QuizQuestion)
+async def update_bank_question(question_id: str, question: QuizQuestion, admin_user: User = Depends(get_admin_user)):
+    """Edit a bank question; every quiz using it sees the change (admin only)"""
+    existing = await db.question_bank.find_one({"id": question_id}, {"_id": 0})
+    if not existing:
+        raise HTTPException(status_code=404, detail="Question not found")
+    
+    if existing.get("created_by") != admin_user.id:
+        raise HTTPException(status_code=403, detail="You can only edit bank questions you created")
+    if await used_by_other_owners(question_id, admin_user.id):
+        raise HTTPException(
+            status_code=409,
+            detail="Question is used in other admins' quizzes; edit it through your own quiz instead"
+        )
+    
+    validation_errors = validate_question(question, 0)
+    if validation_errors:
+        raise HTTPException(status_code=400, detail=f"{validation_errors[0].field}: {validation_errors[0].message}")
+    
+    question = question.copy(update={"id": question_id})
+    return await save_bank_question(existing, question, question_content_hash(question))
+
+@api_router.delete("/admin/question-bank/{question_id}")
+async def delete_bank_question(question_id: str, admin_user: User = Depends(get_admin_user)):
+    """Delete a bank question that no quiz references (admin only)"""
+    quizzes_using_question = await db.quizzes.find({"question_ids": question_id}, {"title": 1}).to_list(10)
+    if quizzes_using_question:
+        quiz_titles = [quiz.get("title", "Unknown") for quiz in quizzes_using_question]
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot delete question. It is used in {len(quizzes_using_question)} quiz(s): {', '.join(quiz_titles[:3])}"
+        )
+    
+    result = await db.question_bank.delete_one({"id": question_id})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Question not found")
+    return {"message": "Question deleted successfully"}
+
+@api_router.get("/admin/question-bank/{question_id}/stats")
+async def get_bank_question_stats(question_id: str, admin_user: User = Depends(get_admin_user)):
+    """Get statistics for a bank question aggregated across every quiz using it (admin only)"""
+    question = await db.question_bank.find_one({"id": question_id}, {"_id": 0})
+    if not question:
+        raise HTTPException(status_code=404, detail="Question not found")
+    
+    stats_docs = await db.question_stats.find({"question_id": question_id}, {"_id": 0}).to_list(None)
+    attempts = sum(doc.get("attempts", 0) for doc in stats_docs)
+    correct_count = sum(doc.get("correct_count", 0) for doc in stats_docs)
+    points_sum = sum(doc.get("points_sum", 0.0) for doc in stats_docs)
+    option_counts = {}
+    for doc in stats_docs:
+        for option_index, count in doc.get("option_counts", {}).items():
+            option_counts[option_index] = option_counts.get(option_index, 0) + count
+    
+    return {
+        "question": BankQuestion(**question),
+        "used_in_quizzes": await db.quizzes.count_documents({"question_ids": question_id}),
+        "attempts": attempts,
+        "correct_count": correct_count,
+        "accuracy": round(correct_count / attempts * 100, 1) if attempts else 0.0,
+        "average_points": round(points_sum / attempts, 2) if attempts else 0.0,
+        "option_counts": option_counts
+    }
+
+@api_router.post("/admin/question-bank/migrate")
+async def migrate_quizzes_to_question_bank(admin_user: User = Depends(get_admin_user)):
+    """Move embedded questions of legacy quizzes into the shared bank (admin only)"""
+    legacy_quizzes = await db.quizzes.find(
+        {"question_ids": {"$in": [None, []]}, "questions.0": {"$exists": True}},
+        {"_id": 0, "id": 1, "questions": 1, "subject": 1, "created_by": 1}
+    ).to_list(None)
+    
+    migrated = 0
+    for quiz in legacy_quizzes:
+        try:
+            questions = [QuizQuestion(**q) for q in quiz["questions"]]
+        except Exception as e:
+            logger.warning(f"Skipping quiz {quiz['id']} during question bank migration: {str(e)}")
+            continue
+        
+        bank_questions = await import_questions_to_bank(questions, quiz.get("created_by", admin_user.id), quiz.get("subject"), quiz["id"])
+        await db.quizzes.update_one(
+            {"id": quiz["id"]},
+            {"$set": {"question_ids": [q.id for q in bank_questions], "questions": []}}
+        )
+        
+        # Keep per-question statistics attached to the deduplicated ids
+        for original, stored in zip(questions, bank_questions):
+            if original.id != stored.id:
+                await db.question_stats.update_many(
+                    {"quiz_id": quiz["id"], "question_id": original.id},
+                    {"$set": {"question_id": stored.id}}
+                )
+                await db.item_parameters.update_many(
+                    {"quiz_id": quiz["id"], "question_id": original.id},
+                    {"$set": {"question_id": stored.id}}
+                )
+        invalidate_practice_plan(quiz["id"])
+        item_analysis_cache.pop(quiz["id"], None)
+        cat_table_cache.pop(quiz["id"], None)
+        migrated += 1
+    
+    return {"message": "Question bank migration completed", "migrated_quizzes": migrated}
+
 # User Routes (Quiz Taking)
 @api_router.get("/quizzes", response_model=List[Quiz])
-async def get_public_quizzes(current_user: User = Depends(get_current_user)):
-    """Get all accessible admin-created quizzes only"""
+async def get_public_quizzes(sort_by: str = "created_at", current_user: User = Depends(get_current_user)):
+    """Get all accessible admin-created quizzes only, newest or most viewed (sort_by=views) first"""
     # Get all active, published quizzes from admin only
-    all_quizzes = await db.quizzes.find({"is_active": True}).to_list(1000)
+    all_quizzes = await resolve_quiz_questions(await db.quizzes.find({"is_active": True}).to_list(1000))
     
     accessible_quizzes = []
     for quiz in all_quizzes:
@@ -1208,8 +1888,11 @@ async def get_public_quizzes(current_user: User = Depends(get_current_user)):
             print(f"Skipping invalid quiz: {quiz.get('id', 'unknown')} - {str(e)}")
             continue
     
-    # Sort by creation date (newest first)
-    accessible_quizzes.sort(key=lambda x: x.created_at, reverse=True)
+    # Sort by creation date (newest first), or by popularity
+    if sort_by == "views":
+        accessible_quizzes.sort(key=lambda x: (x.view_count, x.total_attempts, x.created_at), reverse=True)
+    else:
+        accessible_quizzes.sort(key=lambda x: x.created_at, reverse=True)
     
     return accessible_quizzes
 
@@ -1261,7 +1944,7 @@ async def get_public_quiz_leaderboard(quiz_id: str, current_user: User = Depends
 @api_router.get("/quiz/{quiz_id}", response_model=Quiz)
 async def get_quiz(quiz_id: str, current_user: User = Depends(get_current_user)):
     """Get specific quiz"""
-    quiz = await db.quizzes.find_one({"id": quiz_id, "is_active": True})
+    quiz = await find_quiz({"id": quiz_id, "is_active": True})
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
     
@@ -1269,6 +1952,7 @@ async def get_quiz(quiz_id: str, current_user: User = Depends(get_current_user))
     if quiz.get('is_draft', False) is True:
         raise HTTPException(status_code=404, detail="Quiz not found")
     
+    record_view("quizzes", quiz_id)
     return Quiz(**quiz)
 
 @api_router.post("/quiz/{quiz_id}/attempt", response_model=QuizAttempt)
@@ -1278,7 +1962,7 @@ async def submit_quiz_attempt(quiz_id: str, attempt_data: QuizAttemptCreate, cur
         raise HTTPException(status_code=403, detail="Admins cannot take quizzes")
     
     # Get quiz
-    quiz = await db.quizzes.find_one({"id": quiz_id, "is_active": True, "is_draft": False})
+    quiz = await find_quiz({"id": quiz_id, "is_active": True, "is_draft": False})
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found or not published")
     
@@ -1298,23 +1982,7 @@ async def submit_quiz_attempt(quiz_id: str, attempt_data: QuizAttemptCreate, cur
     for i, user_answer in enumerate(attempt_data.answers):
         if i < len(quiz_obj.questions):
             question = quiz_obj.questions[i]
-            
-            if question.question_type == QuestionType.MULTIPLE_CHOICE:
-                result = grade_multiple_choice_question(question, user_answer, i)
-            elif question.question_type == QuestionType.OPEN_ENDED:
-                result = grade_open_ended_question(question, user_answer, i)
-            else:
-                result = {
-                    "question_number": i + 1,
-                    "question_text": question.question_text,
-                    "question_type": question.question_type,
-                    "user_answer": user_answer,
-                    "correct_answer": "Unknown",
-                    "is_correct": False,
-                    "points_earned": 0,
-                    "points_possible": question.points,
-                    "explanation": "Unknown question type"
-                }
+            result = grade_question(question, user_answer, i)
             
             question_results.append(result)
             correct_answers.append(result["correct_answer"])
@@ -1336,6 +2004,7 @@ async def submit_quiz_attempt(quiz_id: str, attempt_data: QuizAttemptCreate, cur
         quiz_id=quiz_id,
         user_id=current_user.id,
         answers=attempt_data.answers,
+        question_time_seconds=attempt_data.question_time_seconds,
         correct_answers=correct_answers,
         question_results=question_results,
         score=score,
@@ -1348,9 +2017,12 @@ async def submit_quiz_attempt(quiz_id: str, attempt_data: QuizAttemptCreate, cur
     )
     
     await db.quiz_attempts.insert_one(attempt.dict())
+    await adjust_user_stats({current_user.id: {"quizzes_taken": 1, "total_quiz_score": attempt.percentage}})
+    await record_quiz_completed_activity(current_user, quiz, attempt)
     
     # Update quiz statistics
     await update_quiz_statistics(quiz_id)
+    await record_question_stats(quiz_id, quiz_obj, question_results, attempt_data.question_time_seconds)
     
     # Notify user about quiz result
     await notify_quiz_result(current_user.id, quiz["title"], percentage, passed)
@@ -1490,6 +2162,52 @@ async def update_quiz_statistics(quiz_id: str):
             }
         )
 
+def selected_option_indexes(question: QuizQuestion, user_answer: str) -> List[int]:
+    """Map a multiple choice answer string to the indexes of the chosen options"""
+    if question.multiple_correct:
+        chosen = {ans.strip() for ans in user_answer.split(',') if ans.strip()}
+    else:
+        chosen = {user_answer}
+    return [i for i, opt in enumerate(question.options) if opt.text in chosen]
+
+async def record_question_stats(quiz_id: str, quiz_obj: Quiz, question_results: List[dict], question_time_seconds: List[Optional[int]]):
+    """Increment per-question statistics for a graded attempt in a single bulk write"""
+    now = datetime.utcnow()
+    operations = []
+    
+    for i, result in enumerate(question_results):
+        question = quiz_obj.questions[i]
+        user_answer = result["user_answer"] or ""
+        
+        increments = {
+            "attempts": 1,
+            "correct_count": 1 if result["is_correct"] else 0,
+            "skipped_count": 0 if user_answer.strip() else 1,
+            "points_sum": float(result["points_earned"])
+        }
+        
+        if question.question_type == QuestionType.MULTIPLE_CHOICE:
+            for option_index in selected_option_indexes(question, user_answer):
+                increments[f"option_counts.{option_index}"] = 1
+        
+        time_spent = question_time_seconds[i] if i < len(question_time_seconds) else None
+        if time_spent is not None and time_spent >= 0:
+            increments["time_spent_sum"] = time_spent
+            increments["time_samples"] = 1
+        
+        operations.append(UpdateOne(
+            {"quiz_id": quiz_id, "question_id": question.id},
+            {
+                "$inc": increments,
+                "$set": {"question_type": question.question_type, "updated_at": now},
+                "$setOnInsert": {"id": str(uuid.uuid4()), "created_at": now}
+            },
+            upsert=True
+        ))
+    
+    if operations:
+        await db.question_stats.bulk_write(operations, ordered=False)
+
 @api_router.get("/quiz/{quiz_id}/results-ranking")
 async def get_quiz_results_ranking(quiz_id: str, current_user: User = Depends(get_current_user)):
     """Get ranked results for a quiz with top performers and user's position - based on FIRST attempts only"""
@@ -1566,6 +2284,89 @@ async def get_my_attempts(current_user: User = Depends(get_current_user)):
     attempts = await db.quiz_attempts.find({"user_id": current_user.id}).to_list(1000)
     return [QuizAttempt(**attempt) for attempt in attempts]
 
+# Practice Mode (single question grading)
+PRACTICE_PLAN_TTL_SECONDS = 300
+practice_plan_cache = {}  # quiz_id -> grading plan
+
+def invalidate_practice_plan(quiz_id: str):
+    """Drop the cached grading plan for a quiz after it changes"""
+    practice_plan_cache.pop(quiz_id, None)
+
+async def get_practice_plan(quiz_id: str) -> Optional[dict]:
+    """Get the grading plan of a published quiz, indexed by question id"""
+    plan = practice_plan_cache.get(quiz_id)
+    if plan and time.monotonic() - plan["loaded_at"] < PRACTICE_PLAN_TTL_SECONDS:
+        return plan
+    
+    quiz = await find_quiz(
+        {"id": quiz_id, "is_active": True, "is_draft": False},
+        {"_id": 0, "questions": 1, "is_public": 1, "allowed_users": 1}
+    )
+    if not quiz:
+        invalidate_practice_plan(quiz_id)
+        return None
+    
+    questions = {}
+    for i, question_doc in enumerate(quiz.get("questions", [])):
+        question = QuizQuestion(**question_doc)
+        questions[question.id] = (i, question)
+    
+    plan = {
+        "loaded_at": time.monotonic(),
+        "is_public": quiz.get("is_public", False),
+        "allowed_users": set(quiz.get("allowed_users", [])),
+        "questions": questions
+    }
+    practice_plan_cache[quiz_id] = plan
+    return plan
+
+def grade_question(question: QuizQuestion, user_answer: str, question_index: int) -> dict:
+    """Grade a single question with the grader for its type"""
+    if question.question_type == QuestionType.MULTIPLE_CHOICE:
+        return grade_multiple_choice_question(question, user_answer, question_index)
+    if question.question_type == QuestionType.OPEN_ENDED:
+        return grade_open_ended_question(question, user_answer, question_index)
+    return {
+        "question_number": question_index + 1,
+        "question_text": question.question_text,
+        "question_type": question.question_type,
+        "user_answer": user_answer,
+        "correct_answer": "Unknown",
+        "is_correct": False,
+        "points_earned": 0,
+        "points_possible": question.points,
+        "explanation": "Unknown question type"
+    }
+
+@api_router.post("/quiz/{quiz_id}/practice")
+async def practice_question(quiz_id: str, practice_data: PracticeAnswerRequest, current_user: User = Depends(get_current_user)):
+    """Grade a single answer instantly without recording a quiz attempt"""
+    plan = await get_practice_plan(quiz_id)
+    if not plan:
+        raise HTTPException(status_code=404, detail="Quiz not found or not published")
+    
+    # Check access permissions for public quizzes
+    if plan["is_public"] and current_user.id not in plan["allowed_users"]:
+        raise HTTPException(status_code=403, detail="You don't have access to this quiz")
+    
+    entry = plan["questions"].get(practice_data.question_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Question not found in this quiz")
+    
+    question_index, question = entry
+    result = grade_question(question, practice_data.answer, question_index)
+    
+    return {
+        "quiz_id": quiz_id,
+        "question_id": question.id,
+        "question_number": result["question_number"],
+        "is_correct": result["is_correct"],
+        "points_earned": result["points_earned"],
+        "points_possible": result["points_possible"],
+        "correct_answer": result["correct_answer"],
+        "explanation": result.get("explanation")
+    }
+
 # Real-time Quiz Session Management
 @api_router.post("/quiz-session/start", response_model=QuizSessionResponse)
 async def start_quiz_session(session_data: QuizSessionCreate, current_user: User = Depends(get_current_user)):
@@ -1620,7 +2421,7 @@ async def start_quiz_session(session_data: QuizSessionCreate, current_user: User
         time_limit_minutes=session.time_limit_minutes,
         time_remaining_seconds=session.time_remaining_seconds,
         current_question_index=session.current_question_index,
-        total_questions=len(quiz.get("questions", [])),
+        total_questions=quiz_question_count(quiz),
         answers=session.answers,
         is_auto_submit=session.is_auto_submit,
         created_at=session.created_at,
@@ -1663,7 +2464,7 @@ async def activate_quiz_session(session_id: str, current_user: User = Depends(ge
         time_limit_minutes=updated_session.get("time_limit_minutes"),
         time_remaining_seconds=updated_session.get("time_remaining_seconds"),
         current_question_index=updated_session["current_question_index"],
-        total_questions=len(quiz.get("questions", [])),
+        total_questions=quiz_question_count(quiz),
         answers=updated_session["answers"],
         is_auto_submit=updated_session["is_auto_submit"],
         created_at=updated_session["created_at"],
@@ -1711,7 +2512,7 @@ async def get_quiz_session_status(session_id: str, current_user: User = Depends(
         time_limit_minutes=session.get("time_limit_minutes"),
         time_remaining_seconds=time_remaining_seconds,
         current_question_index=session["current_question_index"],
-        total_questions=len(quiz.get("questions", [])),
+        total_questions=quiz_question_count(quiz),
         answers=session["answers"],
         is_auto_submit=session["is_auto_submit"],
         created_at=session["created_at"],
@@ -1756,6 +2557,9 @@ async def update_quiz_session(session_id: str, update_data: QuizSessionUpdate, c
     if update_data.answers is not None:
         update_fields["answers"] = update_data.answers
     
+    if update_data.question_time_seconds is not None:
+        update_fields["question_time_seconds"] = update_data.question_time_seconds
+    
     if update_data.status is not None:
         update_fields["status"] = update_data.status
     
@@ -1774,7 +2578,7 @@ async def submit_quiz_session(session_id: str, current_user: User = Depends(get_
         raise HTTPException(status_code=400, detail="Session cannot be submitted")
     
     # Get quiz
-    quiz = await db.quizzes.find_one({"id": session["quiz_id"]})
+    quiz = await find_quiz({"id": session["quiz_id"]})
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
     
@@ -1787,7 +2591,8 @@ async def submit_quiz_session(session_id: str, current_user: User = Depends(get_
     # Create quiz attempt using existing grading logic
     attempt_data = QuizAttemptCreate(
         quiz_id=session["quiz_id"],
-        answers=session["answers"]
+        answers=session["answers"],
+        question_time_seconds=session.get("question_time_seconds", [])
     )
     
     # Use existing submit_quiz_attempt logic for grading
@@ -1803,23 +2608,7 @@ async def submit_quiz_session(session_id: str, current_user: User = Depends(get_
     for i, user_answer in enumerate(attempt_data.answers):
         if i < len(quiz_obj.questions):
             question = quiz_obj.questions[i]
-            
-            if question.question_type == QuestionType.MULTIPLE_CHOICE:
-                result = grade_multiple_choice_question(question, user_answer, i)
-            elif question.question_type == QuestionType.OPEN_ENDED:
-                result = grade_open_ended_question(question, user_answer, i)
-            else:
-                result = {
-                    "question_number": i + 1,
-                    "question_text": question.question_text,
-                    "question_type": question.question_type,
-                    "user_answer": user_answer,
-                    "correct_answer": "Unknown",
-                    "is_correct": False,
-                    "points_earned": 0,
-                    "points_possible": question.points,
-                    "explanation": "Unknown question type"
-                }
+            result = grade_question(question, user_answer, i)
             
             question_results.append(result)
             correct_answers.append(result["correct_answer"])
@@ -1841,6 +2630,7 @@ async def submit_quiz_session(session_id: str, current_user: User = Depends(get_
         quiz_id=session["quiz_id"],
         user_id=current_user.id,
         answers=attempt_data.answers,
+        question_time_seconds=attempt_data.question_time_seconds,
         correct_answers=correct_answers,
         question_results=question_results,
         score=score,
@@ -1854,6 +2644,8 @@ async def submit_quiz_session(session_id: str, current_user: User = Depends(get_
     )
     
     await db.quiz_attempts.insert_one(attempt.dict())
+    await adjust_user_stats({current_user.id: {"quizzes_taken": 1, "total_quiz_score": attempt.percentage}})
+    await record_quiz_completed_activity(current_user, quiz, attempt)
     
     # Update session to completed
     await db.quiz_sessions.update_one(
@@ -1867,6 +2659,7 @@ async def submit_quiz_session(session_id: str, current_user: User = Depends(get_
     
     # Update quiz statistics
     await update_quiz_statistics(session["quiz_id"])
+    await record_question_stats(session["quiz_id"], quiz_obj, question_results, attempt_data.question_time_seconds)
     
     return attempt
 
@@ -1931,7 +2724,7 @@ async def get_my_quiz_sessions(current_user: User = Depends(get_current_user)):
                 time_limit_minutes=session.get("time_limit_minutes"),
                 time_remaining_seconds=session.get("time_remaining_seconds"),
                 current_question_index=session["current_question_index"],
-                total_questions=len(quiz.get("questions", [])),
+                total_questions=quiz_question_count(quiz),
                 answers=session["answers"],
                 is_auto_submit=session["is_auto_submit"],
                 created_at=session["created_at"],
@@ -2066,6 +2859,19 @@ async def delete_file(file_id: str, admin_user: User = Depends(get_admin_user)):
         ]
     }).to_list(10)
     
+    if not quizzes_using_file:
+        # Bank-backed quizzes keep their questions in the shared bank
+        bank_questions_using_file = await db.question_bank.find({
+            "$or": [
+                {"image_url": {"$regex": file_id}},
+                {"pdf_url": {"$regex": file_id}}
+            ]
+        }, {"id": 1}).to_list(100)
+        if bank_questions_using_file:
+            quizzes_using_file = await db.quizzes.find({
+                "question_ids": {"$in": [q["id"] for q in bank_questions_using_file]}
+            }).to_list(10)
+    
     if quizzes_using_file:
         quiz_titles = [quiz.get("title", "Unknown") for quiz in quizzes_using_file]
         raise HTTPException(
@@ -2418,6 +3224,7 @@ async def create_global_subject(subject_data: GlobalSubjectCreate, admin_user: U
     )
     
     await db.global_subjects.insert_one(global_subject.dict())
+    await refresh_subject_autocomplete()
     return global_subject
 
 @api_router.get("/admin/global-subjects", response_model=List[GlobalSubject])
@@ -2450,6 +3257,7 @@ async def update_global_subject(
     update_data["updated_at"] = datetime.utcnow()
     
     await db.global_subjects.update_one({"id": subject_id}, {"$set": update_data})
+    await refresh_subject_autocomplete()
     
     updated_subject = await db.global_subjects.find_one({"id": subject_id})
     return GlobalSubject(**updated_subject)
@@ -2479,6 +3287,7 @@ async def add_subfolder_to_global_subject(
             "$set": {"updated_at": datetime.utcnow()}
         }
     )
+    await refresh_subject_autocomplete()
     
     return {"message": f"Subfolder '{subfolder_name}' added successfully"}
 
@@ -2496,6 +3305,7 @@ async def delete_global_subject(subject_id: str, admin_user: User = Depends(get_
     result = await db.global_subjects.delete_one({"id": subject_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Global subject not found")
+    await refresh_subject_autocomplete()
     
     return {"message": "Global subject deleted successfully"}
 
@@ -2529,6 +3339,7 @@ async def delete_global_subfolder(
             "$set": {"updated_at": datetime.utcnow()}
         }
     )
+    await refresh_subject_autocomplete()
     
     return {"message": "Subfolder deleted successfully"}
 
@@ -2583,6 +3394,7 @@ async def create_subject_folder(folder_data: SubjectFolderCreate, admin_user: Us
     )
     
     await db.subject_folders.insert_one(folder.dict())
+    await refresh_subject_autocomplete()
     return folder
 
 @api_router.get("/admin/subject-folders", response_model=List[SubjectFolder])
@@ -2603,6 +3415,7 @@ async def update_subject_folder(folder_id: str, folder_data: SubjectFolderUpdate
     update_data["updated_at"] = datetime.utcnow()
     
     await db.subject_folders.update_one({"id": folder_id}, {"$set": update_data})
+    await refresh_subject_autocomplete()
     
     # Return updated folder
     updated_folder = await db.subject_folders.find_one({"id": folder_id})
@@ -2625,6 +3438,7 @@ async def delete_subject_folder(folder_id: str, admin_user: User = Depends(get_a
         {"id": folder_id}, 
         {"$set": {"is_active": False, "updated_at": datetime.utcnow()}}
     )
+    await refresh_subject_autocomplete()
     
     return {"message": "Subject folder deleted successfully"}
 
@@ -2654,6 +3468,8 @@ async def move_quiz_to_folder(quiz_id: str, new_subject: str, new_subcategory: s
             "updated_at": datetime.utcnow()
         }}
     )
+    await refresh_search_document(SearchDocumentType.QUIZ, quiz_id)
+    track_quiz_autocomplete(quiz, {"subject": new_subject, "subcategory": new_subcategory})
     
     return {"message": f"Quiz moved to {new_subject} → {new_subcategory}"}
 
@@ -2798,10 +3614,138 @@ async def get_user_details(user_id: str, admin_user: User = Depends(get_admin_us
 # Q&A DISCUSSION SYSTEM API ENDPOINTS
 # ====================================================================
 
+# Keyset pagination helpers
+QUESTION_COUNT_CACHE_TTL_SECONDS = 30
+QUESTION_COUNT_CACHE_MAX_ENTRIES = 1000
+question_count_cache = {}  # filter key -> (counted_at, count)
+
+def encode_cursor(sort_field: str, sort_value, last_id: str, group_value=None, direction: int = -1) -> str:
+    """Opaque cursor holding the sort order, sort key and id of the last item on a page"""
+    payload = {"s": sort_field, "o": direction, "id": last_id}
+    if group_value is not None:
+        payload["g"] = group_value
+    if isinstance(sort_value, datetime):
+        payload["d"] = sort_value.isoformat()
+    else:
+        payload["v"] = sort_value
+    return base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii').rstrip("=")
+
+def decode_cursor(cursor: str, sort_field: str, grouped: bool = False, direction: int = -1):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if payload["s"] != sort_field or payload.get("o", -1) != direction:
+            raise ValueError("cursor belongs to a different sort order")
+        value = datetime.fromisoformat(payload["d"]) if "d" in payload else payload["v"]
+        if grouped:
+            return payload["g"], value, payload["id"]
+        return value, payload["id"]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+async def find_page(
+    collection,
+    query: dict,
+    sort_field: str = "created_at",
+    direction: int = -1,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    projection: Optional[dict] = None,
+    group_field: Optional[str] = None
+):
+    """Fetch one page ordered by (sort_field, id) and the cursor of the next page
+    
+    With a cursor the page starts right after the last item of the previous one, so
+    deep pages cost the same as the first. Offsets are still accepted when no cursor
+    is given, for older clients. A group_field is sorted on before sort_field in the
+    same direction and must be set on every document, e.g. to list pinned first.
+    """
+    cursor_field = f"{group_field},{sort_field}" if group_field else sort_field
+    if cursor:
+        operator = "$lt" if direction < 0 else "$gt"
+        if group_field:
+            group_value, sort_value, last_id = decode_cursor(cursor, cursor_field, grouped=True, direction=direction)
+            after = [
+                {group_field: {operator: group_value}},
+                {group_field: group_value, sort_field: {operator: sort_value}},
+                {group_field: group_value, sort_field: sort_value, "id": {operator: last_id}}
+            ]
+        else:
+            sort_value, last_id = decode_cursor(cursor, cursor_field, direction=direction)
+            after = [
+                {sort_field: {operator: sort_value}},
+                {sort_field: sort_value, "id": {operator: last_id}}
+            ]
+        query = {"$and": [query, {"$or": after}]}
+    
+    sort = [(sort_field, direction), ("id", direction)]
+    if group_field:
+        sort.insert(0, (group_field, direction))
+    find_cursor = collection.find(query, projection).sort(sort)
+    if skip and not cursor:
+        find_cursor = find_cursor.skip(skip)
+    docs = await find_cursor.limit(limit + 1).to_list(limit + 1)
+    
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(
+            cursor_field, docs[-1].get(sort_field), docs[-1]["id"],
+            docs[-1].get(group_field) if group_field else None, direction
+        )
+    return docs, next_cursor
+
+async def count_questions_cached(filter_dict: dict) -> int:
+    """Count questions matching a filter, reusing recent counts"""
+    key = json.dumps(filter_dict, sort_keys=True, default=str)
+    cached = question_count_cache.get(key)
+    now = time.monotonic()
+    if cached and now - cached[0] < QUESTION_COUNT_CACHE_TTL_SECONDS:
+        return cached[1]
+    count = await db.questions.count_documents(filter_dict)
+    if len(question_count_cache) >= QUESTION_COUNT_CACHE_MAX_ENTRIES:
+        question_count_cache.pop(next(iter(question_count_cache)))  # Oldest entry first
+    question_count_cache[key] = (now, count)
+    return count
+
 # Helper functions for Q&A system
-async def get_user_info(user_id: str):
-    """Get basic user information for Q&A responses"""
-    user = await db.users.find_one({"id": user_id})
+USER_INFO_CACHE_TTL_SECONDS = 60
+USER_INFO_CACHE_MAX_ENTRIES = 10000
+USER_INFO_PROJECTION = {"_id": 0, "id": 1, "name": 1, "role": 1, "avatar": 1}
+user_info_cache = {}  # user_id -> (loaded_at, projected user document)
+
+def invalidate_user_info(user_id: str):
+    """Drop a cached user after their name, role or avatar changes"""
+    user_info_cache.pop(user_id, None)
+
+async def load_users(user_ids) -> Dict[str, dict]:
+    """Load projected user documents for many ids with at most one query
+    
+    Handlers collect the user ids of a whole page and call this once instead of
+    looking users up row by row. Recently loaded users are served from a small
+    cache shared across requests; ids that do not exist are left out.
+    """
+    now = time.monotonic()
+    users = {}
+    missing = set()
+    for user_id in set(user_ids):
+        cached = user_info_cache.get(user_id)
+        if cached and now - cached[0] < USER_INFO_CACHE_TTL_SECONDS:
+            users[user_id] = cached[1]
+        else:
+            missing.add(user_id)
+    
+    if missing:
+        found = await db.users.find({"id": {"$in": list(missing)}}, USER_INFO_PROJECTION).to_list(None)
+        if len(user_info_cache) + len(found) > USER_INFO_CACHE_MAX_ENTRIES:
+            user_info_cache.clear()
+        for user in found:
+            users[user["id"]] = user
+            user_info_cache[user["id"]] = (now, user)
+    return users
+
+def build_user_info(user_id: str, user: Optional[dict]) -> dict:
+    """Basic user information for Q&A responses"""
     if user:
         return {
             "id": user["id"],
@@ -2811,37 +3755,327 @@ async def get_user_info(user_id: str):
         }
     return {"id": user_id, "name": "Unknown User", "role": "user", "is_admin": False}
 
-async def update_question_stats(question_id: str):
-    """Update question statistics after changes"""
-    answer_count = await db.answers.count_documents({"question_id": question_id})
-    has_accepted_answer = bool(await db.answers.find_one({"question_id": question_id, "is_accepted": True}))
-    
-    status = QuestionStatus.ANSWERED if has_accepted_answer else (
-        QuestionStatus.OPEN if answer_count == 0 else QuestionStatus.OPEN
+async def get_users_info(user_ids) -> Dict[str, dict]:
+    """Get basic user information for many users, keyed by user id"""
+    users = await load_users(user_ids)
+    return {user_id: build_user_info(user_id, users.get(user_id)) for user_id in user_ids}
+
+async def get_user_info(user_id: str):
+    """Get basic user information for Q&A responses"""
+    return (await get_users_info([user_id]))[user_id]
+
+# Hot ranking: log-scaled engagement plus the posting time measured in units of
+# HOT_SCORE_TIME_UNIT_SECONDS. Newer questions start higher, so older ones need ten
+# times the engagement per unit of age to stay level with them. The score of a
+# question only changes with its own counters, never with the clock. Pinned
+# questions are not boosted in the score; the hot sort orders by is_pinned first.
+HOT_SCORE_EPOCH = datetime(2024, 1, 1)
+HOT_SCORE_TIME_UNIT_SECONDS = 45000
+HOT_SCORE_ANSWER_WEIGHT = 2
+HOT_SCORE_ACCEPTED_WEIGHT = 3
+HOT_SCORE_FIELDS = {"_id": 0, "id": 1, "upvotes": 1, "downvotes": 1, "answer_count": 1, "has_accepted_answer": 1, "created_at": 1, "hot_score": 1}
+HOT_SCORE_REFRESH_INTERVAL_SECONDS = 300
+
+def question_hot_score(question: dict) -> float:
+    points = (
+        question.get("upvotes", 0) - question.get("downvotes", 0)
+        + HOT_SCORE_ANSWER_WEIGHT * question.get("answer_count", 0)
+        + (HOT_SCORE_ACCEPTED_WEIGHT if question.get("has_accepted_answer") else 0)
     )
-    
-    await db.questions.update_one(
-        {"id": question_id},
-        {"$set": {
-            "answer_count": answer_count,
-            "has_accepted_answer": has_accepted_answer,
-            "status": status,
-            "updated_at": datetime.utcnow()
-        }}
+    order = np.log10(max(abs(points), 1))
+    sign = 1 if points > 0 else -1 if points < 0 else 0
+    age = (question.get("created_at", HOT_SCORE_EPOCH) - HOT_SCORE_EPOCH).total_seconds()
+    score = sign * order + age / HOT_SCORE_TIME_UNIT_SECONDS
+    return round(float(score), 7)
+
+async def store_hot_score(question: Optional[dict]):
+    """Save the hot score of a question read back after a counter change"""
+    if question:
+        await db.questions.update_one({"id": question["id"]}, {"$set": {"hot_score": question_hot_score(question)}})
+
+# Question counts per tag and per subject, kept in question_facet_counts and
+# adjusted on every question write so tag clouds never scan the questions.
+TAG_CLOUD_CACHE_TTL_SECONDS = 60
+TAG_CLOUD_MAX_LIMIT = 200
+QUESTION_FACETS = ("tag", "subject")
+tag_cloud_cache = {}  # limit -> (loaded_at, tags)
+
+def clean_tags(tags: Optional[List[str]]) -> List[str]:
+    """Strip tags and drop empty or repeated ones, keeping their order"""
+    cleaned = []
+    for tag in tags or []:
+        tag = tag.strip()
+        if tag and tag not in cleaned:
+            cleaned.append(tag)
+    return cleaned
+
+def question_facet_values(question: Optional[dict]) -> set:
+    if not question:
+        return set()
+    values = {("tag", tag) for tag in question.get("tags") or []}
+    if question.get("subject"):
+        values.add(("subject", question["subject"]))
+    return values
+
+async def adjust_question_facets(old_question: Optional[dict], new_question: Optional[dict]):
+    """Move a question's tag and subject counts after it is created, edited or deleted"""
+    old_values = question_facet_values(old_question)
+    new_values = question_facet_values(new_question)
+    changes = [(value, -1) for value in old_values - new_values] + [(value, 1) for value in new_values - old_values]
+    if not changes:
+        return
+    await db.question_facet_counts.bulk_write([
+        UpdateOne({"id": f"{facet}:{value}"}, {"$inc": {"count": delta}, "$setOnInsert": {"facet": facet, "value": value}}, upsert=True)
+        for (facet, value), delta in changes
+    ], ordered=False)
+    if any(facet == "tag" for (facet, _), _ in changes):
+        tag_cloud_cache.clear()
+
+async def get_facet_counts(facet: str, limit: int) -> List[dict]:
+    rows = await db.question_facet_counts.find(
+        {"facet": facet, "count": {"$gt": 0}}, {"_id": 0, "value": 1, "count": 1}
+    ).sort([("count", -1), ("value", 1)]).to_list(limit)
+    return [{"name": row["value"], "count": row["count"]} for row in rows]
+
+@api_router.get("/tags")
+async def get_tags(limit: int = 50):
+    """Most used question tags with their question counts"""
+    limit = max(1, min(limit, TAG_CLOUD_MAX_LIMIT))
+    cached = tag_cloud_cache.get(limit)
+    now = time.monotonic()
+    if cached and now - cached[0] < TAG_CLOUD_CACHE_TTL_SECONDS:
+        return {"tags": cached[1]}
+    tags = await get_facet_counts("tag", limit)
+    tag_cloud_cache[limit] = (now, tags)
+    return {"tags": tags}
+
+async def update_question_counters(question_id: str, answer_delta: int = 0, has_accepted_answer: Optional[bool] = None):
+    """Adjust a question's denormalized answer counters after an answer change"""
+    update = {"$set": {"updated_at": datetime.utcnow()}}
+    if answer_delta:
+        update["$inc"] = {"answer_count": answer_delta}
+    if has_accepted_answer is not None:
+        update["$set"]["has_accepted_answer"] = has_accepted_answer
+        update["$set"]["status"] = QuestionStatus.ANSWERED if has_accepted_answer else QuestionStatus.OPEN
+    
+    question = await db.questions.find_one_and_update(
+        {"id": question_id}, update, projection=HOT_SCORE_FIELDS, return_document=ReturnDocument.AFTER
+    )
+    await store_hot_score(question)
+
+# =====================================
+# PUBLIC Q&A RESPONSE CACHE
+# =====================================
+# The question list and question detail need no login and take most of the
+# traffic from search engines and shared links. Their encoded responses are kept
+# per worker, keyed by query string or question id. Q&A writes in this worker drop
+# the affected entries at once; entries written elsewhere expire after a short TTL.
+# Logged-in readers always bypass the cache so they see their own writes, whichever
+# worker handled them.
+
+PUBLIC_CACHE_TTL_SECONDS = 30
+PUBLIC_CACHE_MAX_AGE_SECONDS = 15  # Browser and CDN lifetime for anonymous requests
+PUBLIC_CACHE_MAX_ENTRIES = 2000
+question_list_cache = {}  # sorted query string -> (stored_at, body)
+question_detail_cache = {}  # question_id -> (stored_at, body)
+
+def public_cache_response(request: Request, body: bytes, hit: bool) -> Response:
+    response = Response(content=body, media_type="application/json")
+    if "authorization" in request.headers:
+        # Logged-in users must see their own writes on the next read
+        response.headers["Cache-Control"] = "private, no-cache"
+    else:
+        response.headers["Cache-Control"] = f"public, max-age={PUBLIC_CACHE_MAX_AGE_SECONDS}"
+    response.headers["X-Cache"] = "HIT" if hit else "MISS"
+    return response
+
+def get_public_cache(cache: dict, key: str, request: Request) -> Optional[Response]:
+    if "authorization" in request.headers:
+        return None
+    entry = cache.get(key)
+    if entry and time.monotonic() - entry[0] < PUBLIC_CACHE_TTL_SECONDS:
+        return public_cache_response(request, entry[1], hit=True)
+    return None
+
+def store_public_cache(cache: dict, key: str, request: Request, result) -> Response:
+    body = json.dumps(jsonable_encoder(result)).encode("utf-8")
+    if len(cache) >= PUBLIC_CACHE_MAX_ENTRIES:
+        cache.pop(next(iter(cache)))  # Oldest entry first
+    cache[key] = (time.monotonic(), body)
+    return public_cache_response(request, body, hit=False)
+
+def invalidate_question_cache(question_id: Optional[str] = None):
+    """Drop cached question lists and the detail page of a changed question"""
+    question_list_cache.clear()
+    if question_id:
+        question_detail_cache.pop(question_id, None)
+
+# =====================================
+# DUPLICATE QUESTION DETECTION
+# =====================================
+# Questions are reduced to MinHash signatures of their word shingles and bucketed
+# by band (locality-sensitive hashing), so a lookup only compares the new text with
+# the few questions sharing a band instead of the whole Q&A corpus.
+
+DUPLICATE_SHINGLE_SIZE = 2
+DUPLICATE_BANDS = 16
+DUPLICATE_ROWS_PER_BAND = 4  # 16 x 4 hashes catch pairs from roughly 0.5 Jaccard similarity
+DUPLICATE_MIN_SIMILARITY = 0.5
+DUPLICATE_MAX_SUGGESTIONS = 5
+DUPLICATE_REBUILD_INTERVAL_SECONDS = 3600
+DUPLICATE_HASH_PRIME = (1 << 31) - 1
+
+duplicate_hash_rng = np.random.default_rng(20240601)  # Fixed seed keeps signatures comparable across rebuilds
+DUPLICATE_HASH_A = duplicate_hash_rng.integers(1, DUPLICATE_HASH_PRIME, DUPLICATE_BANDS * DUPLICATE_ROWS_PER_BAND, dtype=np.uint64)
+DUPLICATE_HASH_B = duplicate_hash_rng.integers(0, DUPLICATE_HASH_PRIME, DUPLICATE_BANDS * DUPLICATE_ROWS_PER_BAND, dtype=np.uint64)
+
+class SimilarQuestion(BaseModel):
+    id: str
+    title: str
+    similarity: float
+    answer_count: int = 0
+    has_accepted_answer: bool = False
+
+class QuestionCreateResponse(Question):
+    similar_questions: List[SimilarQuestion] = []
+
+def question_shingles(title: Optional[str], content: Optional[str]) -> set:
+    """Word shingles of a question's title and body"""
+    tokens = search_tokens(f"{title or ''} {content or ''}")
+    if len(tokens) < DUPLICATE_SHINGLE_SIZE:
+        return set(tokens)
+    return {
+        " ".join(tokens[i:i + DUPLICATE_SHINGLE_SIZE])
+        for i in range(len(tokens) - DUPLICATE_SHINGLE_SIZE + 1)
+    }
+
+def minhash_signature(shingles: set) -> Optional[np.ndarray]:
+    if not shingles:
+        return None
+    values = np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) % DUPLICATE_HASH_PRIME for shingle in shingles),
+        dtype=np.uint64, count=len(shingles)
     )
+    hashes = (DUPLICATE_HASH_A[:, None] * values[None, :] + DUPLICATE_HASH_B[:, None]) % DUPLICATE_HASH_PRIME
+    return hashes.min(axis=1)
+
+class DuplicateIndex:
+    """MinHash LSH index of question signatures"""
+    
+    def __init__(self):
+        self.signatures = {}  # question_id -> (signature, title)
+        self.buckets = {}  # (band, band hashes) -> set of question ids
+    
+    def band_keys(self, signature: np.ndarray):
+        for band in range(DUPLICATE_BANDS):
+            start = band * DUPLICATE_ROWS_PER_BAND
+            yield band, signature[start:start + DUPLICATE_ROWS_PER_BAND].tobytes()
+    
+    def add(self, question_id: str, title: str, content: str):
+        self.remove(question_id)
+        signature = minhash_signature(question_shingles(title, content))
+        if signature is None:
+            return
+        self.signatures[question_id] = (signature, title)
+        for key in self.band_keys(signature):
+            self.buckets.setdefault(key, set()).add(question_id)
+    
+    def remove(self, question_id: str):
+        entry = self.signatures.pop(question_id, None)
+        if not entry:
+            return
+        for key in self.band_keys(entry[0]):
+            bucket = self.buckets.get(key)
+            if bucket is not None:
+                bucket.discard(question_id)
+                if not bucket:
+                    del self.buckets[key]
+    
+    def similar(self, title: str, content: str, limit: int, exclude_id: Optional[str] = None) -> list:
+        """(question_id, title, estimated Jaccard similarity), most similar first"""
+        signature = minhash_signature(question_shingles(title, content))
+        if signature is None:
+            return []
+        candidates = set()
+        for key in self.band_keys(signature):
+            candidates.update(self.buckets.get(key, ()))
+        candidates.discard(exclude_id)
+        
+        matches = []
+        for question_id in candidates:
+            other, other_title = self.signatures[question_id]
+            similarity = float(np.mean(signature == other))
+            if similarity >= DUPLICATE_MIN_SIMILARITY:
+                matches.append((question_id, other_title, similarity))
+        matches.sort(key=lambda match: -match[2])
+        return matches[:limit]
+
+duplicate_index = DuplicateIndex()
+
+async def rebuild_duplicate_index():
+    """Rebuild the duplicate index from the database and swap it in"""
+    global duplicate_index
+    index = DuplicateIndex()
+    async for question in db.questions.find({}, {"_id": 0, "id": 1, "title": 1, "content": 1}):
+        index.add(question["id"], question.get("title"), question.get("content"))
+    duplicate_index = index
+
+async def find_similar_questions(title: str, content: Optional[str], limit: int = DUPLICATE_MAX_SUGGESTIONS, exclude_id: Optional[str] = None) -> List[SimilarQuestion]:
+    """Existing questions that look like near-duplicates of the given text"""
+    matches = duplicate_index.similar(title, content, limit, exclude_id)
+    if not matches:
+        return []
+    counters = {
+        question["id"]: question
+        async for question in db.questions.find(
+            {"id": {"$in": [question_id for question_id, _, _ in matches]}},
+            {"_id": 0, "id": 1, "answer_count": 1, "has_accepted_answer": 1}
+        )
+    }
+    return [
+        SimilarQuestion(
+            id=question_id,
+            title=title,
+            similarity=round(similarity, 3),
+            answer_count=counters[question_id].get("answer_count", 0),
+            has_accepted_answer=counters[question_id].get("has_accepted_answer", False)
+        )
+        for question_id, title, similarity in matches
+        if question_id in counters
+    ]
+
+@api_router.get("/questions/similar", response_model=List[SimilarQuestion])
+async def get_similar_questions(title: str, content: Optional[str] = None, limit: int = DUPLICATE_MAX_SUGGESTIONS):
+    """Check a draft question for near-duplicates before posting it"""
+    if not title.strip():
+        raise HTTPException(status_code=400, detail="Question title cannot be empty")
+    return await find_similar_questions(title, content, max(1, min(limit, 20)))
 
 # Questions API Endpoints
 @api_router.get("/questions")
 async def get_questions(
+    request: Request,
     subject: Optional[str] = None,
     subcategory: Optional[str] = None,
     status: Optional[str] = None,
+    tag: Optional[str] = None,  # One tag, or several separated by commas that must all match
     page: int = 1,
     limit: int = 20,
-    sort_by: str = "created_at",  # created_at, upvotes, answer_count, updated_at
-    sort_order: str = "desc"
+    sort_by: str = "created_at",  # created_at, upvotes, answer_count, updated_at, view_count, hot
+    sort_order: str = "desc",
+    cursor: Optional[str] = None,
+    include_total: bool = True
 ):
-    """Get all questions with optional filtering and pagination"""
+    """Get all questions with optional filtering and pagination
+    
+    Pass the returned next_cursor to get the following page; page numbers are kept
+    for older clients. The total is cached briefly and can be skipped entirely.
+    """
+    cache_key = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    cached = get_public_cache(question_list_cache, cache_key, request)
+    if cached:
+        return cached
+    
     skip = (page - 1) * limit
     sort_direction = -1 if sort_order == "desc" else 1
     
@@ -2853,63 +4087,92 @@ async def get_questions(
         filter_dict["subcategory"] = subcategory
     if status:
         filter_dict["status"] = status
+    tags = clean_tags(tag.split(",")) if tag else []
+    if len(tags) == 1:
+        filter_dict["tags"] = tags[0]
+    elif tags:
+        filter_dict["tags"] = {"$all": tags}
+    
+    # Get questions with sorting; the hot feed keeps pinned questions on top
+    group_field = None
+    if sort_by == "hot":
+        sort_field = "hot_score"
+        group_field = "is_pinned"
+    else:
+        sort_field = sort_by if sort_by in ["created_at", "upvotes", "answer_count", "updated_at", "view_count"] else "created_at"
     
-    # Get questions with sorting
-    sort_field = sort_by if sort_by in ["created_at", "upvotes", "answer_count", "updated_at"] else "created_at"
-    
-    questions = await db.questions.find(filter_dict).sort(sort_field, sort_direction).skip(skip).limit(limit).to_list(limit)
-    total_count = await db.questions.count_documents(filter_dict)
+    questions, next_cursor = await find_page(
+        db.questions, filter_dict, sort_field, sort_direction, limit, cursor, skip, group_field=group_field
+    )
+    total_count = await count_questions_cached(filter_dict) if include_total else None
     
     # Enrich with user information
+    users_info = await get_users_info([question["user_id"] for question in questions])
     enriched_questions = []
     for question in questions:
-        user_info = await get_user_info(question["user_id"])
-        question["user"] = user_info
+        question["user"] = users_info[question["user_id"]]
         enriched_questions.append(Question(**question))
     
-    return {
+    return store_public_cache(question_list_cache, cache_key, request, {
         "questions": enriched_questions,
         "total": total_count,
         "page": page,
         "limit": limit,
-        "total_pages": (total_count + limit - 1) // limit
-    }
+        "total_pages": (total_count + limit - 1) // limit if total_count is not None else None,
+        "next_cursor": next_cursor
+    })
 
 @api_router.get("/questions/{question_id}")
-async def get_question_detail(question_id: str):
+async def get_question_detail(question_id: str, request: Request):
     """Get detailed question with answers and discussions"""
+    cached = get_public_cache(question_detail_cache, question_id, request)
+    if cached:
+        record_view("questions", question_id)
+        return cached
+    
     # Get question
     question = await db.questions.find_one({"id": question_id})
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
+    record_view("questions", question_id)
+    
+    # Get the first page of answers and discussion threads
+    (answers, answers_next_cursor), (threads, threads_next_cursor), discussion_count, related = await asyncio.gather(
+        find_page(db.answers, {"question_id": question_id}, limit=ANSWER_PAGE_SIZE),
+        load_discussion_threads(question_id, None, DISCUSSION_THREAD_PAGE_SIZE, DISCUSSION_PREVIEW_REPLIES),
+        db.discussions.count_documents({"question_id": question_id}),
+        db.related_questions.find_one({"question_id": question_id}, {"_id": 0, "related": 1})
+    )
+    discussions = [message for root, replies in threads for message in [root] + replies]
     
-    # Get question user info
-    question_user = await get_user_info(question["user_id"])
-    question["user"] = question_user
+    # Resolve every author on the page at once
+    users_info = await get_users_info(
+        [question["user_id"]] + [answer["user_id"] for answer in answers] + [discussion["user_id"] for discussion in discussions]
+    )
+    question["user"] = users_info[question["user_id"]]
     
-    # Get answers
-    answers = await db.answers.find({"question_id": question_id}).sort("created_at", -1).to_list(100)
     enriched_answers = []
     for answer in answers:
-        user_info = await get_user_info(answer["user_id"])
-        answer["user"] = user_info
+        answer["user"] = users_info[answer["user_id"]]
         enriched_answers.append(Answer(**answer))
     
-    # Get discussions
-    discussions = await db.discussions.find({"question_id": question_id}).sort("created_at", 1).to_list(100)
+    # Threads are flattened in path order so replies follow their parent
     enriched_discussions = []
     for discussion in discussions:
-        user_info = await get_user_info(discussion["user_id"])
-        discussion["user"] = user_info
+        discussion["user"] = users_info[discussion["user_id"]]
         enriched_discussions.append(Discussion(**discussion))
     
-    return {
+    return store_public_cache(question_detail_cache, question_id, request, {
         "question": Question(**question),
         "answers": enriched_answers,
-        "discussions": enriched_discussions
-    }
+        "answers_next_cursor": answers_next_cursor,
+        "discussions": enriched_discussions,
+        "discussions_next_cursor": threads_next_cursor,
+        "discussion_count": discussion_count,
+        "related_questions": related["related"] if related else []
+    })
 
-@api_router.post("/questions", response_model=Question)
+@api_router.post("/questions", response_model=QuestionCreateResponse)
 async def create_question(question_data: QuestionCreate, current_user: User = Depends(get_current_user)):
     """Create a new question (authenticated users only)"""
     if not question_data.title.strip() or len(question_data.title.strip()) < 5:
@@ -2923,13 +4186,30 @@ async def create_question(question_data: QuestionCreate, current_user: User = De
         **question_data.dict(),
         user_id=current_user.id
     )
+    question.tags = clean_tags(question.tags)
+    question.hot_score = question_hot_score(question.dict())
+    
+    # Look for duplicates before this question joins the index
+    similar_questions = await find_similar_questions(question.title, question.content)
     
     await db.questions.insert_one(question.dict())
+    await adjust_user_stats({current_user.id: {"questions_count": 1}})
+    index_search_document(SearchDocumentType.QUESTION, question.dict())
+    track_question_autocomplete(None, question.dict())
+    duplicate_index.add(question.id, question.title, question.content)
+    await adjust_question_facets(None, question.dict())
+    try:
+        await add_related_question(question.dict())
+    except Exception as e:
+        # Related questions are best effort; the next rebuild links this one
+        logger.error(f"Failed to link related questions for {question.id}: {str(e)}")
     
     # Notify followers of new question
     await notify_followers_of_new_question(current_user.id, question.title, question.id)
+    await record_activity(question_posted_activity(question.dict(), current_user.name))
+    invalidate_question_cache()
     
-    return question
+    return QuestionCreateResponse(**question.dict(), similar_questions=similar_questions)
 
 @api_router.put("/questions/{question_id}", response_model=Question)
 async def update_question(
@@ -2948,12 +4228,25 @@ async def update_question(
     
     # Update fields
     update_data = {k: v for k, v in question_data.dict().items() if v is not None}
+    if "tags" in update_data:
+        update_data["tags"] = clean_tags(update_data["tags"])
     update_data["updated_at"] = datetime.utcnow()
     
     await db.questions.update_one({"id": question_id}, {"$set": update_data})
     
     # Return updated question
     updated_question = await db.questions.find_one({"id": question_id})
+    index_search_document(SearchDocumentType.QUESTION, updated_question)
+    track_question_autocomplete(question, updated_question)
+    duplicate_index.add(question_id, updated_question["title"], updated_question["content"])
+    await adjust_question_facets(question, updated_question)
+    if any(question.get(field) != updated_question.get(field) for field in ("title", "content", "tags")):
+        try:
+            await update_related_question({field: updated_question.get(field) for field in RELATED_PROJECTION if field != "_id"})
+        except Exception as e:
+            # Related questions are best effort; the next rebuild relinks this one
+            logger.error(f"Failed to relink related questions for {question_id}: {str(e)}")
+    invalidate_question_cache(question_id)
     return Question(**updated_question)
 
 @api_router.delete("/questions/{question_id}")
@@ -2968,13 +4261,53 @@ async def delete_question(question_id: str, current_user: User = Depends(get_cur
         raise HTTPException(status_code=403, detail="You can only delete your own questions")
     
     # Delete question and all related data
+    answers = await db.answers.find(
+        {"question_id": question_id}, {"_id": 0, "id": 1, "user_id": 1, "is_accepted": 1}
+    ).to_list(None)
+    answer_ids = [answer["id"] for answer in answers]
+    discussion_ids = await db.discussions.distinct("id", {"question_id": question_id})
     await db.questions.delete_one({"id": question_id})
     await db.answers.delete_many({"question_id": question_id})
+    stats_changes = {question["user_id"]: {"questions_count": -1}}
+    for answer in answers:
+        deltas = stats_changes.setdefault(answer["user_id"], {})
+        deltas["answers_count"] = deltas.get("answers_count", 0) - 1
+        if answer.get("is_accepted"):
+            deltas["accepted_answers"] = deltas.get("accepted_answers", 0) - 1
+    await adjust_user_stats(stats_changes)
     await db.discussions.delete_many({"question_id": question_id})
+    search_index.remove(SearchDocumentType.QUESTION.value, question_id)
+    track_question_autocomplete(question, None)
+    duplicate_index.remove(question_id)
+    await adjust_question_facets(question, None)
+    await remove_related_question(question_id)
+    await delete_votes(VoteTargetType.QUESTION, [question_id])
+    await delete_votes(VoteTargetType.ANSWER, answer_ids)
+    await delete_votes(VoteTargetType.DISCUSSION, discussion_ids)
+    await delete_activities([question_id] + answer_ids)
+    await db.answer_reactions.delete_many({"answer_id": {"$in": answer_ids}})
+    invalidate_question_cache(question_id)
     
     return {"message": "Question deleted successfully"}
 
 # Answers API Endpoints
+ANSWER_PAGE_SIZE = 50
+ANSWER_MAX_PAGE_SIZE = 200
+
+@api_router.get("/questions/{question_id}/answers")
+async def get_answers(question_id: str, cursor: Optional[str] = None, limit: int = ANSWER_PAGE_SIZE):
+    """Page through the answers of a question, newest first"""
+    limit = max(1, min(limit, ANSWER_MAX_PAGE_SIZE))
+    answers, next_cursor = await find_page(db.answers, {"question_id": question_id}, limit=limit, cursor=cursor)
+    
+    users_info = await get_users_info([answer["user_id"] for answer in answers])
+    enriched_answers = []
+    for answer in answers:
+        answer["user"] = users_info[answer["user_id"]]
+        enriched_answers.append(Answer(**answer))
+    
+    return {"answers": enriched_answers, "next_cursor": next_cursor}
+
 @api_router.post("/questions/{question_id}/answers", response_model=Answer)
 async def create_answer(
     question_id: str, 
@@ -2998,13 +4331,16 @@ async def create_answer(
     )
     
     await db.answers.insert_one(answer.dict())
+    await adjust_user_stats({current_user.id: {"answers_count": 1}})
     
     # Update question stats
-    await update_question_stats(question_id)
+    await update_question_counters(question_id, answer_delta=1)
     
     # Notify question author about new answer (if not answering own question)
     if question["user_id"] != current_user.id:
         await notify_question_answered(question_id, current_user.name)
+    await record_activity(answer_posted_activity(answer.dict(), question["title"], current_user.name))
+    invalidate_question_cache(question_id)
     
     return answer
 
@@ -3033,10 +4369,22 @@ async def update_answer(
         
         # If accepting this answer, un-accept all others
         if answer_data.is_accepted:
+            previously_accepted = await db.answers.find(
+                {"question_id": question_id, "is_accepted": True, "id": {"$ne": answer_id}},
+                {"_id": 0, "user_id": 1}
+            ).to_list(None)
             await db.answers.update_many(
                 {"question_id": question_id},
                 {"$set": {"is_accepted": False}}
             )
+            accepted_deltas = {}
+            for previous in previously_accepted:
+                accepted_deltas[previous["user_id"]] = accepted_deltas.get(previous["user_id"], 0) - 1
+            if not answer.get("is_accepted"):
+                accepted_deltas[answer["user_id"]] = accepted_deltas.get(answer["user_id"], 0) + 1
+            await adjust_user_stats({user_id: {"accepted_answers": delta} for user_id, delta in accepted_deltas.items()})
+        elif answer.get("is_accepted"):
+            await adjust_user_stats({answer["user_id"]: {"accepted_answers": -1}})
     
     # Update fields
     update_data = {k: v for k, v in answer_data.dict().items() if v is not None}
@@ -3045,7 +4393,11 @@ async def update_answer(
     await db.answers.update_one({"id": answer_id}, {"$set": update_data})
     
     # Update question stats
-    await update_question_stats(question_id)
+    if answer_data.is_accepted:
+        await update_question_counters(question_id, has_accepted_answer=True)
+    elif answer_data.is_accepted is False and answer.get("is_accepted"):
+        await update_question_counters(question_id, has_accepted_answer=False)
+    invalidate_question_cache(question_id)
     
     # Notify user if their answer was accepted
     if answer_data.is_accepted and answer["user_id"] != current_user.id:
@@ -3071,26 +4423,162 @@ async def delete_answer(
         raise HTTPException(status_code=403, detail="You can only delete your own answers")
     
     await db.answers.delete_one({"id": answer_id})
+    await adjust_user_stats({answer["user_id"]: {"answers_count": -1, "accepted_answers": -1 if answer.get("is_accepted") else 0}})
+    await delete_activities([answer_id])
+    await delete_votes(VoteTargetType.ANSWER, [answer_id])
+    await db.answer_reactions.delete_many({"answer_id": answer_id})
     
     # Update question stats
-    await update_question_stats(question_id)
+    await update_question_counters(
+        question_id, answer_delta=-1, has_accepted_answer=False if answer.get("is_accepted") else None
+    )
+    invalidate_question_cache(question_id)
     
     return {"message": "Answer deleted successfully"}
 
 # Discussions API Endpoints
+# ============================================
+# DISCUSSION THREADS
+# ============================================
+# Every message stores the materialized path of its ancestors. A segment is the
+# zero-padded posting time plus an id prefix, so sorting by path lists a thread
+# depth-first in posting order and a whole subtree is one indexed range scan.
+
+DISCUSSION_THREAD_PAGE_SIZE = 20
+DISCUSSION_PREVIEW_REPLIES = 3
+DISCUSSION_REPLY_PAGE_SIZE = 50
+DISCUSSION_MAX_PAGE_SIZE = 200
+DISCUSSION_MAX_PREVIEW_REPLIES = 20
+DISCUSSION_PATH_END = "~"  # Sorts after every character used in a path
+
+def discussion_path_segment(discussion_id: str, created_at: datetime) -> str:
+    millis = int((created_at - datetime(1970, 1, 1)).total_seconds() * 1000)
+    return f"{millis:013d}.{discussion_id[:8]}/"
+
+def discussion_subtree_filter(discussion: dict) -> dict:
+    """Every reply below a message, in one range over (question_id, path)"""
+    return {
+        "question_id": discussion["question_id"],
+        "path": {"$gt": discussion["path"], "$lt": discussion["path"] + DISCUSSION_PATH_END}
+    }
+
+async def load_discussion_threads(question_id: str, cursor: Optional[str], limit: int, preview_replies: int):
+    """Top-level messages of a question with the first replies of each thread"""
+    roots, next_cursor = await find_page(
+        db.discussions, {"question_id": question_id, "depth": 0},
+        direction=1, limit=limit, cursor=cursor
+    )
+    
+    async def first_replies(root):
+        if not preview_replies or not root.get("thread_reply_count"):
+            return []
+        return await db.discussions.find(discussion_subtree_filter(root)).sort("path", 1).to_list(preview_replies)
+    
+    replies = await asyncio.gather(*[first_replies(root) for root in roots])
+    return list(zip(roots, replies)), next_cursor
+
+async def migrate_discussion_threads():
+    """Give legacy discussion messages a path, depth and reply counters"""
+    question_ids = await db.discussions.distinct("question_id", {"path": {"$exists": False}})
+    for question_id in question_ids:
+        messages = await db.discussions.find(
+            {"question_id": question_id},
+            {"_id": 0, "id": 1, "reply_to_id": 1, "created_at": 1}
+        ).sort("created_at", 1).to_list(None)
+        by_id = {message["id"]: message for message in messages}
+        reply_counts = {}
+        
+        for message in messages:
+            # Parents are older than their replies, so they are placed first
+            parent = by_id.get(message.get("reply_to_id"))
+            if parent is None or "path" not in parent:
+                message.update(path="", depth=-1, thread_id=message["id"])
+            else:
+                message.update(path=parent["path"], depth=parent["depth"], thread_id=parent["thread_id"])
+                reply_counts[parent["id"]] = reply_counts.get(parent["id"], 0) + 1
+                thread_key = parent["thread_id"] + "/thread"
+                reply_counts[thread_key] = reply_counts.get(thread_key, 0) + 1
+            message["path"] += discussion_path_segment(message["id"], message["created_at"])
+            message["depth"] += 1
+        
+        await db.discussions.bulk_write([
+            UpdateOne({"id": message["id"]}, {"$set": {
+                "path": message["path"],
+                "depth": message["depth"],
+                "thread_id": message["thread_id"],
+                "reply_count": reply_counts.get(message["id"], 0),
+                "thread_reply_count": reply_counts.get(message["id"] + "/thread", 0)
+            }})
+            for message in messages
+        ], ordered=False)
+    if question_ids:
+        logger.info(f"Built discussion threads for {len(question_ids)} questions")
+
 @api_router.get("/questions/{question_id}/discussions")
 async def get_discussions(question_id: str):
-    """Get all discussions for a question"""
-    discussions = await db.discussions.find({"question_id": question_id}).sort("created_at", 1).to_list(100)
+    """Get the discussions of a question, threads listed depth-first"""
+    discussions = await db.discussions.find({"question_id": question_id}).sort("path", 1).to_list(100)
     
+    users_info = await get_users_info([discussion["user_id"] for discussion in discussions])
     enriched_discussions = []
     for discussion in discussions:
-        user_info = await get_user_info(discussion["user_id"])
-        discussion["user"] = user_info
+        discussion["user"] = users_info[discussion["user_id"]]
         enriched_discussions.append(Discussion(**discussion))
     
     return enriched_discussions
 
+@api_router.get("/questions/{question_id}/threads")
+async def get_discussion_threads(
+    question_id: str,
+    cursor: Optional[str] = None,
+    limit: int = DISCUSSION_THREAD_PAGE_SIZE,
+    replies: int = DISCUSSION_PREVIEW_REPLIES
+):
+    """Page through top-level discussion threads with their first replies"""
+    limit = max(1, min(limit, DISCUSSION_MAX_PAGE_SIZE))
+    replies = max(0, min(replies, DISCUSSION_MAX_PREVIEW_REPLIES))
+    threads, next_cursor = await load_discussion_threads(question_id, cursor, limit, replies)
+    
+    users_info = await get_users_info([
+        message["user_id"] for root, thread_replies in threads for message in [root] + thread_replies
+    ])
+    result = []
+    for root, thread_replies in threads:
+        for message in [root] + thread_replies:
+            message["user"] = users_info[message["user_id"]]
+        result.append({
+            "thread": Discussion(**root),
+            "replies": [Discussion(**reply) for reply in thread_replies],
+            "has_more_replies": root.get("thread_reply_count", 0) > len(thread_replies)
+        })
+    
+    return {"threads": result, "next_cursor": next_cursor}
+
+@api_router.get("/discussions/{discussion_id}/replies")
+async def get_discussion_replies(
+    discussion_id: str,
+    cursor: Optional[str] = None,
+    limit: int = DISCUSSION_REPLY_PAGE_SIZE
+):
+    """Expand the replies below a message, depth-first in posting order"""
+    limit = max(1, min(limit, DISCUSSION_MAX_PAGE_SIZE))
+    discussion = await db.discussions.find_one({"id": discussion_id}, {"_id": 0, "question_id": 1, "path": 1})
+    if not discussion:
+        raise HTTPException(status_code=404, detail="Discussion message not found")
+    
+    replies, next_cursor = await find_page(
+        db.discussions, discussion_subtree_filter(discussion),
+        sort_field="path", direction=1, limit=limit, cursor=cursor
+    )
+    
+    users_info = await get_users_info([reply["user_id"] for reply in replies])
+    enriched_replies = []
+    for reply in replies:
+        reply["user"] = users_info[reply["user_id"]]
+        enriched_replies.append(Discussion(**reply))
+    
+    return {"replies": enriched_replies, "next_cursor": next_cursor}
+
 @api_router.post("/questions/{question_id}/discussions", response_model=Discussion)
 async def create_discussion(
     question_id: str,
@@ -3106,14 +4594,35 @@ async def create_discussion(
     if not discussion_data.message.strip() or len(discussion_data.message.strip()) < 1:
         raise HTTPException(status_code=400, detail="Discussion message cannot be empty")
     
+    parent = None
+    if discussion_data.reply_to_id:
+        parent = await db.discussions.find_one(
+            {"id": discussion_data.reply_to_id, "question_id": question_id},
+            {"_id": 0, "id": 1, "thread_id": 1, "path": 1, "depth": 1}
+        )
+        if not parent:
+            raise HTTPException(status_code=404, detail="Discussion message to reply to not found")
+    
     # Create discussion
     discussion = Discussion(
         **discussion_data.dict(),
         question_id=question_id,
         user_id=current_user.id
     )
+    segment = discussion_path_segment(discussion.id, discussion.created_at)
+    if parent:
+        discussion.thread_id = parent["thread_id"]
+        discussion.path = parent["path"] + segment
+        discussion.depth = parent["depth"] + 1
+    else:
+        discussion.thread_id = discussion.id
+        discussion.path = segment
     
     await db.discussions.insert_one(discussion.dict())
+    if parent:
+        await db.discussions.update_one({"id": parent["id"]}, {"$inc": {"reply_count": 1}})
+        await db.discussions.update_one({"id": discussion.thread_id}, {"$inc": {"thread_reply_count": 1}})
+    invalidate_question_cache(question_id)
     return discussion
 
 @api_router.put("/questions/{question_id}/discussions/{discussion_id}", response_model=Discussion)
@@ -3137,6 +4646,7 @@ async def update_discussion(
     update_data["updated_at"] = datetime.utcnow()
     
     await db.discussions.update_one({"id": discussion_id}, {"$set": update_data})
+    invalidate_question_cache(question_id)
     
     # Return updated discussion
     updated_discussion = await db.discussions.find_one({"id": discussion_id})
@@ -3157,10 +4667,122 @@ async def delete_discussion(
     if discussion["user_id"] != current_user.id and current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="You can only delete your own messages")
     
-    await db.discussions.delete_one({"id": discussion_id})
+    # Replies go with the message they answer
+    subtree = await db.discussions.find(discussion_subtree_filter(discussion), {"_id": 0, "id": 1}).to_list(None)
+    deleted_ids = [discussion_id] + [reply["id"] for reply in subtree]
+    await db.discussions.delete_many({"id": {"$in": deleted_ids}})
+    await delete_votes(VoteTargetType.DISCUSSION, deleted_ids)
+    
+    if discussion.get("reply_to_id"):
+        await db.discussions.update_one({"id": discussion["reply_to_id"]}, {"$inc": {"reply_count": -1}})
+    if discussion.get("thread_id") and discussion["thread_id"] != discussion_id:
+        await db.discussions.update_one({"id": discussion["thread_id"]}, {"$inc": {"thread_reply_count": -len(deleted_ids)}})
+    invalidate_question_cache(question_id)
     return {"message": "Discussion message deleted successfully"}
 
 # Voting API Endpoints
+VOTE_TARGET_COLLECTIONS = {
+    VoteTargetType.QUESTION: "questions",
+    VoteTargetType.ANSWER: "answers",
+    VoteTargetType.DISCUSSION: "discussions"
+}
+VOTE_COUNTER_FIELDS = {VoteType.UPVOTE: "upvotes", VoteType.DOWNVOTE: "downvotes"}
+MY_VOTES_MAX_IDS = 200
+
+async def record_vote(target_type: VoteTargetType, target_id: str, user_id: str, vote_type: VoteType) -> dict:
+    """Store a user's vote and adjust the target's counters atomically
+    
+    The previous vote is read and replaced in one findAndModify, so concurrent
+    votes by the same user never double count and other voters never conflict.
+    """
+    vote_filter = {"user_id": user_id, "target_type": target_type, "target_id": target_id}
+    now = datetime.utcnow()
+    
+    if vote_type == VoteType.REMOVE:
+        previous = await db.votes.find_one_and_delete(vote_filter)
+    else:
+        vote_update = {
+            "$set": {"vote_type": vote_type, "updated_at": now},
+            "$setOnInsert": {"id": str(uuid.uuid4()), "created_at": now}
+        }
+        try:
+            previous = await db.votes.find_one_and_update(
+                vote_filter, vote_update, upsert=True, return_document=ReturnDocument.BEFORE
+            )
+        except DuplicateKeyError:
+            # A concurrent first vote by the same user inserted the document first
+            previous = await db.votes.find_one_and_update(
+                vote_filter, vote_update, return_document=ReturnDocument.BEFORE
+            )
+    
+    previous_type = previous["vote_type"] if previous else None
+    increments = {}
+    if previous_type != vote_type:
+        if previous_type:
+            increments[VOTE_COUNTER_FIELDS[previous_type]] = -1
+        if vote_type != VoteType.REMOVE:
+            increments[VOTE_COUNTER_FIELDS[vote_type]] = 1
+    
+    collection = db[VOTE_TARGET_COLLECTIONS[target_type]]
+    projection = HOT_SCORE_FIELDS if target_type == VoteTargetType.QUESTION else {"_id": 0, "upvotes": 1, "downvotes": 1}
+    if increments:
+        target = await collection.find_one_and_update(
+            {"id": target_id},
+            {"$inc": increments, "$set": {"updated_at": now}},
+            projection=projection,
+            return_document=ReturnDocument.AFTER
+        )
+        if target_type == VoteTargetType.QUESTION:
+            await store_hot_score(target)
+    else:
+        target = await collection.find_one({"id": target_id}, projection)
+    
+    target = target or {}
+    return {"upvotes": target.get("upvotes", 0), "downvotes": target.get("downvotes", 0)}
+
+async def delete_votes(target_type: VoteTargetType, target_ids: List[str]):
+    """Remove the votes of deleted questions, answers or discussions"""
+    if target_ids:
+        await db.votes.delete_many({"target_type": target_type, "target_id": {"$in": target_ids}})
+
+async def get_user_votes(user_id: str, target_type: VoteTargetType, target_ids: List[str]) -> Dict[str, str]:
+    """Get a user's votes for many targets with one indexed query"""
+    if not target_ids:
+        return {}
+    votes = await db.votes.find(
+        {"user_id": user_id, "target_type": target_type, "target_id": {"$in": target_ids}},
+        {"_id": 0, "target_id": 1, "vote_type": 1}
+    ).to_list(None)
+    return {vote["target_id"]: vote["vote_type"] for vote in votes}
+
+async def migrate_legacy_votes():
+    """Move voter arrays embedded in content documents into the votes collection"""
+    legacy_filter = {"$or": [{"upvoted_by": {"$exists": True}}, {"downvoted_by": {"$exists": True}}]}
+    for target_type, collection_name in VOTE_TARGET_COLLECTIONS.items():
+        collection = db[collection_name]
+        async for doc in collection.find(legacy_filter, {"_id": 0, "id": 1, "upvoted_by": 1, "downvoted_by": 1}):
+            operations = []
+            for vote_type, voters in ((VoteType.UPVOTE, doc.get("upvoted_by") or []), (VoteType.DOWNVOTE, doc.get("downvoted_by") or [])):
+                for voter_id in voters:
+                    operations.append(UpdateOne(
+                        {"user_id": voter_id, "target_type": target_type, "target_id": doc["id"]},
+                        {"$setOnInsert": Vote(target_type=target_type, target_id=doc["id"], user_id=voter_id, vote_type=vote_type).dict()},
+                        upsert=True
+                    ))
+            if operations:
+                await db.votes.bulk_write(operations, ordered=False)
+            await collection.update_one({"id": doc["id"]}, {"$unset": {"upvoted_by": "", "downvoted_by": ""}})
+
+@api_router.get("/my-votes")
+async def get_my_votes(
+    target_type: VoteTargetType,
+    ids: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Get the current user's votes for a comma-separated list of ids"""
+    target_ids = [target_id for target_id in ids.split(",") if target_id][:MY_VOTES_MAX_IDS]
+    return {"votes": await get_user_votes(current_user.id, target_type, target_ids)}
+
 @api_router.post("/questions/{question_id}/vote")
 async def vote_question(
     question_id: str,
@@ -3168,7 +4790,7 @@ async def vote_question(
     current_user: User = Depends(get_current_user)
 ):
     """Vote on a question (upvote/downvote/remove)"""
-    question = await db.questions.find_one({"id": question_id})
+    question = await db.questions.find_one({"id": question_id}, {"_id": 0, "user_id": 1})
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
     
@@ -3176,39 +4798,13 @@ async def vote_question(
     if question["user_id"] == current_user.id:
         raise HTTPException(status_code=400, detail="You cannot vote on your own question")
     
-    user_id = current_user.id
-    upvoted_by = question.get("upvoted_by", [])
-    downvoted_by = question.get("downvoted_by", [])
-    
-    # Remove existing votes first
-    if user_id in upvoted_by:
-        upvoted_by.remove(user_id)
-    if user_id in downvoted_by:
-        downvoted_by.remove(user_id)
-    
-    # Add new vote
-    if vote_data.vote_type == VoteType.UPVOTE:
-        upvoted_by.append(user_id)
-    elif vote_data.vote_type == VoteType.DOWNVOTE:
-        downvoted_by.append(user_id)
-    # For REMOVE, we just removed existing votes above
-    
-    # Update question
-    await db.questions.update_one(
-        {"id": question_id},
-        {"$set": {
-            "upvotes": len(upvoted_by),
-            "downvotes": len(downvoted_by),
-            "upvoted_by": upvoted_by,
-            "downvoted_by": downvoted_by,
-            "updated_at": datetime.utcnow()
-        }}
-    )
+    counts = await record_vote(VoteTargetType.QUESTION, question_id, current_user.id, vote_data.vote_type)
+    invalidate_question_cache(question_id)
     
     return {
         "message": "Vote recorded successfully",
-        "upvotes": len(upvoted_by),
-        "downvotes": len(downvoted_by)
+        "upvotes": counts["upvotes"],
+        "downvotes": counts["downvotes"]
     }
 
 @api_router.post("/answers/{answer_id}/vote")
@@ -3218,7 +4814,7 @@ async def vote_answer(
     current_user: User = Depends(get_current_user)
 ):
     """Vote on an answer (upvote/downvote/remove)"""
-    answer = await db.answers.find_one({"id": answer_id})
+    answer = await db.answers.find_one({"id": answer_id}, {"_id": 0, "user_id": 1, "question_id": 1})
     if not answer:
         raise HTTPException(status_code=404, detail="Answer not found")
     
@@ -3226,38 +4822,13 @@ async def vote_answer(
     if answer["user_id"] == current_user.id:
         raise HTTPException(status_code=400, detail="You cannot vote on your own answer")
     
-    user_id = current_user.id
-    upvoted_by = answer.get("upvoted_by", [])
-    downvoted_by = answer.get("downvoted_by", [])
-    
-    # Remove existing votes first
-    if user_id in upvoted_by:
-        upvoted_by.remove(user_id)
-    if user_id in downvoted_by:
-        downvoted_by.remove(user_id)
-    
-    # Add new vote
-    if vote_data.vote_type == VoteType.UPVOTE:
-        upvoted_by.append(user_id)
-    elif vote_data.vote_type == VoteType.DOWNVOTE:
-        downvoted_by.append(user_id)
-    
-    # Update answer
-    await db.answers.update_one(
-        {"id": answer_id},
-        {"$set": {
-            "upvotes": len(upvoted_by),
-            "downvotes": len(downvoted_by),
-            "upvoted_by": upvoted_by,
-            "downvoted_by": downvoted_by,
-            "updated_at": datetime.utcnow()
-        }}
-    )
+    counts = await record_vote(VoteTargetType.ANSWER, answer_id, current_user.id, vote_data.vote_type)
+    invalidate_question_cache(answer["question_id"])
     
     return {
         "message": "Vote recorded successfully",
-        "upvotes": len(upvoted_by),
-        "downvotes": len(downvoted_by)
+        "upvotes": counts["upvotes"],
+        "downvotes": counts["downvotes"]
     }
 
 @api_router.post("/discussions/{discussion_id}/vote")
@@ -3267,7 +4838,7 @@ async def vote_discussion(
     current_user: User = Depends(get_current_user)
 ):
     """Vote on a discussion message (upvote/downvote/remove)"""
-    discussion = await db.discussions.find_one({"id": discussion_id})
+    discussion = await db.discussions.find_one({"id": discussion_id}, {"_id": 0, "user_id": 1, "question_id": 1})
     if not discussion:
         raise HTTPException(status_code=404, detail="Discussion message not found")
     
@@ -3275,38 +4846,13 @@ async def vote_discussion(
     if discussion["user_id"] == current_user.id:
         raise HTTPException(status_code=400, detail="You cannot vote on your own message")
     
-    user_id = current_user.id
-    upvoted_by = discussion.get("upvoted_by", [])
-    downvoted_by = discussion.get("downvoted_by", [])
-    
-    # Remove existing votes first
-    if user_id in upvoted_by:
-        upvoted_by.remove(user_id)
-    if user_id in downvoted_by:
-        downvoted_by.remove(user_id)
-    
-    # Add new vote
-    if vote_data.vote_type == VoteType.UPVOTE:
-        upvoted_by.append(user_id)
-    elif vote_data.vote_type == VoteType.DOWNVOTE:
-        downvoted_by.append(user_id)
-    
-    # Update discussion
-    await db.discussions.update_one(
-        {"id": discussion_id},
-        {"$set": {
-            "upvotes": len(upvoted_by),
-            "downvotes": len(downvoted_by),
-            "upvoted_by": upvoted_by,
-            "downvoted_by": downvoted_by,
-            "updated_at": datetime.utcnow()
-        }}
-    )
+    counts = await record_vote(VoteTargetType.DISCUSSION, discussion_id, current_user.id, vote_data.vote_type)
+    invalidate_question_cache(discussion["question_id"])
     
     return {
         "message": "Vote recorded successfully",
-        "upvotes": len(upvoted_by),
-        "downvotes": len(downvoted_by)
+        "upvotes": counts["upvotes"],
+        "downvotes": counts["downvotes"]
     }
 
 # Admin Q&A Management Endpoints
@@ -3322,12 +4868,11 @@ async def get_qa_stats(admin_user: User = Depends(get_admin_user)):
     answered_questions = await db.questions.count_documents({"status": "answered"})
     closed_questions = await db.questions.count_documents({"status": "closed"})
     
-    # Questions by subject
-    subjects_pipeline = [
-        {"$group": {"_id": "$subject", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}}
+    # Questions by subject, from the maintained facet counts
+    subjects_stats = [
+        {"_id": row["name"], "count": row["count"]}
+        for row in await get_facet_counts("subject", 100)
     ]
-    subjects_stats = await db.questions.aggregate(subjects_pipeline).to_list(100)
     
     return {
         "total_questions": total_questions,
@@ -3357,6 +4902,7 @@ async def toggle_question_pin(question_id: str, admin_user: User = Depends(get_a
             "updated_at": datetime.utcnow()
         }}
     )
+    invalidate_question_cache(question_id)
     
     return {
         "message": f"Question {'pinned' if new_pin_status else 'unpinned'} successfully",
@@ -3372,24 +4918,39 @@ async def add_emoji_reaction(
 ):
     """Add or update emoji reaction to an answer"""
     # Check if answer exists
-    answer = await db.answers.find_one({"id": answer_id})
+    answer = await db.answers.find_one({"id": answer_id}, {"_id": 0, "id": 1, "question_id": 1})
     if not answer:
         raise HTTPException(status_code=404, detail="Answer not found")
     
-    # Remove existing reaction from this user for this answer
-    await db.answer_reactions.delete_many({
-        "answer_id": answer_id,
-        "user_id": current_user.id
-    })
-    
-    # Add new reaction
+    # Replace this user's reaction, reading the previous one atomically
     reaction = AnswerReaction(
         answer_id=answer_id,
         user_id=current_user.id,
         emoji=reaction_data.emoji
     )
+    reaction_filter = {"answer_id": answer_id, "user_id": current_user.id}
+    reaction_update = {
+        "$set": {"emoji": reaction.emoji},
+        "$setOnInsert": {"id": reaction.id, "created_at": reaction.created_at}
+    }
+    try:
+        previous = await db.answer_reactions.find_one_and_update(
+            reaction_filter, reaction_update, upsert=True, return_document=ReturnDocument.BEFORE
+        )
+    except DuplicateKeyError:
+        # A concurrent request inserted the reaction first; update it instead
+        previous = await db.answer_reactions.find_one_and_update(
+            reaction_filter, reaction_update, upsert=True, return_document=ReturnDocument.BEFORE
+        )
     
-    await db.answer_reactions.insert_one(reaction.dict())
+    # Update emoji counters
+    previous_emoji = previous["emoji"] if previous else None
+    if previous_emoji != reaction.emoji.value:
+        increments = {f"reaction_counts.{reaction.emoji.value}": 1}
+        if previous_emoji:
+            increments[f"reaction_counts.{previous_emoji}"] = -1
+        await db.answers.update_one({"id": answer_id}, {"$inc": increments})
+        invalidate_question_cache(answer["question_id"])
     
     return {"message": "Reaction added successfully", "emoji": reaction_data.emoji.value}
 
@@ -3399,14 +4960,22 @@ async def remove_emoji_reaction(
     current_user: User = Depends(get_current_user)
 ):
     """Remove user's emoji reaction from an answer"""
-    result = await db.answer_reactions.delete_many({
+    reaction = await db.answer_reactions.find_one_and_delete({
         "answer_id": answer_id,
         "user_id": current_user.id
     })
     
-    if result.deleted_count == 0:
+    if not reaction:
         raise HTTPException(status_code=404, detail="No reaction found to remove")
     
+    answer = await db.answers.find_one_and_update(
+        {"id": answer_id},
+        {"$inc": {f"reaction_counts.{reaction['emoji']}": -1}},
+        projection={"_id": 0, "question_id": 1}
+    )
+    if answer:
+        invalidate_question_cache(answer["question_id"])
+    
     return {"message": "Reaction removed successfully"}
 
 @api_router.get("/answers/{answer_id}/reactions")
@@ -3415,19 +4984,14 @@ async def get_answer_reactions(
     current_user: User = Depends(get_current_user)
 ):
     """Get emoji reaction statistics for an answer"""
-    # Get all reactions for this answer
-    reactions = await db.answer_reactions.find({"answer_id": answer_id}).to_list(1000)
-    
-    # Count reactions by emoji
-    emoji_counts = {}
-    user_reaction = None
+    # Counts are maintained on the answer; only the user's own reaction is looked up
+    answer = await db.answers.find_one({"id": answer_id}, {"_id": 0, "reaction_counts": 1})
+    emoji_counts = {emoji: count for emoji, count in ((answer or {}).get("reaction_counts") or {}).items() if count > 0}
     
-    for reaction in reactions:
-        emoji = reaction["emoji"]
-        emoji_counts[emoji] = emoji_counts.get(emoji, 0) + 1
-        
-        if reaction["user_id"] == current_user.id:
-            user_reaction = emoji
+    own_reaction = await db.answer_reactions.find_one(
+        {"answer_id": answer_id, "user_id": current_user.id}, {"_id": 0, "emoji": 1}
+    )
+    user_reaction = own_reaction["emoji"] if own_reaction else None
     
     # Format response
     reaction_stats = []
@@ -3440,18 +5004,24 @@ async def get_answer_reactions(
     
     return {
         "reactions": reaction_stats,
-        "total_reactions": len(reactions),
+        "total_reactions": sum(emoji_counts.values()),
         "user_reaction": user_reaction
     }
 
 @api_router.get("/subjects-available")
 async def get_available_subjects():
     """Get all subjects available in both quizzes and questions (public endpoint)"""
-    # Get subjects from quizzes
-    quiz_subjects = await db.quizzes.distinct("subject")
-    
-    # Get subjects from questions
-    question_subjects = await db.questions.distinct("subject")
+    if autocomplete_ready:
+        # Served from the subject completions, which track usage per source
+        subject_entries = [
+            entry for entry in autocomplete_indexes[AutocompleteKind.SUBJECT].entries.values()
+            if entry["payload"].get("type") == "subject"
+        ]
+        quiz_subjects = [entry["label"] for entry in subject_entries if entry["counts"].get("quiz")]
+        question_subjects = [entry["label"] for entry in subject_entries if entry["counts"].get("question")]
+    else:
+        quiz_subjects = [s for s in await db.quizzes.distinct("subject") if s is not None]
+        question_subjects = [s for s in await db.questions.distinct("subject") if s is not None]
     
     # Combine and remove None values
     all_subjects = list(set(quiz_subjects + question_subjects))
@@ -3614,6 +5184,7 @@ class Notification(BaseModel):
     title: str
     message: str
     related_id: Optional[str] = None  # ID of related question, answer, quiz, etc.
+    item_count: int = 1  # Events summarized by a digest notification
     is_read: bool = False
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -3624,6 +5195,85 @@ class NotificationCreate(BaseModel):
     message: str
     related_id: Optional[str] = None
 
+# =====================================
+# USER STATS
+# =====================================
+# Profile statistics live in one user_stats document per user, adjusted with $inc
+# whenever a question, answer, accepted answer or quiz attempt is added or
+# removed, so a profile page reads them with one lookup. The quiz average is
+# derived from the attempt count and the sum of attempt percentages.
+
+USER_STATS_DEFAULTS = {
+    "questions_count": 0,
+    "answers_count": 0,
+    "accepted_answers": 0,
+    "quizzes_taken": 0,
+    "total_quiz_score": 0.0
+}
+
+async def adjust_user_stats(changes: Dict[str, dict]):
+    """Apply per-user deltas of USER_STATS_DEFAULTS fields to their stats documents"""
+    operations = [
+        UpdateOne({"user_id": user_id}, {"$inc": deltas}, upsert=True)
+        for user_id, deltas in changes.items()
+        if any(deltas.values())
+    ]
+    if operations:
+        await db.user_stats.bulk_write(operations, ordered=False)
+
+async def load_user_stats(user_id: str) -> dict:
+    """Profile statistics of a user, including the average quiz score"""
+    stats = await db.user_stats.find_one({"user_id": user_id}, {"_id": 0, "user_id": 0}) or {}
+    stats = {field: max(stats.get(field, default), default) for field, default in USER_STATS_DEFAULTS.items()}
+    stats["avg_quiz_score"] = stats["total_quiz_score"] / stats["quizzes_taken"] if stats["quizzes_taken"] else 0.0
+    return stats
+
+async def rebuild_user_stats() -> int:
+    """Recompute every user's stats from questions, answers and attempts
+    
+    Stats are read before their sources are aggregated and only rewritten while they
+    still hold the values read, so content added during the rebuild is not dropped.
+    """
+    stored_stats = await db.user_stats.find({}, {"_id": 0}).to_list(None)
+    expected = {}
+    def add(user_id, field, value):
+        expected.setdefault(user_id, dict(USER_STATS_DEFAULTS))[field] = value
+    
+    async for row in db.questions.aggregate([{"$group": {"_id": "$user_id", "count": {"$sum": 1}}}]):
+        add(row["_id"], "questions_count", row["count"])
+    async for row in db.answers.aggregate([
+        {"$group": {"_id": "$user_id", "count": {"$sum": 1}, "accepted": {"$sum": {"$cond": ["$is_accepted", 1, 0]}}}}
+    ]):
+        add(row["_id"], "answers_count", row["count"])
+        add(row["_id"], "accepted_answers", row["accepted"])
+    async for row in db.quiz_attempts.aggregate([
+        {"$group": {"_id": "$user_id", "count": {"$sum": 1}, "score": {"$sum": "$percentage"}}}
+    ]):
+        add(row["_id"], "quizzes_taken", row["count"])
+        add(row["_id"], "total_quiz_score", float(row["score"]))
+    
+    operations = []
+    for row in stored_stats:
+        stored = {field: row.get(field, default) for field, default in USER_STATS_DEFAULTS.items()}
+        values = expected.pop(row["user_id"], USER_STATS_DEFAULTS)
+        # Summed percentages pick up float noise from repeated increments
+        if any(abs(stored[field] - values[field]) > 1e-6 for field in USER_STATS_DEFAULTS):
+            unchanged = {field: row.get(field) for field in USER_STATS_DEFAULTS}
+            operations.append(UpdateOne({"user_id": row["user_id"], **unchanged}, {"$set": values}))
+    for user_id, values in expected.items():
+        # A document created during the rebuild already counts what was added since
+        operations.append(UpdateOne({"user_id": user_id}, {"$setOnInsert": values}, upsert=True))
+    repaired = 0
+    for start in range(0, len(operations), COUNTER_RECONCILE_BATCH_SIZE):
+        repaired += await bulk_write_counters(db.user_stats, operations[start:start + COUNTER_RECONCILE_BATCH_SIZE])
+    return repaired
+
+@api_router.post("/admin/user-stats/rebuild")
+async def rebuild_user_stats_now(admin_user: User = Depends(get_admin_user)):
+    """Recompute all user profile statistics immediately (admin only)"""
+    repaired = await rebuild_user_stats()
+    return {"message": "User stats rebuilt", "repaired": repaired}
+
 # =====================================
 # USER PROFILE ENDPOINTS
 # =====================================
@@ -3641,45 +5291,23 @@ async def get_user_profile(user_id: str, current_user: User = Depends(get_curren
     is_target_private = user.get("is_private", False)
     
     # Check if user can view this profile
-    can_view_full_profile = is_admin or is_own_profile or not is_target_private
+    can_view_full_profile = await can_view_user_activity(current_user, user)
     
     # Check follow relationship for private profiles
     is_following = False
     is_pending_approval = False
     
     if is_target_private and not is_admin and not is_own_profile:
-        # Check if current user follows this private user
-        follow_relation = await db.user_follows.find_one({
-            "follower_id": current_user.id,
-            "following_id": user_id
-        })
-        if follow_relation:
-            is_following = follow_relation.get("status") == "approved"
-            is_pending_approval = follow_relation.get("status") == "pending"
-            can_view_full_profile = is_following
-    
-    # Calculate user statistics (only if can view profile)
-    questions_count = 0
-    answers_count = 0
-    accepted_answers = 0
-    quizzes_taken = 0
-    total_quiz_score = 0.0
-    avg_quiz_score = 0.0
-    
-    if can_view_full_profile:
-        questions_count = await db.questions.count_documents({"user_id": user_id})
-        answers_count = await db.answers.count_documents({"user_id": user_id})
-        accepted_answers = await db.answers.count_documents({"user_id": user_id, "is_accepted": True})
-        
-        # Quiz statistics
-        quiz_attempts = await db.quiz_attempts.find({"user_id": user_id}).to_list(1000)
-        quizzes_taken = len(quiz_attempts)
-        total_quiz_score = sum(attempt.get("percentage", 0) for attempt in quiz_attempts)
-        avg_quiz_score = total_quiz_score / quizzes_taken if quizzes_taken > 0 else 0.0
+        follow_status = await get_follow_status(current_user.id, user_id)
+        is_following = follow_status == FollowStatus.APPROVED
+        is_pending_approval = follow_status == FollowStatus.PENDING
+    
+    # User statistics (only if can view profile)
+    stats = await load_user_stats(user_id) if can_view_full_profile else {**USER_STATS_DEFAULTS, "avg_quiz_score": 0.0}
     
     # Get follower/following counts
-    follower_count = await db.user_follows.count_documents({"following_id": user_id, "status": "approved"})
-    following_count = await db.user_follows.count_documents({"follower_id": user_id, "status": "approved"})
+    follower_count = user.get("follower_count", 0)
+    following_count = user.get("following_count", 0)
     
     # Determine admin badge
     admin_badge = None
@@ -3701,12 +5329,12 @@ async def get_user_profile(user_id: str, current_user: User = Depends(get_curren
         is_private=user.get("is_private", False),
         follower_count=follower_count,
         following_count=following_count,
-        questions_count=questions_count if can_view_full_profile else 0,
-        answers_count=answers_count if can_view_full_profile else 0,
-        quizzes_taken=quizzes_taken if can_view_full_profile else 0,
-        total_quiz_score=total_quiz_score if can_view_full_profile else 0.0,
-        avg_quiz_score=round(avg_quiz_score, 1) if can_view_full_profile else 0.0,
-        accepted_answers=accepted_answers if can_view_full_profile else 0,
+        questions_count=stats["questions_count"],
+        answers_count=stats["answers_count"],
+        quizzes_taken=stats["quizzes_taken"],
+        total_quiz_score=stats["total_quiz_score"],
+        avg_quiz_score=round(stats["avg_quiz_score"], 1),
+        accepted_answers=stats["accepted_answers"],
         is_following=is_following,
         is_pending_approval=is_pending_approval,
         can_view_activity=can_view_full_profile,
@@ -3733,11 +5361,16 @@ async def update_my_profile(
             {"id": current_user.id}, 
             {"$set": update_data}
         )
+        invalidate_user_info(current_user.id)
+        await refresh_search_document(SearchDocumentType.USER, current_user.id)
+        if "name" in update_data:
+            track_user_autocomplete(current_user.id, update_data["name"], current_user.role)
+            await rename_activity_actor(current_user.id, update_data["name"])
     
     return await get_user_profile(current_user.id)
 
 @api_router.get("/users/{user_id}/questions")
-async def get_user_questions(user_id: str, skip: int = 0, limit: int = 20, current_user: User = Depends(get_current_user)):
+async def get_user_questions(user_id: str, skip: int = 0, limit: int = 20, cursor: Optional[str] = None, current_user: User = Depends(get_current_user)):
     """Get questions posted by a specific user (respects privacy settings)"""
     # Check if user exists
     user = await db.users.find_one({"id": user_id})
@@ -3745,20 +5378,7 @@ async def get_user_questions(user_id: str, skip: int = 0, limit: int = 20, curre
         raise HTTPException(status_code=404, detail="User not found")
     
     # Check if current user can view this user's activity
-    is_admin = current_user.role == UserRole.ADMIN
-    is_own_profile = current_user.id == user_id
-    is_target_private = user.get("is_private", False)
-    
-    can_view_activity = is_admin or is_own_profile or not is_target_private
-    
-    # For private profiles, check follow relationship
-    if is_target_private and not is_admin and not is_own_profile:
-        follow_relation = await db.user_follows.find_one({
-            "follower_id": current_user.id,
-            "following_id": user_id,
-            "status": "approved"
-        })
-        can_view_activity = bool(follow_relation)
+    can_view_activity = await can_view_user_activity(current_user, user)
     
     if not can_view_activity:
         return {
@@ -3767,21 +5387,22 @@ async def get_user_questions(user_id: str, skip: int = 0, limit: int = 20, curre
             "can_view": False
         }
     
-    questions = await db.questions.find({"user_id": user_id}).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
+    questions, next_cursor = await find_page(db.questions, {"user_id": user_id}, limit=limit, cursor=cursor, skip=skip)
     
+    users_info = await get_users_info([question["user_id"] for question in questions])
     enriched_questions = []
     for question in questions:
-        user_info = await get_user_info(question["user_id"])
-        question["user"] = user_info
+        question["user"] = users_info[question["user_id"]]
         enriched_questions.append(question)
     
     return {
         "questions": enriched_questions,
-        "can_view": True
+        "can_view": True,
+        "next_cursor": next_cursor
     }
 
 @api_router.get("/users/{user_id}/answers")
-async def get_user_answers(user_id: str, skip: int = 0, limit: int = 20, current_user: User = Depends(get_current_user)):
+async def get_user_answers(user_id: str, skip: int = 0, limit: int = 20, cursor: Optional[str] = None, current_user: User = Depends(get_current_user)):
     """Get answers posted by a specific user (respects privacy settings)"""
     # Check if user exists
     user = await db.users.find_one({"id": user_id})
@@ -3789,20 +5410,7 @@ async def get_user_answers(user_id: str, skip: int = 0, limit: int = 20, current
         raise HTTPException(status_code=404, detail="User not found")
     
     # Check if current user can view this user's activity
-    is_admin = current_user.role == UserRole.ADMIN
-    is_own_profile = current_user.id == user_id
-    is_target_private = user.get("is_private", False)
-    
-    can_view_activity = is_admin or is_own_profile or not is_target_private
-    
-    # For private profiles, check follow relationship
-    if is_target_private and not is_admin and not is_own_profile:
-        follow_relation = await db.user_follows.find_one({
-            "follower_id": current_user.id,
-            "following_id": user_id,
-            "status": "approved"
-        })
-        can_view_activity = bool(follow_relation)
+    can_view_activity = await can_view_user_activity(current_user, user)
     
     if not can_view_activity:
         return {
@@ -3811,26 +5419,32 @@ async def get_user_answers(user_id: str, skip: int = 0, limit: int = 20, current
             "can_view": False
         }
     
-    answers = await db.answers.find({"user_id": user_id}).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
+    answers, next_cursor = await find_page(db.answers, {"user_id": user_id}, limit=limit, cursor=cursor, skip=skip)
+    
+    users_info = await get_users_info([answer["user_id"] for answer in answers])
+    questions = await db.questions.find(
+        {"id": {"$in": list({answer["question_id"] for answer in answers})}},
+        {"_id": 0, "id": 1, "title": 1}
+    ).to_list(None)
+    questions_by_id = {question["id"]: question for question in questions}
     
     enriched_answers = []
     for answer in answers:
-        user_info = await get_user_info(answer["user_id"])
-        answer["user"] = user_info
+        answer["user"] = users_info[answer["user_id"]]
         
         # Get question info
-        question = await db.questions.find_one({"id": answer["question_id"]})
-        answer["question"] = {"id": question["id"], "title": question["title"]} if question else None
+        answer["question"] = questions_by_id.get(answer["question_id"])
         
         enriched_answers.append(answer)
     
     return {
         "answers": enriched_answers,
-        "can_view": True
+        "can_view": True,
+        "next_cursor": next_cursor
     }
 
 @api_router.get("/users/{user_id}/followers")
-async def get_user_followers(user_id: str, skip: int = 0, limit: int = 20, current_user: User = Depends(get_current_user)):
+async def get_user_followers(user_id: str, skip: int = 0, limit: int = 20, cursor: Optional[str] = None, current_user: User = Depends(get_current_user)):
     """Get user's followers list (respects privacy settings)"""
     # Check if user exists
     user = await db.users.find_one({"id": user_id})
@@ -3838,20 +5452,7 @@ async def get_user_followers(user_id: str, skip: int = 0, limit: int = 20, curre
         raise HTTPException(status_code=404, detail="User not found")
     
     # Check if current user can view this user's followers
-    is_admin = current_user.role == UserRole.ADMIN
-    is_own_profile = current_user.id == user_id
-    is_target_private = user.get("is_private", False)
-    
-    can_view_followers = is_admin or is_own_profile or not is_target_private
-    
-    # For private profiles, check follow relationship
-    if is_target_private and not is_admin and not is_own_profile:
-        follow_relation = await db.user_follows.find_one({
-            "follower_id": current_user.id,
-            "following_id": user_id,
-            "status": "approved"
-        })
-        can_view_followers = bool(follow_relation)
+    can_view_followers = await can_view_user_activity(current_user, user)
     
     if not can_view_followers:
         return {
@@ -3861,14 +5462,15 @@ async def get_user_followers(user_id: str, skip: int = 0, limit: int = 20, curre
         }
     
     # Get followers
-    follow_relations = await db.user_follows.find({
+    follow_relations, next_cursor = await find_page(db.follows, {
         "following_id": user_id,
-        "status": "approved"
-    }).skip(skip).limit(limit).to_list(limit)
+        "status": FollowStatus.APPROVED
+    }, limit=limit, cursor=cursor, skip=skip)
     
+    users = await load_users([relation["follower_id"] for relation in follow_relations])
     followers = []
     for relation in follow_relations:
-        follower = await db.users.find_one({"id": relation["follower_id"]})
+        follower = users.get(relation["follower_id"])
         if follower:
             followers.append({
                 "id": follower["id"],
@@ -3882,11 +5484,12 @@ async def get_user_followers(user_id: str, skip: int = 0, limit: int = 20, curre
     
     return {
         "followers": followers,
-        "can_view": True
+        "can_view": True,
+        "next_cursor": next_cursor
     }
 
 @api_router.get("/users/{user_id}/following")
-async def get_user_following(user_id: str, skip: int = 0, limit: int = 20, current_user: User = Depends(get_current_user)):
+async def get_user_following(user_id: str, skip: int = 0, limit: int = 20, cursor: Optional[str] = None, current_user: User = Depends(get_current_user)):
     """Get user's following list (respects privacy settings)"""
     # Check if user exists
     user = await db.users.find_one({"id": user_id})
@@ -3894,20 +5497,7 @@ async def get_user_following(user_id: str, skip: int = 0, limit: int = 20, curre
         raise HTTPException(status_code=404, detail="User not found")
     
     # Check if current user can view this user's following list
-    is_admin = current_user.role == UserRole.ADMIN
-    is_own_profile = current_user.id == user_id
-    is_target_private = user.get("is_private", False)
-    
-    can_view_following = is_admin or is_own_profile or not is_target_private
-    
-    # For private profiles, check follow relationship
-    if is_target_private and not is_admin and not is_own_profile:
-        follow_relation = await db.user_follows.find_one({
-            "follower_id": current_user.id,
-            "following_id": user_id,
-            "status": "approved"
-        })
-        can_view_following = bool(follow_relation)
+    can_view_following = await can_view_user_activity(current_user, user)
     
     if not can_view_following:
         return {
@@ -3917,14 +5507,15 @@ async def get_user_following(user_id: str, skip: int = 0, limit: int = 20, curre
         }
     
     # Get following
-    follow_relations = await db.user_follows.find({
+    follow_relations, next_cursor = await find_page(db.follows, {
         "follower_id": user_id,
-        "status": "approved"
-    }).skip(skip).limit(limit).to_list(limit)
+        "status": FollowStatus.APPROVED
+    }, limit=limit, cursor=cursor, skip=skip)
     
+    users = await load_users([relation["following_id"] for relation in follow_relations])
     following = []
     for relation in follow_relations:
-        followed_user = await db.users.find_one({"id": relation["following_id"]})
+        followed_user = users.get(relation["following_id"])
         if followed_user:
             following.append({
                 "id": followed_user["id"],
@@ -3938,11 +5529,12 @@ async def get_user_following(user_id: str, skip: int = 0, limit: int = 20, curre
     
     return {
         "following": following,
-        "can_view": True
+        "can_view": True,
+        "next_cursor": next_cursor
     }
 
 @api_router.get("/users/{user_id}/activity")
-async def get_user_activity(user_id: str, skip: int = 0, limit: int = 20, current_user: User = Depends(get_current_user)):
+async def get_user_activity(user_id: str, skip: int = 0, limit: int = 20, cursor: Optional[str] = None, current_user: User = Depends(get_current_user)):
     """Get user's recent activity (questions, answers, quiz attempts) - respects privacy settings"""
     # Check if user exists
     user = await db.users.find_one({"id": user_id})
@@ -3950,20 +5542,7 @@ async def get_user_activity(user_id: str, skip: int = 0, limit: int = 20, curren
         raise HTTPException(status_code=404, detail="User not found")
     
     # Check if current user can view this user's activity
-    is_admin = current_user.role == UserRole.ADMIN
-    is_own_profile = current_user.id == user_id
-    is_target_private = user.get("is_private", False)
-    
-    can_view_activity = is_admin or is_own_profile or not is_target_private
-    
-    # For private profiles, check follow relationship
-    if is_target_private and not is_admin and not is_own_profile:
-        follow_relation = await db.user_follows.find_one({
-            "follower_id": current_user.id,
-            "following_id": user_id,
-            "status": "approved"
-        })
-        can_view_activity = bool(follow_relation)
+    can_view_activity = await can_view_user_activity(current_user, user)
     
     if not can_view_activity:
         return {
@@ -3972,68 +5551,63 @@ async def get_user_activity(user_id: str, skip: int = 0, limit: int = 20, curren
             "can_view": False
         }
     
-    activities = []
-    
-    # Get recent questions
-    recent_questions = await db.questions.find({"user_id": user_id}).sort("created_at", -1).limit(10).to_list(10)
-    for question in recent_questions:
-        activities.append({
-            "type": "question_posted",
-            "title": f"Posted a question: {question['title']}",
-            "content": question.get("content", "")[:200] + "..." if len(question.get("content", "")) > 200 else question.get("content", ""),
-            "created_at": question["created_at"],
-            "link": f"/questions/{question['id']}",
-            "subject": question.get("subject"),
-            "upvotes": question.get("upvotes", 0)
-        })
-    
-    # Get recent answers
-    recent_answers = await db.answers.find({"user_id": user_id}).sort("created_at", -1).limit(10).to_list(10)
-    for answer in recent_answers:
-        # Get question title
-        question = await db.questions.find_one({"id": answer["question_id"]})
-        question_title = question["title"] if question else "Unknown Question"
-        
-        activities.append({
-            "type": "answer_posted",
-            "title": f"Answered: {question_title}",
-            "content": answer.get("content", "")[:200] + "..." if len(answer.get("content", "")) > 200 else answer.get("content", ""),
-            "created_at": answer["created_at"],
-            "link": f"/questions/{answer['question_id']}",
-            "is_accepted": answer.get("is_accepted", False),
-            "upvotes": answer.get("upvotes", 0)
-        })
-    
-    # Get recent quiz attempts (high scores only)
-    recent_quiz_attempts = await db.quiz_attempts.find({
-        "user_id": user_id,
-        "percentage": {"$gte": 80}  # Only show high score attempts
-    }).sort("attempted_at", -1).limit(5).to_list(5)
-    
-    for attempt in recent_quiz_attempts:
-        # Get quiz title
-        quiz = await db.quizzes.find_one({"id": attempt["quiz_id"]})
-        quiz_title = quiz["title"] if quiz else "Unknown Quiz"
-        
-        activities.append({
-            "type": "quiz_completed",
-            "title": f"Completed quiz: {quiz_title}",
-            "content": f"Score: {attempt['percentage']:.1f}% ({attempt['score']}/{attempt['total_questions']})",
-            "created_at": attempt["attempted_at"],
-            "link": f"/quiz/{attempt['quiz_id']}/results",
-            "score": attempt["percentage"],
-            "subject": quiz.get("subject") if quiz else None
-        })
-    
-    # Sort all activities by date
-    activities.sort(key=lambda x: x["created_at"], reverse=True)
+    activities, next_cursor = await find_page(
+        db.activities,
+        {"user_id": user_id, "activity_type": {"$in": ACTIVITY_PROFILE_TYPES}},
+        limit=max(1, min(limit, 100)), cursor=cursor, skip=skip, projection={"_id": 0}
+    )
     
-    # Apply pagination
-    paginated_activities = activities[skip:skip + limit]
+    # Vote counts and acceptance change after the activity is written, so they are read live
+    question_ids = [a["source_id"] for a in activities if a["activity_type"] == ActivityType.QUESTION_POSTED]
+    answer_ids = [a["source_id"] for a in activities if a["activity_type"] == ActivityType.ANSWER_POSTED]
+    upvotes = {}
+    accepted_ids = set()
+    for collection, ids in ((db.questions, question_ids), (db.answers, answer_ids)):
+        if ids:
+            async for doc in collection.find({"id": {"$in": ids}}, {"_id": 0, "id": 1, "upvotes": 1, "is_accepted": 1}):
+                upvotes[doc["id"]] = doc.get("upvotes", 0)
+                if doc.get("is_accepted"):
+                    accepted_ids.add(doc["id"])
+    
+    entries = []
+    for activity in activities:
+        metadata = activity.get("metadata", {})
+        if activity["activity_type"] == ActivityType.QUESTION_POSTED:
+            content = metadata.get("content_preview", "")
+            entries.append({
+                "type": "question_posted",
+                "title": f"Posted a question: {metadata.get('question_title', '')}",
+                "content": content + "..." if len(content) >= 200 else content,
+                "created_at": activity["created_at"],
+                "link": f"/questions/{activity['related_id']}",
+                "subject": metadata.get("subject"),
+                "upvotes": upvotes.get(activity["source_id"], 0)
+            })
+        elif activity["activity_type"] == ActivityType.ANSWER_POSTED:
+            entries.append({
+                "type": "answer_posted",
+                "title": f"Answered: {metadata.get('question_title', '')}",
+                "content": metadata.get("answer_preview", ""),
+                "created_at": activity["created_at"],
+                "link": f"/questions/{activity['related_id']}",
+                "is_accepted": activity["source_id"] in accepted_ids,
+                "upvotes": upvotes.get(activity["source_id"], 0)
+            })
+        else:
+            entries.append({
+                "type": "quiz_completed",
+                "title": f"Completed quiz: {metadata.get('quiz_title', '')}",
+                "content": f"Score: {metadata.get('score', 0):.1f}% ({metadata.get('correct')}/{metadata.get('total_questions')})",
+                "created_at": activity["created_at"],
+                "link": f"/quiz/{activity['related_id']}/results",
+                "score": metadata.get("score"),
+                "subject": metadata.get("subject")
+            })
     
     return {
-        "activities": paginated_activities,
-        "total": len(activities),
+        "activities": entries,
+        "total": await db.activities.count_documents({"user_id": user_id, "activity_type": {"$in": ACTIVITY_PROFILE_TYPES}}),
+        "next_cursor": next_cursor,
         "can_view": True
     }
 
@@ -4055,36 +5629,69 @@ async def get_user_quiz_attempts(user_id: str, skip: int = 0, limit: int = 20):
 # NOTIFICATION SYSTEM
 # =====================================
 
+# Each user's notification totals live in one notification_counts document that
+# every write adjusts, so polling the badge is a single primary-key read.
+NOTIFICATION_FANOUT_BATCH_SIZE = 1000
+
+async def adjust_notification_counts(changes: Dict[str, tuple]):
+    """Apply (total, unread) deltas per user to their counter documents"""
+    operations = [
+        UpdateOne({"user_id": user_id}, {"$inc": {"total": total, "unread": unread}}, upsert=True)
+        for user_id, (total, unread) in changes.items()
+        if total or unread
+    ]
+    if operations:
+        await db.notification_counts.bulk_write(operations, ordered=False)
+
+async def insert_notifications(notifications: List[Notification]):
+    """Store new unread notifications and count them for their recipients"""
+    if not notifications:
+        return
+    await db.notifications.insert_many([notification.dict() for notification in notifications], ordered=False)
+    changes = {}
+    for notification in notifications:
+        total, unread = changes.get(notification.user_id, (0, 0))
+        changes[notification.user_id] = (total + 1, unread + 1)
+    await adjust_notification_counts(changes)
+
 async def create_notification(notification_data: NotificationCreate):
     """Helper function to create a notification"""
     notification = Notification(**notification_data.dict())
-    await db.notifications.insert_one(notification.dict())
+    await insert_notifications([notification])
     return notification
 
 @api_router.get("/notifications", response_model=List[Notification])
 async def get_my_notifications(
+    response: Response,
     current_user: User = Depends(get_current_user),
     skip: int = 0,
     limit: int = 50,
-    unread_only: bool = False
+    unread_only: bool = False,
+    cursor: Optional[str] = None
 ):
-    """Get current user's notifications"""
+    """Get current user's notifications (next page cursor in the X-Next-Cursor header)"""
     query = {"user_id": current_user.id}
     if unread_only:
         query["is_read"] = False
     
-    notifications = await db.notifications.find(query).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
+    notifications, next_cursor = await find_page(db.notifications, query, limit=limit, cursor=cursor, skip=skip)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return [Notification(**notification) for notification in notifications]
 
 @api_router.get("/notifications/count")
 async def get_notification_count(current_user: User = Depends(get_current_user)):
     """Get notification counts"""
-    total_count = await db.notifications.count_documents({"user_id": current_user.id})
-    unread_count = await db.notifications.count_documents({"user_id": current_user.id, "is_read": False})
-    
+    return await load_notification_counts(current_user.id)
+
+async def load_notification_counts(user_id: str) -> dict:
+    counts = await db.notification_counts.find_one({"user_id": user_id}, {"_id": 0, "total": 1, "unread": 1})
+    return notification_counts_payload(counts or {})
+
+def notification_counts_payload(counts: dict) -> dict:
     return {
-        "total_count": total_count,
-        "unread_count": unread_count
+        "total_count": max(counts.get("total", 0), 0),
+        "unread_count": max(counts.get("unread", 0), 0)
     }
 
 @api_router.put("/notifications/{notification_id}/read")
@@ -4100,16 +5707,19 @@ async def mark_notification_read(
     
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Notification not found")
+    if result.modified_count:
+        await adjust_notification_counts({current_user.id: (0, -1)})
     
     return {"message": "Notification marked as read"}
 
 @api_router.put("/notifications/mark-all-read")
 async def mark_all_notifications_read(current_user: User = Depends(get_current_user)):
     """Mark all notifications as read for current user"""
-    await db.notifications.update_many(
+    result = await db.notifications.update_many(
         {"user_id": current_user.id, "is_read": False},
         {"$set": {"is_read": True}}
     )
+    await adjust_notification_counts({current_user.id: (0, -result.modified_count)})
     
     return {"message": "All notifications marked as read"}
 
@@ -4119,15 +5729,124 @@ async def delete_notification(
     current_user: User = Depends(get_current_user)
 ):
     """Delete a notification"""
-    result = await db.notifications.delete_one(
-        {"id": notification_id, "user_id": current_user.id}
+    notification = await db.notifications.find_one_and_delete(
+        {"id": notification_id, "user_id": current_user.id},
+        projection={"_id": 0, "is_read": 1}
     )
     
-    if result.deleted_count == 0:
+    if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
+    await adjust_notification_counts({current_user.id: (-1, 0 if notification.get("is_read") else -1)})
     
     return {"message": "Notification deleted"}
 
+# =====================================
+# NOTIFICATION STREAM
+# =====================================
+# Connected clients get new notifications and unread counts over Server-Sent
+# Events instead of polling. Every worker relays notification writes from all
+# workers through a MongoDB change stream, or by polling for its connected users
+# when the deployment has no change streams (a standalone server).
+
+NOTIFICATION_STREAM_HEARTBEAT_SECONDS = 15
+NOTIFICATION_STREAM_POLL_SECONDS = 3
+NOTIFICATION_STREAM_QUEUE_SIZE = 100
+CHANGE_STREAMS_UNSUPPORTED_CODE = 40573
+notification_streams: Dict[str, set] = {}  # user_id -> queues of the user's open streams
+
+def publish_notification_event(user_id: str, event: str, data: dict):
+    for queue in notification_streams.get(user_id, ()):
+        try:
+            queue.put_nowait((event, data))
+        except asyncio.QueueFull:
+            # A stalled client catches up with the next count event
+            pass
+
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+def relay_notification_change(collection_name: str, document: dict):
+    if document.get("user_id") not in notification_streams:
+        return
+    if collection_name == "notifications":
+        document.pop("_id", None)
+        publish_notification_event(document["user_id"], "notification", Notification(**document).dict())
+    else:
+        publish_notification_event(document["user_id"], "count", notification_counts_payload(document))
+
+async def poll_notification_changes():
+    """Relay notification writes by polling, for deployments without change streams"""
+    since = datetime.utcnow()
+    sent_counts = {}
+    while True:
+        await asyncio.sleep(NOTIFICATION_STREAM_POLL_SECONDS)
+        checked_at = datetime.utcnow()
+        user_ids = list(notification_streams)
+        if user_ids:
+            async for notification in db.notifications.find(
+                {"user_id": {"$in": user_ids}, "created_at": {"$gt": since}}
+            ).sort("created_at", 1):
+                relay_notification_change("notifications", notification)
+            async for counts in db.notification_counts.find({"user_id": {"$in": user_ids}}, {"_id": 0}):
+                payload = notification_counts_payload(counts)
+                if sent_counts.get(counts["user_id"]) != payload:
+                    sent_counts[counts["user_id"]] = payload
+                    relay_notification_change("notification_counts", counts)
+        since = checked_at
+
+async def watch_notification_changes():
+    """Relay notification inserts and counter changes to this worker's streams"""
+    pipeline = [{"$match": {
+        "ns.coll": {"$in": ["notifications", "notification_counts"]},
+        "$or": [
+            {"ns.coll": "notifications", "operationType": "insert"},
+            {"ns.coll": "notification_counts", "operationType": {"$in": ["insert", "update", "replace"]}}
+        ]
+    }}]
+    try:
+        async with db.watch(pipeline, full_document="updateLookup") as changes:
+            async for change in changes:
+                if change.get("fullDocument"):
+                    relay_notification_change(change["ns"]["coll"], change["fullDocument"])
+    except OperationFailure as e:
+        if e.code != CHANGE_STREAMS_UNSUPPORTED_CODE:
+            raise
+        logger.info("Change streams unavailable, polling for notification stream events")
+        await poll_notification_changes()
+
+@api_router.get("/notifications/stream")
+async def stream_notifications(request: Request, token: Optional[str] = None):
+    """Push new notifications and unread counts as Server-Sent Events
+    
+    Browsers' EventSource cannot send headers, so the access token may be passed
+    as the token query parameter instead.
+    """
+    current_user = await get_stream_user(request, token)
+    queue = asyncio.Queue(maxsize=NOTIFICATION_STREAM_QUEUE_SIZE)
+    notification_streams.setdefault(current_user.id, set()).add(queue)
+    
+    async def events():
+        try:
+            yield "retry: 5000\n\n"
+            yield format_sse("count", await load_notification_counts(current_user.id))
+            while not await request.is_disconnected():
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=NOTIFICATION_STREAM_HEARTBEAT_SECONDS)
+                    yield format_sse(event, data)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            queues = notification_streams.get(current_user.id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del notification_streams[current_user.id]
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
 # =====================================
 # NOTIFICATION TRIGGERS
 # =====================================
@@ -4283,36 +6002,40 @@ async def get_my_bookmarks(
     current_user: User = Depends(get_current_user),
     item_type: Optional[BookmarkType] = None,
     skip: int = 0,
-    limit: int = 20
+    limit: int = 20,
+    cursor: Optional[str] = None
 ):
     """Get current user's bookmarks with enriched content"""
     query = {"user_id": current_user.id}
     if item_type:
         query["item_type"] = item_type
     
-    bookmarks = await db.bookmarks.find(query).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
+    bookmarks, next_cursor = await find_page(db.bookmarks, query, limit=limit, cursor=cursor, skip=skip)
+    
+    # Load bookmarked items and their authors in batches
+    question_ids = [b["item_id"] for b in bookmarks if b["item_type"] == BookmarkType.QUESTION]
+    quiz_ids = [b["item_id"] for b in bookmarks if b["item_type"] == BookmarkType.QUIZ]
+    questions = await db.questions.find({"id": {"$in": question_ids}}).to_list(None) if question_ids else []
+    quizzes = await resolve_quiz_questions(await db.quizzes.find({"id": {"$in": quiz_ids}}).to_list(None)) if quiz_ids else []
+    users_info = await get_users_info([question["user_id"] for question in questions])
+    for question in questions:
+        question["user"] = users_info[question["user_id"]]
+    items = {
+        BookmarkType.QUESTION: {question["id"]: question for question in questions},
+        BookmarkType.QUIZ: {quiz["id"]: quiz for quiz in quizzes}
+    }
     
     enriched_bookmarks = []
     for bookmark in bookmarks:
         enriched_bookmark = bookmark.copy()
         
-        if bookmark["item_type"] == BookmarkType.QUESTION:
-            # Get question details
-            question = await db.questions.find_one({"id": bookmark["item_id"]})
-            if question:
-                user_info = await get_user_info(question["user_id"])
-                question["user"] = user_info
-                enriched_bookmark["item"] = question
-            
-        elif bookmark["item_type"] == BookmarkType.QUIZ:
-            # Get quiz details
-            quiz = await db.quizzes.find_one({"id": bookmark["item_id"]})
-            if quiz:
-                enriched_bookmark["item"] = quiz
+        item = items.get(bookmark["item_type"], {}).get(bookmark["item_id"])
+        if item:
+            enriched_bookmark["item"] = item
         
         enriched_bookmarks.append(enriched_bookmark)
     
-    return {"bookmarks": enriched_bookmarks}
+    return {"bookmarks": enriched_bookmarks, "next_cursor": next_cursor}
 
 @api_router.get("/bookmarks/check/{item_id}")
 async def check_bookmark_status(
@@ -4329,56 +6052,124 @@ async def check_bookmark_status(
     
     return {"is_bookmarked": bookmark is not None}
 
+# =====================================
+# FOLLOW GRAPH
+# =====================================
+# All follow relationships live in db.follows, one document per follower and
+# followed user with its status. Each worker caches the adjacency of recently
+# used users: who they follow (with the status of every request) and who
+# follows them (approved only). Relationship and privacy checks are then
+# dictionary and set lookups. Writes invalidate both sides locally, and entries
+# expire so changes made by other workers show up within the TTL.
+
+FOLLOW_GRAPH_CACHE_TTL_SECONDS = 30
+FOLLOW_GRAPH_CACHE_MAX_ENTRIES = 20000
+FOLLOW_GRAPH_MAX_CACHED_DEGREE = 5000  # Larger adjacency lists are queried instead of cached
+following_cache = {}  # user_id -> (loaded_at, {followed user id: status} or None when too large)
+followers_cache = {}  # user_id -> (loaded_at, set of approved follower ids or None when too large)
+
+def invalidate_follow_graph(follower_id: str, following_id: str):
+    """Drop cached adjacency of both users after their relationship changes"""
+    following_cache.pop(follower_id, None)
+    followers_cache.pop(following_id, None)
+
+async def load_adjacency(cache: dict, user_id: str, query: dict, field: str, build):
+    now = time.monotonic()
+    cached = cache.get(user_id)
+    if cached and now - cached[0] < FOLLOW_GRAPH_CACHE_TTL_SECONDS:
+        return cached[1]
+    
+    follows = await db.follows.find(query, {"_id": 0, field: 1, "status": 1}).to_list(FOLLOW_GRAPH_MAX_CACHED_DEGREE + 1)
+    adjacency = build(follows) if len(follows) <= FOLLOW_GRAPH_MAX_CACHED_DEGREE else None
+    if len(cache) >= FOLLOW_GRAPH_CACHE_MAX_ENTRIES:
+        cache.clear()
+    cache[user_id] = (now, adjacency)
+    return adjacency
+
+async def get_following_statuses(user_id: str) -> Optional[Dict[str, str]]:
+    """Follow status of every user this user follows or asked to follow, None if too many"""
+    return await load_adjacency(
+        following_cache, user_id, {"follower_id": user_id}, "following_id",
+        lambda follows: {follow["following_id"]: follow["status"] for follow in follows}
+    )
+
+async def get_follower_ids(user_id: str) -> Optional[set]:
+    """Approved followers of a user, None if too many to cache"""
+    return await load_adjacency(
+        followers_cache, user_id, {"following_id": user_id, "status": FollowStatus.APPROVED}, "follower_id",
+        lambda follows: {follow["follower_id"] for follow in follows}
+    )
+
+async def get_follow_status(follower_id: str, following_id: str) -> Optional[FollowStatus]:
+    """Status of the follow from one user to another, None when there is none"""
+    statuses = await get_following_statuses(follower_id)
+    if statuses is None:
+        follow = await db.follows.find_one(
+            {"follower_id": follower_id, "following_id": following_id}, {"_id": 0, "status": 1}
+        )
+        follow_status = follow["status"] if follow else None
+    else:
+        follow_status = statuses.get(following_id)
+    return FollowStatus(follow_status) if follow_status else None
+
+async def is_approved_follower(follower_id: str, following_id: str) -> bool:
+    """Whether one user is an approved follower of another"""
+    followers = followers_cache.get(following_id)
+    if followers and followers[1] is not None and time.monotonic() - followers[0] < FOLLOW_GRAPH_CACHE_TTL_SECONDS:
+        return follower_id in followers[1]
+    return await get_follow_status(follower_id, following_id) == FollowStatus.APPROVED
+
+async def migrate_user_follows():
+    """Move follows from the legacy user_follows collection into db.follows"""
+    if "user_follows" not in await db.list_collection_names():
+        return
+    # Workers start together; the unique marker lets exactly one of them migrate
+    try:
+        await db.migrations.insert_one({"id": "migrate_user_follows", "started_at": datetime.utcnow()})
+    except DuplicateKeyError:
+        return
+    try:
+        migrated = 0
+        async for follow in db.user_follows.find({}, {"_id": 0}):
+            result = await db.follows.update_one(
+                {"follower_id": follow["follower_id"], "following_id": follow["following_id"]},
+                {"$setOnInsert": UserFollow(**follow).dict()},
+                upsert=True
+            )
+            migrated += 1 if result.upserted_id else 0
+        await db.user_follows.drop()
+    except Exception:
+        # Let the next start try again
+        await db.migrations.delete_one({"id": "migrate_user_follows"})
+        raise
+    logger.info(f"Migrated {migrated} legacy follows")
+
 # =====================================
 # PRIVACY AND SOCIAL UTILITY FUNCTIONS
 # =====================================
 
-async def can_view_user_activity(viewer_user_id: str, target_user_id: str) -> bool:
+async def can_view_user_activity(viewer: User, target_user: dict) -> bool:
     """Check if viewer can see target user's activity (questions, answers, etc.)"""
-    # Same user can always view their own content
-    if viewer_user_id == target_user_id:
-        return True
-    
-    # Get target user's privacy settings
-    target_user = await db.users.find_one({"id": target_user_id})
-    if not target_user:
-        return False
-    
-    # Check if viewer is admin - admins can see everything
-    viewer_user = await db.users.find_one({"id": viewer_user_id})
-    if viewer_user and viewer_user.get("role") == UserRole.ADMIN:
+    # Users see their own content, admins see everything, public profiles are open
+    if viewer.id == target_user["id"] or viewer.role == UserRole.ADMIN or not target_user.get("is_private", False):
         return True
     
-    # If target user has private profile
-    if target_user.get("is_private", False):
-        # Check if viewer is an approved follower
-        follow_relationship = await db.follows.find_one({
-            "follower_id": viewer_user_id,
-            "following_id": target_user_id,
-            "status": FollowStatus.APPROVED
-        })
-        return follow_relationship is not None
-    
-    # Public profile - everyone can see
-    return True
+    # Private profiles are visible to approved followers
+    return await is_approved_follower(viewer.id, target_user["id"])
 
-async def get_user_profile_for_viewer(user_id: str, viewer_id: str) -> UserProfile:
+async def get_user_profile_for_viewer(user_id: str, viewer: User) -> UserProfile:
     """Get user profile with appropriate privacy filtering"""
     user = await db.users.find_one({"id": user_id})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    viewer = await db.users.find_one({"id": viewer_id})
-    is_admin_viewer = viewer and viewer.get("role") == UserRole.ADMIN
-    can_view_activity = await can_view_user_activity(viewer_id, user_id)
+    is_admin_viewer = viewer.role == UserRole.ADMIN
+    can_view_activity = await can_view_user_activity(viewer, user)
     
     # Get follow relationship status
-    follow_relationship = await db.follows.find_one({
-        "follower_id": viewer_id,
-        "following_id": user_id
-    })
-    is_following = follow_relationship is not None and follow_relationship.get("status") == FollowStatus.APPROVED
-    is_pending_approval = follow_relationship is not None and follow_relationship.get("status") == FollowStatus.PENDING
+    follow_status = await get_follow_status(viewer.id, user_id)
+    is_following = follow_status == FollowStatus.APPROVED
+    is_pending_approval = follow_status == FollowStatus.PENDING
     
     # Get activity stats if viewer can see them
     activity_stats = {
@@ -4389,20 +6180,12 @@ async def get_user_profile_for_viewer(user_id: str, viewer_id: str) -> UserProfi
     }
     
     if can_view_activity:
-        # Get actual activity stats
-        questions_count = await db.questions.count_documents({"user_id": user_id})
-        answers_count = await db.answers.count_documents({"user_id": user_id})
-        attempts_count = await db.quiz_attempts.count_documents({"user_id": user_id})
-        
-        # Calculate average quiz score
-        attempts = await db.quiz_attempts.find({"user_id": user_id}).to_list(1000)
-        avg_score = sum(a.get("percentage", 0) for a in attempts) / len(attempts) if attempts else 0.0
-        
+        stats = await load_user_stats(user_id)
         activity_stats = {
-            "total_questions": questions_count,
-            "total_answers": answers_count,
-            "total_quiz_attempts": attempts_count,
-            "average_quiz_score": round(avg_score, 1)
+            "total_questions": stats["questions_count"],
+            "total_answers": stats["answers_count"],
+            "total_quiz_attempts": stats["quizzes_taken"],
+            "average_quiz_score": round(stats["avg_quiz_score"], 1)
         }
     
     return UserProfile(
@@ -4424,24 +6207,10 @@ async def get_user_profile_for_viewer(user_id: str, viewer_id: str) -> UserProfi
         can_view_activity=can_view_activity
     )
 
-async def update_user_follow_counts(user_id: str):
-    """Update user's follower and following counts"""
-    follower_count = await db.follows.count_documents({
-        "following_id": user_id,
-        "status": FollowStatus.APPROVED
-    })
-    following_count = await db.follows.count_documents({
-        "follower_id": user_id,
-        "status": FollowStatus.APPROVED
-    })
-    
-    await db.users.update_one(
-        {"id": user_id},
-        {"$set": {
-            "follower_count": follower_count,
-            "following_count": following_count
-        }}
-    )
+async def adjust_follow_counts(follower_id: str, following_id: str, delta: int):
+    """Adjust denormalized follow counts when an approved follow is added or removed"""
+    await db.users.update_one({"id": follower_id}, {"$inc": {"following_count": delta}})
+    await db.users.update_one({"id": following_id}, {"$inc": {"follower_count": delta}})
 
 # =====================================
 # FOLLOWING ENDPOINTS
@@ -4481,6 +6250,7 @@ async def follow_user(
                     "requested_at": datetime.utcnow()
                 }}
             )
+            invalidate_follow_graph(current_user.id, follow_data.user_id)
             return FollowResponse(
                 action="request_sent",
                 message="Follow request sent again",
@@ -4498,11 +6268,18 @@ async def follow_user(
         approved_at=datetime.utcnow() if not is_private else None
     )
     
-    await db.follows.insert_one(follow.dict())
+    try:
+        await db.follows.insert_one(follow.dict())
+    except DuplicateKeyError:
+        # A concurrent request created the follow first
+        raise HTTPException(status_code=400, detail="Already following this user")
+    invalidate_follow_graph(current_user.id, follow_data.user_id)
     
     # Update follow counts
-    await update_user_follow_counts(current_user.id)
-    await update_user_follow_counts(follow_data.user_id)
+    if not is_private:
+        await adjust_follow_counts(current_user.id, follow_data.user_id, 1)
+        await sync_follow_timeline(current_user.id, follow_data.user_id, approved=True)
+        await record_activity(user_followed_activity(follow.dict(), current_user.name, user_to_follow["name"]))
     
     if is_private:
         # Create notification for follow request (temporarily disabled for testing)
@@ -4547,17 +6324,20 @@ async def unfollow_user(
     current_user: User = Depends(get_current_user)
 ):
     """Unfollow a user or cancel follow request"""
-    result = await db.follows.delete_one({
+    follow = await db.follows.find_one_and_delete({
         "follower_id": current_user.id,
         "following_id": user_id
     })
     
-    if result.deleted_count == 0:
+    if not follow:
         raise HTTPException(status_code=404, detail="Not following this user")
+    invalidate_follow_graph(current_user.id, user_id)
     
     # Update follow counts
-    await update_user_follow_counts(current_user.id)
-    await update_user_follow_counts(user_id)
+    if follow["status"] == FollowStatus.APPROVED:
+        await adjust_follow_counts(current_user.id, user_id, -1)
+        await sync_follow_timeline(current_user.id, user_id, approved=False)
+        await delete_activities([follow["id"]])
     
     return FollowResponse(
         action="unfollowed",
@@ -4572,15 +6352,10 @@ async def get_user_follow_stats(
     current_user: User = Depends(get_current_user)
 ):
     """Get follow statistics for a user"""
-    # Only count approved follows for public stats
-    followers_count = await db.follows.count_documents({
-        "following_id": user_id,
-        "status": FollowStatus.APPROVED
-    })
-    following_count = await db.follows.count_documents({
-        "follower_id": user_id,
-        "status": FollowStatus.APPROVED
-    })
+    # Only approved follows are counted, maintained on the user document
+    user = await db.users.find_one({"id": user_id}, {"_id": 0, "follower_count": 1, "following_count": 1}) or {}
+    followers_count = user.get("follower_count", 0)
+    following_count = user.get("following_count", 0)
     
     # For the user's own stats, also show pending requests
     pending_requests_count = 0
@@ -4591,21 +6366,12 @@ async def get_user_follow_stats(
         })
     
     # Check current user's relationship with this user
-    follow_relationship = await db.follows.find_one({
-        "follower_id": current_user.id,
-        "following_id": user_id
-    })
-    
-    is_following = follow_relationship is not None and follow_relationship.get("status") == FollowStatus.APPROVED
-    is_pending_approval = follow_relationship is not None and follow_relationship.get("status") == FollowStatus.PENDING
+    follow_status = await get_follow_status(current_user.id, user_id)
+    is_following = follow_status == FollowStatus.APPROVED
+    is_pending_approval = follow_status == FollowStatus.PENDING
     
     # Check reverse relationship
-    reverse_follow = await db.follows.find_one({
-        "follower_id": user_id,
-        "following_id": current_user.id,
-        "status": FollowStatus.APPROVED
-    })
-    is_followed_by = reverse_follow is not None
+    is_followed_by = await is_approved_follower(user_id, current_user.id)
     
     return UserFollowStats(
         followers_count=followers_count,
@@ -4620,81 +6386,85 @@ async def get_user_follow_stats(
 async def get_my_following(
     current_user: User = Depends(get_current_user),
     skip: int = 0,
-    limit: int = 20
+    limit: int = 20,
+    cursor: Optional[str] = None
 ):
     """Get list of users current user is following"""
-    follows = await db.follows.find({"follower_id": current_user.id}).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
+    follows, next_cursor = await find_page(db.follows, {"follower_id": current_user.id}, limit=limit, cursor=cursor, skip=skip)
     
+    users = await load_users([follow["following_id"] for follow in follows])
     following_users = []
     for follow in follows:
-        user = await db.users.find_one({"id": follow["following_id"]})
+        user = users.get(follow["following_id"])
         if user:
-            user_info = await get_user_info(follow["following_id"])
             following_users.append({
-                "user": user_info,
+                "user": build_user_info(follow["following_id"], user),
                 "followed_at": follow["created_at"]
             })
     
-    return {"following": following_users}
+    return {"following": following_users, "next_cursor": next_cursor}
 
 @api_router.get("/followers")
 async def get_my_followers(
     current_user: User = Depends(get_current_user),
     skip: int = 0,
-    limit: int = 20
+    limit: int = 20,
+    cursor: Optional[str] = None
 ):
     """Get list of users following current user"""
-    follows = await db.follows.find({"following_id": current_user.id}).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
+    follows, next_cursor = await find_page(db.follows, {"following_id": current_user.id}, limit=limit, cursor=cursor, skip=skip)
     
+    users = await load_users([follow["follower_id"] for follow in follows])
     followers = []
     for follow in follows:
-        user = await db.users.find_one({"id": follow["follower_id"]})
+        user = users.get(follow["follower_id"])
         if user:
-            user_info = await get_user_info(follow["follower_id"])
             followers.append({
-                "user": user_info,
+                "user": build_user_info(follow["follower_id"], user),
                 "followed_at": follow["created_at"]
             })
     
-    return {"followers": followers}
+    return {"followers": followers, "next_cursor": next_cursor}
 
 @api_router.get("/users/{user_id}/followers")
 async def get_user_followers(
     user_id: str,
     skip: int = 0,
-    limit: int = 20
+    limit: int = 20,
+    cursor: Optional[str] = None
 ):
     """Get followers of a specific user (public endpoint)"""
-    follows = await db.follows.find({"following_id": user_id}).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
+    follows, next_cursor = await find_page(db.follows, {"following_id": user_id}, limit=limit, cursor=cursor, skip=skip)
     
+    users_info = await get_users_info([follow["follower_id"] for follow in follows])
     followers = []
     for follow in follows:
-        user_info = await get_user_info(follow["follower_id"])
         followers.append({
-            "user": user_info,
+            "user": users_info[follow["follower_id"]],
             "followed_at": follow["created_at"]
         })
     
-    return {"followers": followers}
+    return {"followers": followers, "next_cursor": next_cursor}
 
 @api_router.get("/users/{user_id}/following")
 async def get_user_following(
     user_id: str,
     skip: int = 0,
-    limit: int = 20
+    limit: int = 20,
+    cursor: Optional[str] = None
 ):
     """Get who a specific user is following (public endpoint)"""
-    follows = await db.follows.find({"follower_id": user_id}).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
+    follows, next_cursor = await find_page(db.follows, {"follower_id": user_id}, limit=limit, cursor=cursor, skip=skip)
     
+    users_info = await get_users_info([follow["following_id"] for follow in follows])
     following_users = []
     for follow in follows:
-        user_info = await get_user_info(follow["following_id"])
         following_users.append({
-            "user": user_info,
+            "user": users_info[follow["following_id"]],
             "followed_at": follow["created_at"]
         })
     
-    return {"following": following_users}
+    return {"following": following_users, "next_cursor": next_cursor}
 
 # =====================================
 # FOLLOW REQUEST MANAGEMENT
@@ -4743,17 +6513,25 @@ async def approve_follow_request(
         raise HTTPException(status_code=404, detail="Follow request not found")
     
     # Update follow status to approved
-    await db.follows.update_one(
-        {"id": request_id},
+    result = await db.follows.update_one(
+        {"id": request_id, "status": FollowStatus.PENDING},
         {"$set": {
             "status": FollowStatus.APPROVED,
             "approved_at": datetime.utcnow()
         }}
     )
+    invalidate_follow_graph(follow_request["follower_id"], current_user.id)
     
     # Update follow counts
-    await update_user_follow_counts(current_user.id)
-    await update_user_follow_counts(follow_request["follower_id"])
+    if result.modified_count:
+        await adjust_follow_counts(follow_request["follower_id"], current_user.id, 1)
+        await sync_follow_timeline(follow_request["follower_id"], current_user.id, approved=True)
+        follower = await load_users([follow_request["follower_id"]])
+        if follow_request["follower_id"] in follower:
+            await record_activity(user_followed_activity(
+                {**follow_request, "approved_at": datetime.utcnow()},
+                follower[follow_request["follower_id"]]["name"], current_user.name
+            ))
     
     # Create notification for the requester (temporarily disabled for testing)
     # notification = Notification(
@@ -4793,6 +6571,7 @@ async def reject_follow_request(
         {"id": request_id},
         {"$set": {"status": FollowStatus.REJECTED}}
     )
+    invalidate_follow_graph(follow_request["follower_id"], current_user.id)
     
     return FollowResponse(
         action="request_rejected",
@@ -4829,16 +6608,24 @@ async def update_privacy_settings(
         
         # If changing to public, approve all pending follow requests
         if not settings.is_private:
-            await db.follows.update_many(
-                {"following_id": current_user.id, "status": FollowStatus.PENDING},
-                {"$set": {
-                    "status": FollowStatus.APPROVED,
-                    "approved_at": datetime.utcnow()
-                }}
+            pending_follower_ids = await db.follows.distinct(
+                "follower_id", {"following_id": current_user.id, "status": FollowStatus.PENDING}
             )
-            
-            # Update follow counts
-            await update_user_follow_counts(current_user.id)
+            if pending_follower_ids:
+                result = await db.follows.update_many(
+                    {"following_id": current_user.id, "follower_id": {"$in": pending_follower_ids}, "status": FollowStatus.PENDING},
+                    {"$set": {
+                        "status": FollowStatus.APPROVED,
+                        "approved_at": datetime.utcnow()
+                    }}
+                )
+                
+                # Update follow counts
+                await db.users.update_many({"id": {"$in": pending_follower_ids}}, {"$inc": {"following_count": 1}})
+                await db.users.update_one({"id": current_user.id}, {"$inc": {"follower_count": result.modified_count}})
+                for follower_id in pending_follower_ids:
+                    invalidate_follow_graph(follower_id, current_user.id)
+                    await sync_follow_timeline(follower_id, current_user.id, approved=True)
     
     if update_data:
         await db.users.update_one(
@@ -4854,7 +6641,7 @@ async def get_user_profile(
     current_user: User = Depends(get_current_user)
 ):
     """Get user profile with privacy filtering"""
-    return await get_user_profile_for_viewer(user_id, current_user.id)
+    return await get_user_profile_for_viewer(user_id, current_user)
 
 # =====================================
 # ACTIVITY FEED ENDPOINTS
@@ -4875,186 +6662,321 @@ class ActivityItem(BaseModel):
     title: str
     description: str
     related_id: Optional[str] = None  # ID of quiz, question, etc.
-    created_at: datetime
+    source_id: Optional[str] = None  # Record the activity was created for, to remove it with that record
+    created_at: datetime = Field(default_factory=datetime.utcnow)
     metadata: dict = {}  # Additional data like score, quiz title, etc.
 
+# Activities are written once to `activities` and copied into each approved
+# follower's `timelines` rows, so reading a feed is a single indexed range. Users
+# with very large audiences are not copied; their followers merge them in at read
+# time from `activities` instead.
+ACTIVITY_FANOUT_MAX_FOLLOWERS = 5000
+ACTIVITY_FANOUT_BATCH_SIZE = 1000
+ACTIVITY_FOLLOW_BACKFILL = 50  # Recent activities copied to a new follower's timeline
+ACTIVITY_HIGH_SCORE_PERCENTAGE = 80
+ACTIVITY_PULLED_ACTORS_TTL_SECONDS = 300
+ACTIVITY_BACKFILL_LIMIT = 1000
+ACTIVITY_PROFILE_TYPES = [ActivityType.QUESTION_POSTED, ActivityType.ANSWER_POSTED, ActivityType.QUIZ_COMPLETED]
+pulled_actors_cache = {"loaded_at": None, "ids": set()}
+
+async def get_pulled_actor_ids() -> set:
+    """Users whose activities are merged at read time instead of fanned out"""
+    now = time.monotonic()
+    if pulled_actors_cache["loaded_at"] is None or now - pulled_actors_cache["loaded_at"] > ACTIVITY_PULLED_ACTORS_TTL_SECONDS:
+        pulled_actors_cache["ids"] = set(await db.users.distinct("id", {"follower_count": {"$gt": ACTIVITY_FANOUT_MAX_FOLLOWERS}}))
+        pulled_actors_cache["loaded_at"] = now
+    return pulled_actors_cache["ids"]
+
+async def insert_timeline_rows(rows: List[dict]):
+    # Rows already present, e.g. from a follow backfill, are skipped
+    try:
+        await db.timelines.insert_many(rows, ordered=False)
+    except BulkWriteError as e:
+        if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+            raise
+
+async def fan_out_activity(activity: dict):
+    """Copy an activity into the timelines of its author's approved followers"""
+    if activity["user_id"] in await get_pulled_actor_ids():
+        return
+    rows = []
+    async for follow in db.follows.find(
+        {"following_id": activity["user_id"], "status": FollowStatus.APPROVED}, {"_id": 0, "follower_id": 1}
+    ):
+        rows.append({**activity, "owner_id": follow["follower_id"]})
+        if len(rows) >= ACTIVITY_FANOUT_BATCH_SIZE:
+            await insert_timeline_rows(rows)
+            rows = []
+    if rows:
+        await insert_timeline_rows(rows)
+
+async def record_activity(activity: ActivityItem):
+    """Store an activity and fan it out to followers after the response"""
+    await db.activities.insert_one(activity.dict())
+    run_in_background("fan_out_activity", fan_out_activity(activity.dict()))
+
+async def record_quiz_completed_activity(user: User, quiz: dict, attempt: QuizAttempt):
+    if attempt.percentage < ACTIVITY_HIGH_SCORE_PERCENTAGE:
+        return
+    await record_activity(ActivityItem(
+        activity_type=ActivityType.QUIZ_COMPLETED,
+        user_id=user.id,
+        user_name=user.name,
+        title="Completed a quiz with high score",
+        description=f'Scored {attempt.percentage:.1f}% on "{quiz["title"]}"',
+        related_id=quiz["id"],
+        source_id=attempt.id,
+        created_at=attempt.attempted_at,
+        metadata={
+            "quiz_title": quiz["title"],
+            "subject": quiz.get("subject"),
+            "score": attempt.percentage,
+            "correct": attempt.score,
+            "total_questions": attempt.total_questions,
+            "passed": attempt.passed
+        }
+    ))
+
+async def delete_activities(source_ids: List[str]):
+    """Remove the activities of deleted records from every timeline"""
+    if source_ids:
+        await delete_activities_matching({"source_id": {"$in": source_ids}})
+
+async def delete_activities_matching(activity_filter: dict):
+    """Remove the activities matching a filter from `activities` and every timeline"""
+    activity_ids = await db.activities.distinct("id", activity_filter)
+    if activity_ids:
+        await db.activities.delete_many({"id": {"$in": activity_ids}})
+        await db.timelines.delete_many({"id": {"$in": activity_ids}})
+
+async def sync_follow_timeline(follower_id: str, following_id: str, approved: bool):
+    """Backfill a new follower's timeline, or clear it after an unfollow"""
+    if not approved:
+        await db.timelines.delete_many({"owner_id": follower_id, "user_id": following_id})
+        return
+    if following_id in await get_pulled_actor_ids():
+        return
+    recent = await db.activities.find({"user_id": following_id}, {"_id": 0}).sort(
+        [("created_at", -1), ("id", -1)]
+    ).to_list(ACTIVITY_FOLLOW_BACKFILL)
+    if recent:
+        await insert_timeline_rows([{**activity, "owner_id": follower_id} for activity in recent])
+
+async def rename_activity_actor(user_id: str, name: str):
+    await db.activities.update_many({"user_id": user_id}, {"$set": {"user_name": name}})
+    await db.timelines.update_many({"user_id": user_id}, {"$set": {"user_name": name}})
+
+async def backfill_activities():
+    """Build activities and timelines from existing content on first start"""
+    # Workers start together; the unique marker lets exactly one of them backfill
+    try:
+        await db.migrations.insert_one({"id": "backfill_activities", "started_at": datetime.utcnow()})
+    except DuplicateKeyError:
+        return
+    if await db.activities.find_one({}, {"_id": 1}):
+        return
+    try:
+        await build_backfilled_activities()
+    except Exception:
+        # Let the next start try again
+        await db.migrations.delete_one({"id": "backfill_activities"})
+        raise
+
+async def build_backfilled_activities():
+    activities = []
+    
+    quizzes = await db.quizzes.find(
+        {"is_draft": False, "is_active": True},
+        {"_id": 0, "id": 1, "title": 1, "subject": 1, "total_questions": 1, "created_by": 1, "created_at": 1}
+    ).sort("created_at", -1).to_list(ACTIVITY_BACKFILL_LIMIT)
+    questions = await db.questions.find(
+        {}, {"_id": 0, "id": 1, "title": 1, "subject": 1, "tags": 1, "content": 1, "user_id": 1, "created_at": 1}
+    ).sort("created_at", -1).to_list(ACTIVITY_BACKFILL_LIMIT)
+    answers = await db.answers.find(
+        {}, {"_id": 0, "id": 1, "question_id": 1, "content": 1, "is_accepted": 1, "user_id": 1, "created_at": 1}
+    ).sort("created_at", -1).to_list(ACTIVITY_BACKFILL_LIMIT)
+    attempts = await db.quiz_attempts.find(
+        {"percentage": {"$gte": ACTIVITY_HIGH_SCORE_PERCENTAGE}},
+        {"_id": 0, "id": 1, "quiz_id": 1, "user_id": 1, "percentage": 1, "score": 1, "total_questions": 1, "passed": 1, "attempted_at": 1}
+    ).sort("attempted_at", -1).to_list(ACTIVITY_BACKFILL_LIMIT)
+    follows = await db.follows.find(
+        {"status": FollowStatus.APPROVED}, {"_id": 0, "id": 1, "follower_id": 1, "following_id": 1, "created_at": 1}
+    ).sort("created_at", -1).to_list(ACTIVITY_BACKFILL_LIMIT)
+    
+    question_titles = {question["id"]: question["title"] for question in questions}
+    missing = list({answer["question_id"] for answer in answers} - set(question_titles))
+    async for question in db.questions.find({"id": {"$in": missing}}, {"_id": 0, "id": 1, "title": 1}):
+        question_titles[question["id"]] = question["title"]
+    quiz_info = {quiz["id"]: quiz for quiz in quizzes}
+    missing = list({attempt["quiz_id"] for attempt in attempts} - set(quiz_info))
+    async for quiz in db.quizzes.find({"id": {"$in": missing}}, {"_id": 0, "id": 1, "title": 1, "subject": 1}):
+        quiz_info[quiz["id"]] = quiz
+    users = await load_users(
+        [quiz["created_by"] for quiz in quizzes] + [question["user_id"] for question in questions]
+        + [answer["user_id"] for answer in answers] + [attempt["user_id"] for attempt in attempts]
+        + [follow["follower_id"] for follow in follows] + [follow["following_id"] for follow in follows]
+    )
+    
+    for quiz in quizzes:
+        if quiz["created_by"] in users:
+            activities.append(quiz_published_activity(quiz, users[quiz["created_by"]]["name"]))
+    for question in questions:
+        if question["user_id"] in users:
+            activities.append(question_posted_activity(question, users[question["user_id"]]["name"]))
+    for answer in answers:
+        if answer["user_id"] in users and answer["question_id"] in question_titles:
+            activities.append(answer_posted_activity(answer, question_titles[answer["question_id"]], users[answer["user_id"]]["name"]))
+    for attempt in attempts:
+        quiz = quiz_info.get(attempt["quiz_id"])
+        if attempt["user_id"] in users and quiz:
+            activities.append(ActivityItem(
+                activity_type=ActivityType.QUIZ_COMPLETED,
+                user_id=attempt["user_id"],
+                user_name=users[attempt["user_id"]]["name"],
+                title="Completed a quiz with high score",
+                description=f'Scored {attempt["percentage"]:.1f}% on "{quiz["title"]}"',
+                related_id=quiz["id"],
+                source_id=attempt["id"],
+                created_at=attempt["attempted_at"],
+                metadata={
+                    "quiz_title": quiz["title"],
+                    "subject": quiz.get("subject"),
+                    "score": attempt["percentage"],
+                    "correct": attempt.get("score"),
+                    "total_questions": attempt.get("total_questions"),
+                    "passed": attempt.get("passed", False)
+                }
+            ))
+    for follow in follows:
+        if follow["follower_id"] in users and follow["following_id"] in users:
+            activities.append(user_followed_activity(
+                follow, users[follow["follower_id"]]["name"], users[follow["following_id"]]["name"]
+            ))
+    if not activities:
+        return
+    
+    documents = [activity.dict() for activity in activities]
+    await db.activities.insert_many([dict(document) for document in documents], ordered=False)
+    for document in documents:
+        await fan_out_activity(document)
+    logger.info(f"Backfilled {len(documents)} activities")
+
+def quiz_published_activity(quiz: dict, user_name: str) -> ActivityItem:
+    return ActivityItem(
+        activity_type=ActivityType.QUIZ_PUBLISHED,
+        user_id=quiz["created_by"],
+        user_name=user_name,
+        title="Published a new quiz",
+        description=f'Created "{quiz["title"]}" in {quiz.get("subject", "General")}',
+        related_id=quiz["id"],
+        source_id=quiz["id"],
+        created_at=quiz.get("created_at") or datetime.utcnow(),
+        metadata={
+            "quiz_title": quiz["title"],
+            "subject": quiz.get("subject", "General"),
+            "total_questions": quiz.get("total_questions", 0)
+        }
+    )
+
+def question_posted_activity(question: dict, user_name: str) -> ActivityItem:
+    return ActivityItem(
+        activity_type=ActivityType.QUESTION_POSTED,
+        user_id=question["user_id"],
+        user_name=user_name,
+        title="Posted a question",
+        description=question["title"][:100] + ("..." if len(question["title"]) > 100 else ""),
+        related_id=question["id"],
+        source_id=question["id"],
+        created_at=question["created_at"],
+        metadata={
+            "question_title": question["title"],
+            "content_preview": question.get("content", "")[:200],
+            "subject": question.get("subject") or "General",
+            "tags": question.get("tags", [])
+        }
+    )
+
+def answer_posted_activity(answer: dict, question_title: str, user_name: str) -> ActivityItem:
+    return ActivityItem(
+        activity_type=ActivityType.ANSWER_POSTED,
+        user_id=answer["user_id"],
+        user_name=user_name,
+        title="Answered a question",
+        description=f'Answered "{question_title[:80]}..."',
+        related_id=answer["question_id"],
+        source_id=answer["id"],
+        created_at=answer["created_at"],
+        metadata={
+            "question_title": question_title,
+            "answer_preview": answer["content"][:100],
+            "is_accepted": answer.get("is_accepted", False)
+        }
+    )
+
+def user_followed_activity(follow: dict, follower_name: str, followed_name: str) -> ActivityItem:
+    return ActivityItem(
+        activity_type=ActivityType.USER_FOLLOWED,
+        user_id=follow["follower_id"],
+        user_name=follower_name,
+        title="Started following someone",
+        description=f"Started following {followed_name}",
+        related_id=follow["following_id"],
+        source_id=follow["id"],
+        created_at=follow.get("approved_at") or follow.get("created_at") or datetime.utcnow(),
+        metadata={"followed_user_name": followed_name}
+    )
+
+async def load_activity_page(owner_id: str, limit: int, cursor: Optional[str], offset: int):
+    """A page of someone's feed: their timeline merged with activities of pulled users"""
+    fetch = limit + (0 if cursor else offset)
+    pulled = await get_pulled_actor_ids()
+    pulled_followed = []
+    if pulled:
+        pulled_followed = await db.follows.distinct("following_id", {
+            "follower_id": owner_id, "following_id": {"$in": list(pulled)}, "status": FollowStatus.APPROVED
+        })
+    
+    items, next_cursor = await find_page(db.timelines, {"owner_id": owner_id}, limit=fetch, cursor=cursor, projection={"_id": 0, "owner_id": 0})
+    has_more = next_cursor is not None
+    if pulled_followed:
+        pulled_items, pulled_cursor = await find_page(
+            db.activities, {"user_id": {"$in": pulled_followed}}, limit=fetch, cursor=cursor, projection={"_id": 0}
+        )
+        has_more = has_more or pulled_cursor is not None
+        # Activities copied before their author crossed the fan-out limit appear in both
+        merged = {item["id"]: item for item in items + pulled_items}
+        items = sorted(merged.values(), key=lambda item: (item["created_at"], item["id"]), reverse=True)
+        has_more = has_more or len(items) > fetch
+        items = items[:fetch]
+    
+    page = items[fetch - limit:]
+    next_page_cursor = encode_cursor("created_at", page[-1]["created_at"], page[-1]["id"]) if has_more and page else None
+    return page, next_page_cursor
+
 @api_router.get("/user/activity-feed")
 async def get_activity_feed(
     limit: int = 20,
     offset: int = 0,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
     current_user: User = Depends(get_current_user)
 ):
-    """Get activity feed from followed users"""
-    try:
-        # Get all users that current user follows
-        follows = await db.follows.find({
-            "follower_id": current_user.id,
-            "status": FollowStatus.APPROVED
-        }).to_list(1000)
-        
-        if not follows:
-            return {
-                "activities": [],
-                "total": 0,
-                "has_more": False
-            }
-        
-        followed_user_ids = [follow["following_id"] for follow in follows]
-        
-        activities = []
-        
-        # Get recent quiz publications from followed users
-        recent_quizzes = await db.quizzes.find({
-            "$or": [
-                {"created_by": {"$in": followed_user_ids}, "is_draft": False},
-                {"quiz_owner_id": {"$in": followed_user_ids}, "is_draft": False}
-            ]
-        }).sort("created_at", -1).limit(50).to_list(50)
-        
-        for quiz in recent_quizzes:
-            # Get user info
-            user_info = await db.users.find_one({"id": quiz["created_by"]})
-            if user_info:
-                activities.append({
-                    "id": f"quiz_{quiz['id']}",
-                    "activity_type": ActivityType.QUIZ_PUBLISHED,
-                    "user_id": user_info["id"],
-                    "user_name": user_info["name"],
-                    "title": f"Published a new quiz",
-                    "description": f'Created "{quiz["title"]}" in {quiz.get("subject", "General")}',
-                    "related_id": quiz["id"],
-                    "created_at": quiz["created_at"],
-                    "metadata": {
-                        "quiz_title": quiz["title"],
-                        "subject": quiz.get("subject", "General"),
-                        "total_questions": quiz.get("total_questions", 0)
-                    }
-                })
-        
-        # Get recent questions from followed users
-        recent_questions = await db.questions.find({
-            "user_id": {"$in": followed_user_ids}
-        }).sort("created_at", -1).limit(30).to_list(30)
-        
-        for question in recent_questions:
-            user_info = await db.users.find_one({"id": question["user_id"]})
-            if user_info:
-                activities.append({
-                    "id": f"question_{question['id']}",
-                    "activity_type": ActivityType.QUESTION_POSTED,
-                    "user_id": user_info["id"],
-                    "user_name": user_info["name"],
-                    "title": f"Posted a question",
-                    "description": question["title"][:100] + ("..." if len(question["title"]) > 100 else ""),
-                    "related_id": question["id"],
-                    "created_at": question["created_at"],
-                    "metadata": {
-                        "question_title": question["title"],
-                        "subject": question.get("subject", "General"),
-                        "tags": question.get("tags", [])
-                    }
-                })
-        
-        # Get recent answers from followed users
-        recent_answers = await db.answers.find({
-            "user_id": {"$in": followed_user_ids}
-        }).sort("created_at", -1).limit(20).to_list(20)
-        
-        for answer in recent_answers:
-            # Get the question title for context
-            question = await db.questions.find_one({"id": answer["question_id"]})
-            user_info = await db.users.find_one({"id": answer["user_id"]})
-            
-            if user_info and question:
-                activities.append({
-                    "id": f"answer_{answer['id']}",
-                    "activity_type": ActivityType.ANSWER_POSTED,
-                    "user_id": user_info["id"],
-                    "user_name": user_info["name"],
-                    "title": f"Answered a question",
-                    "description": f'Answered "{question["title"][:80]}..."',
-                    "related_id": question["id"],
-                    "created_at": answer["created_at"],
-                    "metadata": {
-                        "question_title": question["title"],
-                        "answer_preview": answer["content"][:100],
-                        "is_accepted": answer.get("is_accepted", False)
-                    }
-                })
-        
-        # Get recent quiz completions from followed users (high scores only)
-        recent_attempts = await db.quiz_attempts.find({
-            "user_id": {"$in": followed_user_ids},
-            "percentage": {"$gte": 80}  # Only show high-score completions
-        }).sort("attempted_at", -1).limit(15).to_list(15)
-        
-        for attempt in recent_attempts:
-            user_info = await db.users.find_one({"id": attempt["user_id"]})
-            quiz_info = await db.quizzes.find_one({"id": attempt["quiz_id"]})
-            
-            if user_info and quiz_info:
-                activities.append({
-                    "id": f"attempt_{attempt['id']}",
-                    "activity_type": ActivityType.QUIZ_COMPLETED,
-                    "user_id": user_info["id"],
-                    "user_name": user_info["name"],
-                    "title": f"Completed a quiz with high score",
-                    "description": f'Scored {attempt["percentage"]:.1f}% on "{quiz_info["title"]}"',
-                    "related_id": quiz_info["id"],
-                    "created_at": attempt["attempted_at"],
-                    "metadata": {
-                        "quiz_title": quiz_info["title"],
-                        "score": attempt["percentage"],
-                        "passed": attempt.get("passed", False)
-                    }
-                })
-        
-        # Get recent follow activities
-        recent_follows = await db.follows.find({
-            "follower_id": {"$in": followed_user_ids},
-            "status": FollowStatus.APPROVED
-        }).sort("created_at", -1).limit(10).to_list(10)
-        
-        for follow in recent_follows:
-            follower_info = await db.users.find_one({"id": follow["follower_id"]})
-            followed_info = await db.users.find_one({"id": follow["following_id"]})
-            
-            if follower_info and followed_info:
-                activities.append({
-                    "id": f"follow_{follow['id']}",
-                    "activity_type": ActivityType.USER_FOLLOWED,
-                    "user_id": follower_info["id"],
-                    "user_name": follower_info["name"],
-                    "title": f"Started following someone",
-                    "description": f'Started following {followed_info["name"]}',
-                    "related_id": followed_info["id"],
-                    "created_at": follow["created_at"],
-                    "metadata": {
-                        "followed_user_name": followed_info["name"]
-                    }
-                })
-        
-        # Sort all activities by creation time (newest first)
-        activities.sort(key=lambda x: x["created_at"], reverse=True)
-        
-        # Apply pagination
-        total_activities = len(activities)
-        paginated_activities = activities[offset:offset + limit]
-        has_more = offset + limit < total_activities
-        
-        return {
-            "activities": paginated_activities,
-            "total": total_activities,
-            "has_more": has_more,
-            "offset": offset,
-            "limit": limit
-        }
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error fetching activity feed: {str(e)}"
-        )
+    """Get activity feed from followed users
+    
+    Pass the returned next_cursor to get the following page; offsets are kept for
+    older clients. The total counts the user's timeline and can be skipped.
+    """
+    limit = max(1, min(limit, 100))
+    activities, next_cursor = await load_activity_page(current_user.id, limit, cursor, offset)
+    total = await db.timelines.count_documents({"owner_id": current_user.id}) if include_total else None
+    return {
+        "activities": activities,
+        "total": total,
+        "has_more": next_cursor is not None,
+        "next_cursor": next_cursor,
+        "offset": offset,
+        "limit": limit
+    }
 
 # =====================================
 # ENHANCED ADMIN CONTROLS FOR SOCIAL FEATURES
@@ -5108,57 +7030,1947 @@ async def admin_get_user_followers(
 # ENHANCED NOTIFICATION TRIGGERS FOR FOLLOWING
 # =====================================
 
+async def fan_out_follower_notifications(
+    user_id: str,
+    notification_type: NotificationType,
+    title: str,
+    message: str,
+    related_id: str,
+    item_count: int = 1
+):
+    """Send one notification to every approved follower, streamed in chunks"""
+    notifications = []
+    async for follow in db.follows.find(
+        {"following_id": user_id, "status": FollowStatus.APPROVED},
+        {"_id": 0, "follower_id": 1},
+        batch_size=NOTIFICATION_FANOUT_BATCH_SIZE
+    ):
+        notifications.append(Notification(
+            user_id=follow["follower_id"],
+            type=notification_type,
+            title=title,
+            message=message,
+            related_id=related_id,
+            item_count=item_count
+        ))
+        if len(notifications) >= NOTIFICATION_FANOUT_BATCH_SIZE:
+            await insert_notifications(notifications)
+            notifications = []
+    await insert_notifications(notifications)
+
+# Bursts of posts by one user are coalesced per notification type: the first
+# post notifies followers right away and opens a digest window, later posts in
+# that window are only counted, and when the window closes every follower gets
+# one "posted N new questions" notification instead of N of them.
+NOTIFICATION_DIGEST_WINDOW_SECONDS = 600
+NOTIFICATION_DIGEST_FLUSH_INTERVAL_SECONDS = 60
+
+FOLLOWER_NOTIFICATION_TEMPLATES = {
+    NotificationType.FOLLOWED_USER_QUESTION: {
+        "title": "New Question from Followed User",
+        "message": "{name} posted a new question: {item_title}...",
+        "digest_title": "New Questions from Followed User",
+        "digest_message": "{name} posted {count} new questions"
+    },
+    NotificationType.FOLLOWED_USER_QUIZ: {
+        "title": "New Quiz from Followed User",
+        "message": "{name} created a new quiz: {item_title}...",
+        "digest_title": "New Quizzes from Followed User",
+        "digest_message": "{name} created {count} new quizzes"
+    }
+}
+
+async def notify_followers(user_id: str, notification_type: NotificationType, item_title: str, related_id: str):
+    """Notify approved followers of a new item, coalescing bursts into digests"""
+    digest_key = f"{notification_type.value}:{user_id}"
+    now = datetime.utcnow()
+    update = {
+        "$inc": {"count": 1},
+        "$set": {"related_id": related_id},
+        "$setOnInsert": {
+            "user_id": user_id,
+            "type": notification_type,
+            "flush_at": now + timedelta(seconds=NOTIFICATION_DIGEST_WINDOW_SECONDS)
+        }
+    }
+    try:
+        previous = await db.notification_digests.find_one_and_update({"id": digest_key}, update, upsert=True)
+    except DuplicateKeyError:
+        # Another request opened the window concurrently
+        previous = await db.notification_digests.find_one_and_update({"id": digest_key}, update, upsert=True)
+    if previous is not None:
+        return
+    
+    users = await load_users([user_id])
+    if user_id not in users:
+        return
+    template = FOLLOWER_NOTIFICATION_TEMPLATES[notification_type]
+    run_in_background(f"notify_followers:{notification_type.value}", fan_out_follower_notifications(
+        user_id,
+        notification_type,
+        template["title"],
+        template["message"].format(name=users[user_id]["name"], item_title=item_title[:50]),
+        related_id
+    ))
+
+async def flush_notification_digests():
+    """Send one digest per closed window that buffered more than its first event"""
+    now = datetime.utcnow()
+    async for digest in db.notification_digests.find({"flush_at": {"$lte": now}}, {"_id": 0, "id": 1}):
+        # Deleting claims the digest, so only one worker sends it
+        digest = await db.notification_digests.find_one_and_delete({"id": digest["id"], "flush_at": {"$lte": now}})
+        if digest is None or digest["count"] <= 1:
+            continue
+        users = await load_users([digest["user_id"]])
+        if digest["user_id"] not in users:
+            continue
+        
+        buffered = digest["count"] - 1
+        notification_type = NotificationType(digest["type"])
+        template = FOLLOWER_NOTIFICATION_TEMPLATES[notification_type]
+        await fan_out_follower_notifications(
+            digest["user_id"],
+            notification_type,
+            template["digest_title"],
+            template["digest_message"].format(name=users[digest["user_id"]]["name"], count=buffered),
+            digest["related_id"],
+            item_count=buffered
+        )
+
 async def notify_followers_of_new_question(user_id: str, question_title: str, question_id: str):
-    """Notify approved followers when a user posts a new question"""
-    # Get all approved followers of this user
-    follows = await db.follows.find({
-        "following_id": user_id,
-        "status": FollowStatus.APPROVED
-    }).to_list(1000)
+    """Notify approved followers when a user posts a new question, after the response"""
+    await notify_followers(user_id, NotificationType.FOLLOWED_USER_QUESTION, question_title, question_id)
+
+async def notify_followers_of_new_quiz(user_id: str, quiz_title: str, quiz_id: str):
+    """Notify approved followers when a user creates a new quiz, after the response"""
+    await notify_followers(user_id, NotificationType.FOLLOWED_USER_QUIZ, quiz_title, quiz_id)
+
+# =====================================
+# ADAPTIVE TESTING (CAT)
+# =====================================
+
+IRT_THETA_GRID = np.linspace(-4.0, 4.0, 81)  # Ability grid for lookup tables and posteriors
+IRT_MIN_DISCRIMINATION = 0.2
+IRT_MAX_DISCRIMINATION = 4.0
+IRT_MIN_RESPONDENTS = 30  # First attempts needed before a quiz can be calibrated
+CAT_TABLE_TTL_SECONDS = 300
+CAT_CALIBRATION_INTERVAL_SECONDS = 6 * 60 * 60
+cat_table_cache = {}  # quiz_id -> precomputed item information tables
+
+class ItemParameters(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    quiz_id: str
+    question_id: str
+    discrimination: float  # 2PL "a" parameter
+    difficulty: float  # 2PL "b" parameter
+    respondents: int
+    calibrated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class AdaptiveSessionCreate(BaseModel):
+    quiz_id: str
+
+class AdaptiveAnswerRequest(BaseModel):
+    answer: str
+
+class AdaptiveSession(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    quiz_id: str
+    user_id: str
+    status: QuizSessionStatus = QuizSessionStatus.ACTIVE
+    current_question_id: Optional[str] = None
+    administered: List[str] = []  # Question IDs in the order they were asked
+    responses: List[dict] = []  # question_id, answer, is_correct, points_earned
+    log_posterior: List[float] = []  # Ability posterior over IRT_THETA_GRID
+    ability: float = 0.0
+    standard_error: float = 1.0
+    max_questions: int
+    target_se: float
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    completed_at: Optional[datetime] = None
+
+def calibrate_2pl(responses: np.ndarray, iterations: int = 100, tolerance: float = 1e-4):
+    """Estimate 2PL item parameters by joint maximum likelihood with vectorized Fisher scoring"""
+    x = responses.astype(float)
+    theta_limit = IRT_THETA_GRID[-1]
+    
+    # Start from the logits of observed proportions correct
+    person_p = np.clip(x.mean(axis=1), 0.05, 0.95)
+    item_p = np.clip(x.mean(axis=0), 0.05, 0.95)
+    theta = np.log(person_p / (1 - person_p))
+    theta = (theta - theta.mean()) / (theta.std() or 1.0)
+    a = np.ones(x.shape[1])
+    b = -np.log(item_p / (1 - item_p))
+    
+    for _ in range(iterations):
+        # Ability step with items fixed, then rescale to mean 0 / sd 1 to identify the model
+        p = 1 / (1 + np.exp(-a * (theta[:, None] - b)))
+        gradient = ((x - p) * a).sum(axis=1)
+        information = (p * (1 - p) * a ** 2).sum(axis=1)
+        theta = np.clip(theta + gradient / np.maximum(information, 1e-6), -theta_limit, theta_limit)
+        theta = (theta - theta.mean()) / (theta.std() or 1.0)
+        
+        # Item step with abilities fixed: a 2x2 Fisher scoring update per item, solved in closed form
+        z = theta[:, None] - b
+        p = 1 / (1 + np.exp(-a * z))
+        w = p * (1 - p)
+        residual = x - p
+        grad_a = (residual * z).sum(axis=0)
+        grad_b = -a * residual.sum(axis=0)
+        info_aa = (w * z ** 2).sum(axis=0)
+        info_bb = a ** 2 * w.sum(axis=0)
+        info_ab = -a * (w * z).sum(axis=0)
+        det = info_aa * info_bb - info_ab ** 2
+        det = np.where(np.abs(det) > 1e-9, det, 1e-9)
+        step_a = np.clip((info_bb * grad_a - info_ab * grad_b) / det, -0.5, 0.5)
+        step_b = np.clip((info_aa * grad_b - info_ab * grad_a) / det, -0.5, 0.5)
+        a = np.clip(a + step_a, IRT_MIN_DISCRIMINATION, IRT_MAX_DISCRIMINATION)
+        b = np.clip(b + step_b, -theta_limit, theta_limit)
+        
+        if max(np.abs(step_a).max(), np.abs(step_b).max()) < tolerance:
+            break
+    
+    return a, b
+
+async def calibrate_quiz_items(quiz_id: str) -> List[ItemParameters]:
+    """Calibrate 2PL parameters for every question of a quiz from users' first attempts"""
+    quiz = await find_quiz({"id": quiz_id}, {"_id": 0, "questions": 1, "questions_updated_at": 1})
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    
+    questions = [QuizQuestion(**q) for q in quiz.get("questions", [])]
+    snapshot = await load_item_analysis_state(quiz_id, quiz, questions)
+    scores = snapshot["scores"]
+    if scores.shape[0] < IRT_MIN_RESPONDENTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At least {IRT_MIN_RESPONDENTS} users must attempt the quiz before it can be calibrated"
+        )
+    
+    # Full points on an item counts as a correct response
+    max_points = np.array([q.points for q in questions], dtype=float)
+    responses = scores >= max_points
+    a, b = await asyncio.to_thread(calibrate_2pl, responses)
+    
+    calibrated_at = datetime.utcnow()
+    parameters = [
+        ItemParameters(
+            quiz_id=quiz_id,
+            question_id=question.id,
+            discrimination=round(float(a[j]), 4),
+            difficulty=round(float(b[j]), 4),
+            respondents=int(responses.shape[0]),
+            calibrated_at=calibrated_at
+        )
+        for j, question in enumerate(questions)
+    ]
+    
+    # Upserting in place keeps the previous parameters readable until replaced
+    await db.item_parameters.bulk_write([
+        UpdateOne(
+            {"quiz_id": quiz_id, "question_id": param.question_id},
+            {"$set": param.dict(exclude={"id"}), "$setOnInsert": {"id": param.id}},
+            upsert=True
+        )
+        for param in parameters
+    ], ordered=False)
+    await db.item_parameters.delete_many({
+        "quiz_id": quiz_id,
+        "question_id": {"$nin": [question.id for question in questions]}
+    })
+    await db.quizzes.update_one({"id": quiz_id}, {"$set": {"irt_calibrated_at": calibrated_at}})
+    cat_table_cache.pop(quiz_id, None)
+    
+    return parameters
+
+async def get_cat_tables(quiz_id: str) -> Optional[dict]:
+    """Get precomputed response and information tables over the ability grid for a quiz"""
+    tables = cat_table_cache.get(quiz_id)
+    if tables and time.monotonic() - tables["loaded_at"] < CAT_TABLE_TTL_SECONDS:
+        return tables
+    
+    parameters = await db.item_parameters.find({"quiz_id": quiz_id}, {"_id": 0}).to_list(None)
+    if not parameters:
+        cat_table_cache.pop(quiz_id, None)
+        return None
+    
+    tables = build_cat_tables(parameters)
+    cat_table_cache[quiz_id] = tables
+    return tables
+
+def build_cat_tables(parameters: List[dict]) -> dict:
+    a = np.array([param["discrimination"] for param in parameters])
+    b = np.array([param["difficulty"] for param in parameters])
+    p = 1 / (1 + np.exp(-a * (IRT_THETA_GRID[:, None] - b)))
+    information = a ** 2 * p * (1 - p)
+    
+    tables = {
+        "loaded_at": time.monotonic(),
+        "question_ids": [param["question_id"] for param in parameters],
+        "log_p": np.log(p),
+        "log_q": np.log1p(-p),
+        # Items ordered from most to least informative at every grid point
+        "by_information": np.argsort(-information, axis=1, kind="stable")
+    }
+    tables["index"] = {question_id: j for j, question_id in enumerate(tables["question_ids"])}
+    return tables
+
+def select_next_item(tables: dict, ability: float, administered: List[str], available: dict) -> Optional[str]:
+    """Pick the most informative unused question at the current ability estimate"""
+    g = min(int(np.searchsorted(IRT_THETA_GRID, ability)), len(IRT_THETA_GRID) - 1)
+    used = set(administered)
+    for j in tables["by_information"][g]:
+        question_id = tables["question_ids"][j]
+        if question_id not in used and question_id in available:
+            return question_id
+    return None
+
+def summarize_posterior(log_posterior: np.ndarray):
+    """Expected a posteriori ability and its standard error"""
+    posterior = np.exp(log_posterior - log_posterior.max())
+    posterior /= posterior.sum()
+    ability = float((IRT_THETA_GRID * posterior).sum())
+    standard_error = float(np.sqrt(((IRT_THETA_GRID - ability) ** 2 * posterior).sum()))
+    return ability, standard_error
+
+def public_question_view(question: QuizQuestion) -> dict:
+    """Question as shown to a test taker, without answer keys"""
+    return {
+        "id": question.id,
+        "question_text": question.question_text,
+        "question_type": question.question_type,
+        "options": [opt.text for opt in question.options],
+        "multiple_correct": question.multiple_correct,
+        "image_url": question.image_url,
+        "pdf_url": question.pdf_url,
+        "difficulty": question.difficulty,
+        "points": question.points
+    }
+
+def adaptive_session_response(session: dict, plan: dict) -> dict:
+    """Session summary plus the question to answer next, if any"""
+    current = plan["questions"].get(session.get("current_question_id")) if session.get("current_question_id") else None
+    return {
+        "id": session["id"],
+        "quiz_id": session["quiz_id"],
+        "status": session["status"],
+        "questions_answered": len(session["responses"]),
+        "max_questions": session["max_questions"],
+        "ability": round(session["ability"], 3),
+        "standard_error": round(session["standard_error"], 3),
+        "correct_count": sum(1 for r in session["responses"] if r["is_correct"]),
+        "question": public_question_view(current[1]) if current else None,
+        "completed_at": session.get("completed_at")
+    }
+
+@api_router.post("/admin/quiz/{quiz_id}/calibrate")
+async def calibrate_quiz(quiz_id: str, admin_user: User = Depends(get_admin_user)):
+    """Calibrate IRT parameters for a quiz from recorded attempts (admin only)"""
+    parameters = await calibrate_quiz_items(quiz_id)
+    return {
+        "message": "Quiz calibrated successfully",
+        "respondents": parameters[0].respondents if parameters else 0,
+        "item_parameters": parameters
+    }
+
+@api_router.get("/admin/quiz/{quiz_id}/item-parameters", response_model=List[ItemParameters])
+async def get_item_parameters(quiz_id: str, admin_user: User = Depends(get_admin_user)):
+    """Get calibrated IRT parameters for a quiz (admin only)"""
+    parameters = await db.item_parameters.find({"quiz_id": quiz_id}).to_list(1000)
+    return [ItemParameters(**param) for param in parameters]
+
+@api_router.post("/adaptive-session/start")
+async def start_adaptive_session(session_data: AdaptiveSessionCreate, current_user: User = Depends(get_current_user)):
+    """Start an adaptive quiz session and get the first question"""
+    if current_user.role == UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admins cannot take quizzes")
+    
+    quiz = await db.quizzes.find_one(
+        {"id": session_data.quiz_id, "is_active": True, "is_draft": False},
+        {"_id": 0, "is_adaptive": 1, "adaptive_max_questions": 1, "adaptive_target_se": 1}
+    )
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found or not published")
+    if not quiz.get("is_adaptive", False):
+        raise HTTPException(status_code=400, detail="Quiz is not adaptive")
+    
+    plan = await get_practice_plan(session_data.quiz_id)
+    tables = await get_cat_tables(session_data.quiz_id)
+    if not plan or not tables:
+        raise HTTPException(status_code=400, detail="Adaptive quiz has not been calibrated yet")
+    
+    # Check access permissions for public quizzes
+    if plan["is_public"] and current_user.id not in plan["allowed_users"]:
+        raise HTTPException(status_code=403, detail="You don't have access to this quiz")
+    
+    existing_session = await db.adaptive_sessions.find_one({
+        "quiz_id": session_data.quiz_id,
+        "user_id": current_user.id,
+        "status": QuizSessionStatus.ACTIVE
+    })
+    if existing_session:
+        raise HTTPException(status_code=400, detail="You already have an active session for this quiz")
+    
+    # Standard normal prior over the ability grid
+    log_prior = -0.5 * IRT_THETA_GRID ** 2
+    ability, standard_error = summarize_posterior(log_prior)
+    
+    session = AdaptiveSession(
+        quiz_id=session_data.quiz_id,
+        user_id=current_user.id,
+        log_posterior=log_prior.tolist(),
+        ability=ability,
+        standard_error=standard_error,
+        max_questions=quiz.get("adaptive_max_questions") or len(plan["questions"]),
+        target_se=quiz.get("adaptive_target_se", 0.3)
+    )
+    session.current_question_id = select_next_item(tables, ability, [], plan["questions"])
+    if not session.current_question_id:
+        raise HTTPException(status_code=400, detail="Adaptive quiz has no calibrated questions; it must be recalibrated")
+    
+    await db.adaptive_sessions.insert_one(session.dict())
+    return adaptive_session_response(session.dict(), plan)
+
+async def abandon_adaptive_session(session_id: str):
+    """Close an active adaptive session that can no longer continue"""
+    await db.adaptive_sessions.update_one(
+        {"id": session_id, "status": QuizSessionStatus.ACTIVE},
+        {"$set": {
+            "status": QuizSessionStatus.ABANDONED,
+            "current_question_id": None,
+            "updated_at": datetime.utcnow()
+        }}
+    )
+
+@api_router.post("/adaptive-session/{session_id}/answer")
+async def answer_adaptive_question(session_id: str, answer_data: AdaptiveAnswerRequest, current_user: User = Depends(get_current_user)):
+    """Answer the current question of an adaptive session and get the next one"""
+    session = await db.adaptive_sessions.find_one({"id": session_id, "user_id": current_user.id})
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    if session["status"] != QuizSessionStatus.ACTIVE or not session.get("current_question_id"):
+        raise HTTPException(status_code=400, detail="Session is not active")
+    
+    plan = await get_practice_plan(session["quiz_id"])
+    tables = await get_cat_tables(session["quiz_id"])
+    if not plan or not tables:
+        await abandon_adaptive_session(session_id)
+        raise HTTPException(status_code=404, detail="Quiz not found or not published")
+    
+    question_id = session["current_question_id"]
+    entry = plan["questions"].get(question_id)
+    j = tables["index"].get(question_id)
+    if not entry or j is None:
+        await abandon_adaptive_session(session_id)
+        raise HTTPException(status_code=409, detail="Quiz changed during the session")
+    
+    question_index, question = entry
+    result = grade_question(question, answer_data.answer, question_index)
+    
+    # Posterior update is one precomputed table row added over the ability grid
+    log_posterior = np.array(session["log_posterior"])
+    log_posterior += tables["log_p"][:, j] if result["is_correct"] else tables["log_q"][:, j]
+    ability, standard_error = summarize_posterior(log_posterior)
+    
+    administered = session["administered"] + [question_id]
+    next_question_id = None
+    if len(administered) < session["max_questions"] and standard_error > session["target_se"]:
+        next_question_id = select_next_item(tables, ability, administered, plan["questions"])
+    
+    now = datetime.utcnow()
+    update_fields = {
+        "log_posterior": log_posterior.tolist(),
+        "ability": ability,
+        "standard_error": standard_error,
+        "current_question_id": next_question_id,
+        "updated_at": now
+    }
+    if next_question_id is None:
+        update_fields["status"] = QuizSessionStatus.COMPLETED
+        update_fields["completed_at"] = now
+    
+    response = {
+        "question_id": question_id,
+        "answer": answer_data.answer,
+        "is_correct": result["is_correct"],
+        "points_earned": result["points_earned"]
+    }
+    
+    # Guard on the current question so a double submit cannot advance the session twice
+    update_result = await db.adaptive_sessions.update_one(
+        {"id": session_id, "current_question_id": question_id, "status": QuizSessionStatus.ACTIVE},
+        {"$set": update_fields, "$push": {"administered": question_id, "responses": response}}
+    )
+    if update_result.matched_count == 0:
+        raise HTTPException(status_code=409, detail="Question was already answered")
+    
+    session.update(update_fields)
+    session["administered"] = administered
+    session["responses"] = session["responses"] + [response]
+    
+    return {
+        "result": {
+            "is_correct": result["is_correct"],
+            "correct_answer": result["correct_answer"],
+            "explanation": result.get("explanation")
+        },
+        "session": adaptive_session_response(session, plan)
+    }
+
+@api_router.post("/adaptive-session/{session_id}/abandon")
+async def abandon_adaptive_session_endpoint(session_id: str, current_user: User = Depends(get_current_user)):
+    """Give up an active adaptive session so the quiz can be started again"""
+    session = await db.adaptive_sessions.find_one({"id": session_id, "user_id": current_user.id}, {"_id": 0, "status": 1})
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if session["status"] != QuizSessionStatus.ACTIVE:
+        raise HTTPException(status_code=400, detail="Session is not active")
+    
+    await abandon_adaptive_session(session_id)
+    return {"message": "Session abandoned"}
+
+@api_router.get("/adaptive-session/{session_id}")
+async def get_adaptive_session(session_id: str, current_user: User = Depends(get_current_user)):
+    """Get the state of an adaptive session, including the current question"""
+    session = await db.adaptive_sessions.find_one({"id": session_id, "user_id": current_user.id})
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    plan = await get_practice_plan(session["quiz_id"])
+    if not plan:
+        raise HTTPException(status_code=404, detail="Quiz not found or not published")
+    
+    return adaptive_session_response(session, plan)
+
+async def recalibrate_adaptive_quizzes():
+    """Periodic offline calibration of every published adaptive quiz"""
+    quizzes = await db.quizzes.find(
+        {"is_adaptive": True, "is_active": True, "is_draft": False},
+        {"_id": 0, "id": 1}
+    ).to_list(None)
+    
+    for quiz in quizzes:
+        try:
+            await calibrate_quiz_items(quiz["id"])
+        except HTTPException as e:
+            logger.info(f"Skipping calibration of quiz {quiz['id']}: {e.detail}")
+
+# =====================================
+# FULL-TEXT SEARCH
+# =====================================
+
+SEARCH_SNAPSHOT_PATH = Path(os.environ.get('SEARCH_SNAPSHOT_PATH', str(ROOT_DIR / 'search_snapshot.json.gz')))
+SEARCH_SYNC_INTERVAL_SECONDS = 60
+SEARCH_REBUILD_INTERVAL_SECONDS = 3600
+SEARCH_SNAPSHOT_INTERVAL_SECONDS = 600
+SEARCH_BM25_K1 = 1.2
+SEARCH_BM25_B = 0.75
+SEARCH_MAX_LIMIT = 100
+SEARCH_FACET_SIZE = 10
+SEARCH_TOKEN_PATTERN = re.compile(r"\w+")
+SEARCH_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from has have how i if in is it of on or that the this to was what when where which who why will with".split()
+)
+
+class SearchDocumentType(str, Enum):
+    QUESTION = "question"
+    QUIZ = "quiz"
+    USER = "user"
+
+SEARCH_COLLECTIONS = {
+    SearchDocumentType.QUESTION: "questions",
+    SearchDocumentType.QUIZ: "quizzes",
+    SearchDocumentType.USER: "users"
+}
+SEARCH_PROJECTIONS = {
+    SearchDocumentType.QUESTION: {"_id": 0, "id": 1, "title": 1, "content": 1, "tags": 1, "subject": 1, "subcategory": 1, "status": 1, "created_at": 1},
+    SearchDocumentType.QUIZ: {
+        "_id": 0, "id": 1, "title": 1, "description": 1, "subject": 1, "subcategory": 1, "category": 1,
+        "is_active": 1, "is_draft": 1, "is_public": 1, "allowed_users": 1, "quiz_owner_type": 1, "total_questions": 1
+    },
+    SearchDocumentType.USER: {"_id": 0, "id": 1, "name": 1, "role": 1}
+}
+# Field used to pick up documents changed by other workers since the last sync
+SEARCH_CHANGE_FIELDS = {
+    SearchDocumentType.QUESTION: "updated_at",
+    SearchDocumentType.QUIZ: "updated_at",
+    SearchDocumentType.USER: "created_at"
+}
+
+def search_tokens(text: Optional[str]) -> List[str]:
+    """Lowercase word tokens without stopwords, with plural endings folded"""
+    tokens = []
+    for token in SEARCH_TOKEN_PATTERN.findall((text or "").lower()):
+        if token in SEARCH_STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+class SearchIndex:
+    """In-memory BM25 inverted index over questions, quizzes and users
+    
+    Documents are keyed by (type, id). Each keeps its weighted term frequencies so
+    it can be removed from the postings when it changes, its facet values, the
+    fields shown in results and, for restricted quizzes, the users allowed to see it.
+    """
+    
+    def __init__(self):
+        self.documents = {}
+        self.postings = {}  # term -> {(type, id): weighted term frequency}
+        self.type_counts = {doc_type.value: 0 for doc_type in SearchDocumentType}
+        self.type_lengths = {doc_type.value: 0.0 for doc_type in SearchDocumentType}
+        self.watermark = None  # Documents changed after this time still need a sync
+        self.ready = False
+        self.dirty = False
+    
+    def add(self, doc_type: str, doc_id: str, fields: list, facets: dict, display: dict, allowed_users: Optional[list] = None):
+        """Index a document from (text, weight) fields, replacing any previous version"""
+        self.remove(doc_type, doc_id)
+        terms = {}
+        for text, weight in fields:
+            for token in search_tokens(text):
+                terms[token] = terms.get(token, 0.0) + weight
+        if not terms:
+            return
+        
+        key = (doc_type, doc_id)
+        length = sum(terms.values())
+        self.documents[key] = {
+            "terms": terms,
+            "length": length,
+            "facets": facets,
+            "display": display,
+            "allowed_users": set(allowed_users) if allowed_users is not None else None,
+            "indexed_at": time.monotonic()
+        }
+        for term, frequency in terms.items():
+            self.postings.setdefault(term, {})[key] = frequency
+        self.type_counts[doc_type] += 1
+        self.type_lengths[doc_type] += length
+        self.dirty = True
+    
+    def remove(self, doc_type: str, doc_id: str):
+        """Drop a document from the index"""
+        key = (doc_type, doc_id)
+        document = self.documents.pop(key, None)
+        if not document:
+            return
+        for term in document["terms"]:
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(key, None)
+                if not posting:
+                    del self.postings[term]
+        self.type_counts[doc_type] -= 1
+        self.type_lengths[doc_type] -= document["length"]
+        self.dirty = True
+    
+    def search(self, query: str, user_id: Optional[str] = None) -> dict:
+        """Score every visible document matching the query with BM25"""
+        total_documents = len(self.documents)
+        scores = {}
+        for term in set(search_tokens(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = np.log(1 + (total_documents - len(posting) + 0.5) / (len(posting) + 0.5))
+            for key, frequency in posting.items():
+                document = self.documents[key]
+                average_length = self.type_lengths[key[0]] / self.type_counts[key[0]]
+                saturation = frequency * (SEARCH_BM25_K1 + 1) / (
+                    frequency + SEARCH_BM25_K1 * (1 - SEARCH_BM25_B + SEARCH_BM25_B * document["length"] / average_length)
+                )
+                scores[key] = scores.get(key, 0.0) + idf * saturation
+        
+        return {
+            key: score for key, score in scores.items()
+            if self.documents[key]["allowed_users"] is None or user_id in self.documents[key]["allowed_users"]
+        }
+    
+    def to_snapshot(self) -> dict:
+        """Serializable copy of the documents; postings are rebuilt on load"""
+        return {
+            "watermark": self.watermark.isoformat() if self.watermark else None,
+            "documents": [
+                [doc_type, doc_id, {
+                    "terms": document["terms"],
+                    "facets": document["facets"],
+                    "display": document["display"],
+                    "allowed_users": sorted(document["allowed_users"]) if document["allowed_users"] is not None else None
+                }]
+                for (doc_type, doc_id), document in self.documents.items()
+            ]
+        }
+    
+    @classmethod
+    def from_snapshot(cls, snapshot: dict) -> "SearchIndex":
+        index = cls()
+        for doc_type, doc_id, document in snapshot["documents"]:
+            key = (doc_type, doc_id)
+            length = sum(document["terms"].values())
+            index.documents[key] = {
+                **document,
+                "length": length,
+                "allowed_users": set(document["allowed_users"]) if document["allowed_users"] is not None else None,
+                "indexed_at": 0.0
+            }
+            for term, frequency in document["terms"].items():
+                index.postings.setdefault(term, {})[key] = frequency
+            index.type_counts[doc_type] += 1
+            index.type_lengths[doc_type] += length
+        index.watermark = datetime.fromisoformat(snapshot["watermark"]) if snapshot.get("watermark") else None
+        return index
+
+search_index = SearchIndex()
+
+def index_search_document(doc_type: SearchDocumentType, doc: dict):
+    """Add or refresh one question, quiz or user in the search index"""
+    if doc_type == SearchDocumentType.QUESTION:
+        tags = doc.get("tags") or []
+        search_index.add(
+            doc_type.value, doc["id"],
+            [(doc.get("title"), 2.0), (doc.get("content"), 1.0), (" ".join(tags), 2.0)],
+            {"subject": doc.get("subject"), "tags": tags, "status": doc.get("status")},
+            {
+                "title": doc.get("title"),
+                "subject": doc.get("subject"),
+                "subcategory": doc.get("subcategory"),
+                "tags": tags,
+                "created_at": doc["created_at"].isoformat() if doc.get("created_at") else None
+            }
+        )
+    elif doc_type == SearchDocumentType.QUIZ:
+        # Only published admin quizzes are searchable, restricted ones only by their allowed users
+        if not doc.get("is_active", True) or doc.get("is_draft", False) or doc.get("quiz_owner_type", "admin") != "admin":
+            search_index.remove(doc_type.value, doc["id"])
+            return
+        search_index.add(
+            doc_type.value, doc["id"],
+            [(doc.get("title"), 2.0), (doc.get("description"), 1.0), (doc.get("subject"), 1.0)],
+            {"subject": doc.get("subject"), "category": doc.get("category")},
+            {
+                "title": doc.get("title"),
+                "subject": doc.get("subject"),
+                "subcategory": doc.get("subcategory"),
+                "category": doc.get("category"),
+                "total_questions": doc.get("total_questions", 0)
+            },
+            allowed_users=doc.get("allowed_users", []) if doc.get("is_public", False) else None
+        )
+    else:
+        search_index.add(
+            doc_type.value, doc["id"],
+            [(doc.get("name"), 1.0)],
+            {"role": doc.get("role")},
+            {"name": doc.get("name"), "role": doc.get("role")}
+        )
+
+async def refresh_search_document(doc_type: SearchDocumentType, doc_id: str):
+    """Re-read a document after a write and update or drop it in the search index"""
+    doc = await db[SEARCH_COLLECTIONS[doc_type]].find_one({"id": doc_id}, SEARCH_PROJECTIONS[doc_type])
+    if doc:
+        index_search_document(doc_type, doc)
+    else:
+        search_index.remove(doc_type.value, doc_id)
+
+async def sync_search_index(full: bool = False):
+    """Index documents changed since the last sync; a full sync also drops deleted ones"""
+    started_at = datetime.utcnow()
+    started = time.monotonic()
+    since = None if full else search_index.watermark
+    
+    for doc_type, collection_name in SEARCH_COLLECTIONS.items():
+        query = {SEARCH_CHANGE_FIELDS[doc_type]: {"$gte": since}} if since else {}
+        seen = set()
+        async for doc in db[collection_name].find(query, SEARCH_PROJECTIONS[doc_type]):
+            index_search_document(doc_type, doc)
+            seen.add(doc["id"])
+        
+        if full:
+            # Documents indexed by a write handler during the scan are kept
+            stale = [
+                doc_id for (indexed_type, doc_id), document in search_index.documents.items()
+                if indexed_type == doc_type.value and doc_id not in seen and document["indexed_at"] < started
+            ]
+            for doc_id in stale:
+                search_index.remove(doc_type.value, doc_id)
     
-    user_info = await db.users.find_one({"id": user_id})
-    if not user_info:
+    search_index.watermark = started_at
+
+async def rebuild_search_index():
+    await sync_search_index(full=True)
+
+def write_search_snapshot(snapshot: dict):
+    temporary_path = SEARCH_SNAPSHOT_PATH.with_name(SEARCH_SNAPSHOT_PATH.name + f".{os.getpid()}.tmp")
+    with gzip.open(temporary_path, "wt", encoding="utf-8") as snapshot_file:
+        json.dump(snapshot, snapshot_file)
+    os.replace(temporary_path, SEARCH_SNAPSHOT_PATH)
+
+def read_search_snapshot() -> Optional[dict]:
+    if not SEARCH_SNAPSHOT_PATH.exists():
+        return None
+    with gzip.open(SEARCH_SNAPSHOT_PATH, "rt", encoding="utf-8") as snapshot_file:
+        return json.load(snapshot_file)
+
+async def save_search_snapshot():
+    """Persist the index so a restart only needs to catch up recent changes"""
+    if not search_index.ready or not search_index.dirty:
         return
+    snapshot = search_index.to_snapshot()
+    search_index.dirty = False
+    await asyncio.to_thread(write_search_snapshot, snapshot)
+
+async def warm_search_index():
+    """Load the search snapshot, or build the index from scratch, at startup"""
+    global search_index
+    try:
+        snapshot = await asyncio.to_thread(read_search_snapshot)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable search snapshot: {str(e)}")
+        snapshot = None
     
-    for follow in follows:
-        notification = Notification(
-            user_id=follow["follower_id"],
-            from_user_id=user_id,
-            notification_type=NotificationType.NEW_QUESTION_FROM_FOLLOWED_USER,
-            title="New Question from Followed User",
-            message=f"{user_info['name']} posted a new question: {question_title[:50]}...",
-            related_id=question_id
+    try:
+        if snapshot:
+            search_index = SearchIndex.from_snapshot(snapshot)
+            await sync_search_index()
+        else:
+            await sync_search_index(full=True)
+    except Exception as e:
+        logger.error(f"Search index warm-up failed: {str(e)}")
+        return
+    search_index.ready = True
+    logger.info(f"Search index ready with {len(search_index.documents)} documents")
+
+def search_facet_counts(documents: list) -> dict:
+    """Count the most common facet values among matching documents"""
+    counts = {"type": {}, "subject": {}, "tags": {}}
+    for doc_type, document in documents:
+        counts["type"][doc_type] = counts["type"].get(doc_type, 0) + 1
+        subject = document["facets"].get("subject")
+        if subject:
+            counts["subject"][subject] = counts["subject"].get(subject, 0) + 1
+        for tag in document["facets"].get("tags") or []:
+            counts["tags"][tag] = counts["tags"].get(tag, 0) + 1
+    return {
+        facet: dict(sorted(values.items(), key=lambda item: -item[1])[:SEARCH_FACET_SIZE])
+        for facet, values in counts.items()
+    }
+
+@api_router.get("/search")
+async def search(
+    q: str,
+    type: Optional[SearchDocumentType] = None,
+    subject: Optional[str] = None,
+    tag: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 20,
+    current_user: User = Depends(get_current_user)
+):
+    """Full-text search over questions, quizzes and users
+    
+    Facet counts cover every match of the query before the type, subject and tag
+    filters are applied, so clients can show how many results each filter keeps.
+    """
+    if not search_index.ready:
+        raise HTTPException(status_code=503, detail="Search index is warming up, please retry shortly")
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Search query cannot be empty")
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+    
+    started = time.perf_counter()
+    scores = search_index.search(q, current_user.id)
+    matches = [(key, search_index.documents[key]) for key in scores]
+    facets = search_facet_counts([(key[0], document) for key, document in matches])
+    
+    filtered = [
+        key for key, document in matches
+        if (type is None or key[0] == type.value)
+        and (subject is None or document["facets"].get("subject") == subject)
+        and (tag is None or tag in (document["facets"].get("tags") or []))
+    ]
+    filtered.sort(key=lambda key: -scores[key])
+    
+    results = [
+        {"type": key[0], "id": key[1], "score": round(float(scores[key]), 4), **search_index.documents[key]["display"]}
+        for key in filtered[skip:skip + limit]
+    ]
+    return {
+        "results": results,
+        "total": len(filtered),
+        "facets": facets,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+# =====================================
+# AUTOCOMPLETE
+# =====================================
+
+AUTOCOMPLETE_REBUILD_INTERVAL_SECONDS = 600
+AUTOCOMPLETE_SCAN_LIMIT = 200
+AUTOCOMPLETE_MAX_LIMIT = 25
+
+class AutocompleteKind(str, Enum):
+    TAG = "tag"
+    SUBJECT = "subject"
+    USER = "user"
+
+def normalize_autocomplete(text: Optional[str]) -> str:
+    return " ".join((text or "").lower().split())
+
+def autocomplete_keys(label: str) -> List[str]:
+    """Keys for a label: the whole label and the tail starting at each later word"""
+    words = normalize_autocomplete(label).split(" ")
+    return [" ".join(words[i:]) for i in range(len(words)) if words[i]]
+
+class PrefixIndex:
+    """Sorted array of (key, entry id) pairs searched with bisect
+    
+    Entries keep usage counts per source (e.g. quizzes vs questions using a subject)
+    and disappear once every count drops to zero. Completions are ranked by usage.
+    """
+    
+    def __init__(self):
+        self.keys = []
+        self.entries = {}  # entry_id -> {"label", "payload", "counts": {source: n}}
+    
+    def adjust(self, entry_id: str, label: str, delta: int = 1, source: str = "default", payload: Optional[dict] = None):
+        entry = self.entries.get(entry_id)
+        if entry is None:
+            if delta <= 0:
+                return
+            entry = {"label": label, "payload": payload or {}, "counts": {}}
+            self.entries[entry_id] = entry
+            for key in autocomplete_keys(label):
+                bisect.insort(self.keys, (key, entry_id))
+        
+        count = entry["counts"].get(source, 0) + delta
+        if count > 0:
+            entry["counts"][source] = count
+        else:
+            entry["counts"].pop(source, None)
+        if not entry["counts"]:
+            self.remove(entry_id)
+    
+    def remove(self, entry_id: str):
+        entry = self.entries.pop(entry_id, None)
+        if not entry:
+            return
+        for key in autocomplete_keys(entry["label"]):
+            position = bisect.bisect_left(self.keys, (key, entry_id))
+            if position < len(self.keys) and self.keys[position] == (key, entry_id):
+                del self.keys[position]
+    
+    def load(self, items):
+        """Bulk add (entry_id, label, count, source, payload) items, sorting once"""
+        for entry_id, label, count, source, payload in items:
+            if count <= 0:
+                continue
+            entry = self.entries.get(entry_id)
+            if entry is None:
+                entry = {"label": label, "payload": payload or {}, "counts": {}}
+                self.entries[entry_id] = entry
+                self.keys.extend((key, entry_id) for key in autocomplete_keys(label))
+            entry["counts"][source] = entry["counts"].get(source, 0) + count
+        self.keys.sort()
+    
+    def complete(self, prefix: str, limit: int) -> List[dict]:
+        prefix = normalize_autocomplete(prefix)
+        position = bisect.bisect_left(self.keys, (prefix, ""))
+        matches = set()
+        end = min(len(self.keys), position + AUTOCOMPLETE_SCAN_LIMIT)
+        while position < end and self.keys[position][0].startswith(prefix):
+            matches.add(self.keys[position][1])
+            position += 1
+        
+        ranked = sorted(
+            matches,
+            key=lambda entry_id: (-sum(self.entries[entry_id]["counts"].values()), self.entries[entry_id]["label"].lower())
         )
-        await db.notifications.insert_one(notification.dict())
+        return [
+            {
+                "label": self.entries[entry_id]["label"],
+                "count": sum(self.entries[entry_id]["counts"].values()),
+                **self.entries[entry_id]["payload"]
+            }
+            for entry_id in ranked[:limit]
+        ]
 
-async def notify_followers_of_new_quiz(user_id: str, quiz_title: str, quiz_id: str):
-    """Notify approved followers when a user creates a new quiz"""
-    # Get all approved followers of this user
-    follows = await db.follows.find({
-        "following_id": user_id,
-        "status": FollowStatus.APPROVED
-    }).to_list(1000)
+autocomplete_indexes = {kind: PrefixIndex() for kind in AutocompleteKind}
+autocomplete_ready = False
+
+def subject_autocomplete_entries(subject: Optional[str], subcategory: Optional[str] = None) -> list:
+    """Subject and subfolder entries contributed by one quiz, question or folder"""
+    entries = []
+    if subject:
+        entries.append((f"subject:{subject}", subject, {"type": "subject"}))
+        if subcategory:
+            entries.append((f"subfolder:{subject}/{subcategory}", subcategory, {"type": "subfolder", "subject": subject}))
+    return entries
+
+def track_autocomplete(kind: AutocompleteKind, old_entries: list, new_entries: list, source: str):
+    """Move usage counts from the entries a document had to the ones it has now"""
+    index = autocomplete_indexes[kind]
+    for entry_id, label, payload in old_entries:
+        index.adjust(entry_id, label, -1, source, payload)
+    for entry_id, label, payload in new_entries:
+        index.adjust(entry_id, label, 1, source, payload)
+
+def question_tag_entries(question: Optional[dict]) -> list:
+    if not question:
+        return []
+    tags = {}
+    for tag in question.get("tags") or []:
+        if tag and tag.strip():
+            tags.setdefault(normalize_autocomplete(tag), tag.strip())
+    return [(f"tag:{key}", label, {}) for key, label in tags.items()]
+
+def track_question_autocomplete(old_question: Optional[dict], new_question: Optional[dict]):
+    """Update tag and subject completions after a question is created, edited or deleted"""
+    track_autocomplete(AutocompleteKind.TAG, question_tag_entries(old_question), question_tag_entries(new_question), "question")
+    track_autocomplete(
+        AutocompleteKind.SUBJECT,
+        subject_autocomplete_entries(old_question.get("subject"), old_question.get("subcategory")) if old_question else [],
+        subject_autocomplete_entries(new_question.get("subject"), new_question.get("subcategory")) if new_question else [],
+        "question"
+    )
+
+def track_quiz_autocomplete(old_quiz: Optional[dict], new_quiz: Optional[dict]):
+    """Update subject completions after a quiz is created, moved or deleted"""
+    track_autocomplete(
+        AutocompleteKind.SUBJECT,
+        subject_autocomplete_entries(old_quiz.get("subject"), old_quiz.get("subcategory")) if old_quiz else [],
+        subject_autocomplete_entries(new_quiz.get("subject"), new_quiz.get("subcategory")) if new_quiz else [],
+        "quiz"
+    )
+
+def track_user_autocomplete(user_id: str, name: Optional[str], role: Optional[str] = None):
+    """Add or rename a user in the name completions"""
+    index = autocomplete_indexes[AutocompleteKind.USER]
+    index.remove(user_id)
+    if name:
+        index.adjust(user_id, name, 1, "user", {"id": user_id, "role": role or UserRole.USER.value})
+
+async def build_subject_autocomplete() -> PrefixIndex:
+    """Build subject and subfolder completions from quizzes, questions and folders"""
+    index = PrefixIndex()
+    items = []
+    for collection_name, source in (("quizzes", "quiz"), ("questions", "question")):
+        async for row in db[collection_name].aggregate([
+            {"$group": {"_id": {"subject": "$subject", "subcategory": "$subcategory"}, "count": {"$sum": 1}}}
+        ]):
+            for entry_id, label, payload in subject_autocomplete_entries(row["_id"].get("subject"), row["_id"].get("subcategory")):
+                items.append((entry_id, label, row["count"], source, payload))
+    
+    async for folder in db.subject_folders.find({"is_active": True}, {"_id": 0, "name": 1, "subcategories": 1}):
+        items.append((f"subject:{folder['name']}", folder["name"], 1, "folder", {"type": "subject"}))
+        for subcategory in folder.get("subcategories") or []:
+            items.append((
+                f"subfolder:{folder['name']}/{subcategory}", subcategory, 1, "folder",
+                {"type": "subfolder", "subject": folder["name"]}
+            ))
+    
+    async for subject in db.global_subjects.find({}, {"_id": 0, "name": 1, "subfolders": 1}):
+        items.append((f"subject:{subject['name']}", subject["name"], 1, "folder", {"type": "subject"}))
+        for subfolder in subject.get("subfolders") or []:
+            items.append((
+                f"subfolder:{subject['name']}/{subfolder['name']}", subfolder["name"], 1, "folder",
+                {"type": "subfolder", "subject": subject["name"]}
+            ))
+    
+    index.load(items)
+    return index
+
+async def refresh_subject_autocomplete():
+    """Rebuild subject completions after a folder or global subject changes"""
+    autocomplete_indexes[AutocompleteKind.SUBJECT] = await build_subject_autocomplete()
+
+async def rebuild_autocomplete():
+    """Rebuild every completion index from the database and swap it in"""
+    global autocomplete_ready
+    tags = PrefixIndex()
+    items = []
+    async for row in db.questions.aggregate([
+        {"$unwind": "$tags"},
+        {"$group": {"_id": {"$toLower": {"$trim": {"input": "$tags"}}}, "label": {"$first": "$tags"}, "count": {"$sum": 1}}}
+    ]):
+        if row["_id"]:
+            items.append((f"tag:{normalize_autocomplete(row['_id'])}", row["label"].strip(), row["count"], "question", {}))
+    tags.load(items)
+    
+    users = PrefixIndex()
+    users.load([
+        (user["id"], user["name"], 1, "user", {"id": user["id"], "role": user.get("role", UserRole.USER.value)})
+        async for user in db.users.find({}, {"_id": 0, "id": 1, "name": 1, "role": 1})
+        if user.get("name")
+    ])
+    
+    subjects = await build_subject_autocomplete()
+    autocomplete_indexes.update({
+        AutocompleteKind.TAG: tags,
+        AutocompleteKind.SUBJECT: subjects,
+        AutocompleteKind.USER: users
+    })
+    autocomplete_ready = True
+
+@api_router.get("/autocomplete")
+async def autocomplete(
+    q: str,
+    kind: AutocompleteKind,
+    limit: int = 10,
+    current_user: User = Depends(get_current_user)
+):
+    """Suggest tags, subjects/subfolders or user names starting with a prefix"""
+    if not autocomplete_ready:
+        raise HTTPException(status_code=503, detail="Autocomplete is warming up, please retry shortly")
+    if not q.strip():
+        return {"suggestions": []}
+    limit = max(1, min(limit, AUTOCOMPLETE_MAX_LIMIT))
+    return {"suggestions": autocomplete_indexes[kind].complete(q, limit)}
+
+# =====================================
+# RELATED QUESTIONS
+# =====================================
+# Questions are embedded as L2-normalized TF-IDF vectors over their title, body
+# and tags. The nearest neighbours of every question are precomputed by a
+# background job into related_questions, so the detail page reads them with one
+# indexed lookup. New and edited questions are matched against the model of the
+# last build right away and pushed into their neighbours' lists.
+
+RELATED_QUESTIONS_COUNT = 5
+RELATED_MIN_SCORE = 0.1
+RELATED_MAX_TERMS = 30  # Strongest terms kept per question
+RELATED_MAX_DF_RATIO = 0.2  # Terms in more questions than this carry no signal
+RELATED_REBUILD_INTERVAL_SECONDS = 3600
+RELATED_WRITE_BATCH_SIZE = 1000
+RELATED_PROJECTION = {"_id": 0, "id": 1, "title": 1, "content": 1, "tags": 1}
+
+def related_term_counts(question: dict) -> dict:
+    counts = {}
+    for text, weight in ((question.get("title"), 2.0), (question.get("content"), 1.0), (" ".join(question.get("tags") or []), 2.0)):
+        for token in search_tokens(text):
+            counts[token] = counts.get(token, 0.0) + weight
+    return counts
+
+class RelatedQuestionsModel:
+    """TF-IDF vectors of every question with per-term posting arrays"""
+    
+    def __init__(self, questions: List[dict]):
+        self.ids = [question["id"] for question in questions]
+        self.titles = [question.get("title", "") for question in questions]
+        self.positions = {question_id: position for position, question_id in enumerate(self.ids)}
+        self.removed = set()  # Positions of questions deleted since the build
+        
+        term_counts = [related_term_counts(question) for question in questions]
+        document_frequency = {}
+        for counts in term_counts:
+            for term in counts:
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+        total = len(questions)
+        max_df = max(2, RELATED_MAX_DF_RATIO * total)
+        self.idf = {
+            term: float(np.log((total + 1) / (df + 1)) + 1)
+            for term, df in document_frequency.items()
+            if df <= max_df
+        }
+        
+        postings = {}
+        self.vectors = []
+        for position, counts in enumerate(term_counts):
+            vector = self.vectorize(counts)
+            self.vectors.append(vector)
+            for term, weight in vector.items():
+                postings.setdefault(term, ([], []))
+                postings[term][0].append(position)
+                postings[term][1].append(weight)
+        self.postings = {
+            term: (np.array(positions, dtype=np.int32), np.array(weights, dtype=np.float32))
+            for term, (positions, weights) in postings.items()
+        }
     
-    user_info = await db.users.find_one({"id": user_id})
-    if not user_info:
+    def vectorize(self, counts: dict) -> dict:
+        """Sublinear TF-IDF weights of the strongest terms, normalized to unit length"""
+        weights = {term: (1 + np.log(count)) * self.idf[term] for term, count in counts.items() if term in self.idf}
+        strongest = sorted(weights.items(), key=lambda item: -item[1])[:RELATED_MAX_TERMS]
+        norm = np.sqrt(sum(weight * weight for _, weight in strongest))
+        return {term: float(weight / norm) for term, weight in strongest} if norm else {}
+    
+    def neighbours(self, vector: dict, exclude_position: Optional[int] = None, limit: int = RELATED_QUESTIONS_COUNT) -> list:
+        """(position, cosine similarity) of the closest questions"""
+        positions = []
+        weights = []
+        for term, weight in vector.items():
+            posting = self.postings.get(term)
+            if posting is not None:
+                positions.append(posting[0])
+                weights.append(posting[1] * weight)
+        if not positions:
+            return []
+        # A dense score row is cheaper than de-duplicating candidates at this size
+        scores = np.bincount(np.concatenate(positions), weights=np.concatenate(weights), minlength=len(self.ids))
+        excluded = self.removed | ({exclude_position} if exclude_position is not None else set())
+        if excluded:
+            scores[list(excluded)] = 0.0
+        
+        top = np.argsort(-scores)[:limit] if len(scores) <= limit else np.argpartition(-scores, limit)[:limit]
+        return sorted(
+            ((int(position), float(scores[position])) for position in top if scores[position] >= RELATED_MIN_SCORE),
+            key=lambda item: -item[1]
+        )
+    
+    def add(self, question: dict) -> list:
+        """Add a new question with the current IDF and return its neighbours"""
+        vector = self.vectorize(related_term_counts(question))
+        neighbours = self.neighbours(vector)
+        position = len(self.ids)
+        self.ids.append(question["id"])
+        self.titles.append(question.get("title", ""))
+        self.positions[question["id"]] = position
+        self.vectors.append(vector)
+        for term, weight in vector.items():
+            # Terms known to the IDF may have made no built question's strongest terms
+            term_positions, term_weights = self.postings.get(
+                term, (np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32))
+            )
+            self.postings[term] = (
+                np.append(term_positions, np.int32(position)),
+                np.append(term_weights, np.float32(weight))
+            )
+        return neighbours
+    
+    def remove(self, question_id: str):
+        """Exclude a question from later neighbour lookups"""
+        if question_id in self.positions:
+            self.removed.add(self.positions.pop(question_id))
+    
+    def related_items(self, neighbours: list) -> List[dict]:
+        return [
+            {"id": self.ids[position], "title": self.titles[position], "score": round(score, 4)}
+            for position, score in neighbours
+        ]
+
+related_model: Optional[RelatedQuestionsModel] = None
+related_rebuild_changes: Optional[list] = None  # (handler, argument) of changes made during a rebuild
+
+def build_related_questions(questions: List[dict]):
+    """Fit the model and compute every question's neighbours (runs in a thread)"""
+    model = RelatedQuestionsModel(questions)
+    related = {
+        question_id: model.related_items(model.neighbours(model.vectors[position], exclude_position=position))
+        for position, question_id in enumerate(model.ids)
+    }
+    return model, related
+
+async def rebuild_related_questions():
+    """Recompute related questions for the whole corpus and store them"""
+    global related_model, related_rebuild_changes
+    # Entries written after the questions are read are newer than the build and are kept
+    now = datetime.utcnow()
+    related_rebuild_changes = []
+    try:
+        model = await store_related_questions(now)
+        changes, related_rebuild_changes = related_rebuild_changes, None
+        related_model = model
+        # Questions added, edited or deleted during the build are applied to the new model
+        for handler, argument in changes:
+            await handler(argument)
+    finally:
+        related_rebuild_changes = None
+
+async def store_related_questions(now: datetime) -> RelatedQuestionsModel:
+    questions = await db.questions.find({}, RELATED_PROJECTION).to_list(None)
+    model, related = await asyncio.to_thread(build_related_questions, questions)
+    
+    operations = []
+    for question_id, items in related.items():
+        operations.append(UpdateOne(
+            {"question_id": question_id},
+            {"$set": {"related": items, "updated_at": now}},
+            upsert=True
+        ))
+        if len(operations) >= RELATED_WRITE_BATCH_SIZE:
+            await db.related_questions.bulk_write(operations, ordered=False)
+            operations = []
+    if operations:
+        await db.related_questions.bulk_write(operations, ordered=False)
+    await db.related_questions.delete_many({"updated_at": {"$lt": now}})
+    return model
+
+async def add_related_question(question: dict):
+    """Link a new question to its neighbours without waiting for the next build"""
+    if related_rebuild_changes is not None:
+        related_rebuild_changes.append((add_related_question, question))
+    await link_related_question(question)
+
+async def link_related_question(question: dict):
+    if related_model is None:
         return
+    # A question already in the model, e.g. one read by the build, is replaced
+    related_model.remove(question["id"])
+    neighbours = related_model.add(question)
+    items = related_model.related_items(neighbours)
+    await db.related_questions.update_one(
+        {"question_id": question["id"]},
+        {"$set": {"related": items, "updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+    if items:
+        # Each neighbour keeps its best matches, which may now include this question
+        entry = {"id": question["id"], "title": question.get("title", "")}
+        await db.related_questions.bulk_write([
+            UpdateOne(
+                {"question_id": item["id"], "related.id": {"$ne": question["id"]}},
+                {"$push": {"related": {"$each": [{**entry, "score": item["score"]}], "$sort": {"score": -1}, "$slice": RELATED_QUESTIONS_COUNT}}}
+            )
+            for item in items
+        ], ordered=False)
+
+async def update_related_question(question: dict):
+    """Re-link an edited question and refresh its title in its neighbours' lists"""
+    if related_rebuild_changes is not None:
+        related_rebuild_changes.append((update_related_question, question))
+    await db.related_questions.update_many(
+        {"related.id": question["id"]},
+        {"$set": {"related.$[item].title": question.get("title", "")}},
+        array_filters=[{"item.id": question["id"]}]
+    )
+    await link_related_question(question)
+
+async def remove_related_question(question_id: str):
+    if related_rebuild_changes is not None:
+        related_rebuild_changes.append((remove_related_question, question_id))
+    if related_model is not None:
+        related_model.remove(question_id)
+    await db.related_questions.delete_one({"question_id": question_id})
+    await db.related_questions.update_many({"related.id": question_id}, {"$pull": {"related": {"id": question_id}}})
+
+# =====================================
+# FOLLOW SUGGESTIONS
+# =====================================
+# "People you may know" lists are precomputed for users active in the last
+# FOLLOW_SUGGESTION_ACTIVE_DAYS. Candidates are friends of friends, scored by the
+# number of followed users who follow them, plus users who are among the most
+# active in the same subjects. Only follows of active users and of the users they
+# follow are read, fan-out is bounded on every hop, and one worker runs the build.
+# The request only reads the stored list and drops users followed since the build.
+
+FOLLOW_SUGGESTION_COUNT = 20
+FOLLOW_SUGGESTION_MAX_LIMIT = 50
+FOLLOW_SUGGESTION_ACTIVE_DAYS = 30
+FOLLOW_SUGGESTION_MAX_FANOUT = 100  # Followed users expanded per hop
+FOLLOW_SUGGESTION_TOP_SUBJECTS = 3  # Subjects of a user matched against others
+FOLLOW_SUGGESTION_SUBJECT_POOL = 50  # Most active users kept per subject
+FOLLOW_SUGGESTION_SUBJECT_WEIGHT = 0.5  # A shared subject is worth half a mutual follow
+FOLLOW_SUGGESTION_REBUILD_INTERVAL_SECONDS = 3600
+FOLLOW_SUGGESTION_WRITE_BATCH_SIZE = 1000
+FOLLOW_SUGGESTION_QUERY_BATCH_SIZE = 1000  # Follower ids per follows query
+
+def build_follow_suggestions(
+    active_ids: set,
+    following: Dict[str, list],
+    excluded: Dict[str, set],
+    subjects: Dict[str, Dict[str, int]]
+) -> Dict[str, list]:
+    """Rank friends of friends and subject peers for every active user"""
+    top_subjects = {
+        user_id: sorted(counts, key=counts.get, reverse=True)[:FOLLOW_SUGGESTION_TOP_SUBJECTS]
+        for user_id, counts in subjects.items()
+    }
+    subject_pools = {}
+    for user_id, user_subjects in top_subjects.items():
+        for subject in user_subjects:
+            subject_pools.setdefault(subject, []).append((subjects[user_id][subject], user_id))
+    for subject, pool in subject_pools.items():
+        pool.sort(reverse=True)
+        subject_pools[subject] = [user_id for _, user_id in pool[:FOLLOW_SUGGESTION_SUBJECT_POOL]]
+    
+    suggestions = {}
+    for user_id in active_ids:
+        skip = excluded.get(user_id, set())
+        mutual = {}
+        for followed_id in following.get(user_id, ()):
+            for candidate_id in following.get(followed_id, ()):
+                if candidate_id != user_id and candidate_id not in skip:
+                    mutual[candidate_id] = mutual.get(candidate_id, 0) + 1
+        shared = {}
+        for subject in top_subjects.get(user_id, ()):
+            for candidate_id in subject_pools[subject]:
+                if candidate_id != user_id and candidate_id not in skip:
+                    shared.setdefault(candidate_id, []).append(subject)
+        
+        scored = [
+            (mutual.get(candidate_id, 0) + FOLLOW_SUGGESTION_SUBJECT_WEIGHT * len(shared.get(candidate_id, ())), candidate_id)
+            for candidate_id in set(mutual) | set(shared)
+        ]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        suggestions[user_id] = [
+            {
+                "user_id": candidate_id,
+                "score": score,
+                "mutual_count": mutual.get(candidate_id, 0),
+                "shared_subjects": shared.get(candidate_id, [])
+            }
+            for score, candidate_id in scored[:FOLLOW_SUGGESTION_COUNT]
+        ]
+    return suggestions
+
+async def load_suggestion_follows(follower_ids: set, query: dict, following: dict, excluded: dict, inactive_ids: set):
+    """Add the follows of some users to the suggestion graph, newest first"""
+    follower_ids = list(follower_ids)
+    for start in range(0, len(follower_ids), FOLLOW_SUGGESTION_QUERY_BATCH_SIZE):
+        async for follow in db.follows.find(
+            {**query, "follower_id": {"$in": follower_ids[start:start + FOLLOW_SUGGESTION_QUERY_BATCH_SIZE]}},
+            {"_id": 0, "follower_id": 1, "following_id": 1, "status": 1}
+        ).sort("created_at", -1):
+            follower_id = follow["follower_id"]
+            if follower_id in excluded:
+                excluded[follower_id].add(follow["following_id"])
+            # Dropping follows of inactive accounts keeps them out of friends of friends
+            if follow["status"] == FollowStatus.APPROVED and follow["following_id"] not in inactive_ids:
+                following.setdefault(follower_id, []).append(follow["following_id"])
+
+async def rebuild_follow_suggestions():
+    """Recompute and store follow suggestions of recently active users"""
+    since = datetime.utcnow() - timedelta(days=FOLLOW_SUGGESTION_ACTIVE_DAYS)
+    quiz_subjects = {}
+    async for quiz in db.quizzes.find({"subject": {"$nin": [None, ""]}}, {"_id": 0, "id": 1, "subject": 1}):
+        quiz_subjects[quiz["id"]] = quiz["subject"]
+    
+    # Activity per user and subject in the window; everyone with any is active
+    active_ids = set()
+    subjects = {}
+    async for row in db.quiz_attempts.aggregate([
+        {"$match": {"attempted_at": {"$gte": since}}},
+        {"$group": {"_id": {"user_id": "$user_id", "quiz_id": "$quiz_id"}, "count": {"$sum": 1}}}
+    ]):
+        user_id = row["_id"]["user_id"]
+        active_ids.add(user_id)
+        subject = quiz_subjects.get(row["_id"]["quiz_id"])
+        if subject:
+            counts = subjects.setdefault(user_id, {})
+            counts[subject] = counts.get(subject, 0) + row["count"]
+    async for row in db.questions.aggregate([
+        {"$match": {"created_at": {"$gte": since}}},
+        {"$group": {"_id": {"user_id": "$user_id", "subject": "$subject"}, "count": {"$sum": 1}}}
+    ]):
+        user_id = row["_id"]["user_id"]
+        active_ids.add(user_id)
+        subject = row["_id"].get("subject")
+        if subject:
+            counts = subjects.setdefault(user_id, {})
+            counts[subject] = counts.get(subject, 0) + row["count"]
+    
+    # Inactive accounts are never suggested
+    inactive_ids = set(await db.users.distinct("id", {"is_active": False}))
+    for user_id in inactive_ids:
+        subjects.pop(user_id, None)
+        active_ids.discard(user_id)
+    
+    # Only follows of active users and of the users they follow are read
+    following = {}
+    excluded = {user_id: {user_id} for user_id in active_ids}
+    await load_suggestion_follows(active_ids, {}, following, excluded, inactive_ids)
+    second_hop = {followed_id for followed in following.values() for followed_id in followed} - active_ids
+    await load_suggestion_follows(second_hop, {"status": FollowStatus.APPROVED}, following, excluded, inactive_ids)
+    for followed in following.values():
+        # Followed users active in the window come first, then the most recently followed
+        followed.sort(key=lambda followed_id: followed_id not in active_ids)
+        del followed[FOLLOW_SUGGESTION_MAX_FANOUT:]
+    
+    suggestions = await asyncio.to_thread(build_follow_suggestions, active_ids, following, excluded, subjects)
+    
+    now = datetime.utcnow()
+    operations = []
+    for user_id, items in suggestions.items():
+        operations.append(UpdateOne(
+            {"user_id": user_id},
+            {"$set": {"suggestions": items, "updated_at": now}},
+            upsert=True
+        ))
+        if len(operations) >= FOLLOW_SUGGESTION_WRITE_BATCH_SIZE:
+            await db.follow_suggestions.bulk_write(operations, ordered=False)
+            operations = []
+    if operations:
+        await db.follow_suggestions.bulk_write(operations, ordered=False)
+    await db.follow_suggestions.delete_many({"updated_at": {"$lt": now}})
+
+async def get_followed_among(user_id: str, candidate_ids: List[str]) -> set:
+    """Which of the candidates the user already follows or asked to follow"""
+    statuses = await get_following_statuses(user_id)
+    if statuses is not None:
+        return {candidate_id for candidate_id in candidate_ids if candidate_id in statuses}
+    return set(await db.follows.distinct("following_id", {"follower_id": user_id, "following_id": {"$in": candidate_ids}}))
+
+@api_router.get("/follow-suggestions")
+async def get_follow_suggestions(limit: int = 10, current_user: User = Depends(get_current_user)):
+    """People the current user may know, topped up with popular users"""
+    limit = max(1, min(limit, FOLLOW_SUGGESTION_MAX_LIMIT))
+    stored = await db.follow_suggestions.find_one({"user_id": current_user.id}, {"_id": 0, "suggestions": 1}) or {}
+    suggestions = stored.get("suggestions", [])
+    followed = await get_followed_among(current_user.id, [item["user_id"] for item in suggestions])
+    suggestions = [item for item in suggestions if item["user_id"] not in followed][:limit]
+    
+    # New and inactive users have no stored list yet
+    if len(suggestions) < limit:
+        seen = {current_user.id} | {item["user_id"] for item in suggestions}
+        popular = await db.users.find(
+            {"id": {"$nin": list(seen)}, "is_active": {"$ne": False}}, {"_id": 0, "id": 1}
+        ).sort("follower_count", -1).limit(limit * 2).to_list(limit * 2)
+        popular_ids = [user["id"] for user in popular]
+        followed = await get_followed_among(current_user.id, popular_ids)
+        suggestions += [
+            {"user_id": user_id, "score": 0, "mutual_count": 0, "shared_subjects": []}
+            for user_id in popular_ids if user_id not in followed
+        ][:limit - len(suggestions)]
+    
+    users = await load_users([item["user_id"] for item in suggestions])
+    return {"suggestions": [
+        {
+            "user": build_user_info(item["user_id"], users[item["user_id"]]),
+            "mutual_count": item["mutual_count"],
+            "shared_subjects": item["shared_subjects"]
+        }
+        for item in suggestions
+        if item["user_id"] in users
+    ]}
+
+# =====================================
+# COUNTER RECONCILIATION
+# =====================================
+
+COUNTER_RECONCILE_INTERVAL_SECONDS = 3600
+COUNTER_RECONCILE_BATCH_SIZE = 1000
+hot_scores_refreshed_at = None
+
+async def refresh_hot_scores():
+    """Recompute hot scores of recently changed questions and of those without one
+    
+    Concurrent votes can each store a score computed from a slightly older read;
+    rescanning what changed since the previous run settles them on the final counts.
+    """
+    global hot_scores_refreshed_at
+    started_at = datetime.utcnow()
+    query = {}  # The first run of a worker rescans every question
+    if not hot_scores_refreshed_at:
+        # Keyset pages never match missing fields, so older questions need these stored
+        await db.questions.update_many({"is_pinned": {"$exists": False}}, {"$set": {"is_pinned": False}})
+        await db.questions.update_many({"view_count": None}, {"$set": {"view_count": 0}})
+    else:
+        since = hot_scores_refreshed_at - timedelta(seconds=HOT_SCORE_REFRESH_INTERVAL_SECONDS)
+        query = {"$or": [{"hot_score": {"$exists": False}}, {"updated_at": {"$gte": since}}]}
+    
+    updates = []
+    async for question in db.questions.find(query, HOT_SCORE_FIELDS):
+        score = question_hot_score(question)
+        if question.get("hot_score") != score:
+            updates.append(UpdateOne({"id": question["id"]}, {"$set": {"hot_score": score}}))
+        if len(updates) >= COUNTER_RECONCILE_BATCH_SIZE:
+            await db.questions.bulk_write(updates, ordered=False)
+            updates = []
+    if updates:
+        await db.questions.bulk_write(updates, ordered=False)
+    hot_scores_refreshed_at = started_at
+
+# Reconciliation reads the stored counters before aggregating their sources, and
+# only rewrites a counter that still holds the value it read. An increment landing
+# during the scan changes that value, so the counter is left for the next run
+# instead of being set back to the older snapshot.
+
+async def read_counter_field(collection, field: str) -> dict:
+    """Stored values of a denormalized field by document id, None where it is missing"""
+    return {doc["id"]: doc.get(field) async for doc in collection.find({}, {"_id": 0, "id": 1, field: 1})}
+
+async def sync_counter_field(collection, field: str, stored: dict, expected: dict, default, normalize=None) -> int:
+    """Rewrite a denormalized field wherever it differs from its recomputed value"""
+    operations = []
+    repaired = 0
+    for doc_id, stored_value in stored.items():
+        value = expected.get(doc_id, default)
+        current = default if stored_value is None else stored_value
+        if (normalize(current) if normalize else current) != value:
+            # Matching the value read keeps concurrent updates; null also matches a missing field
+            operations.append(UpdateOne({"id": doc_id, field: stored_value}, {"$set": {field: value}}))
+        if len(operations) >= COUNTER_RECONCILE_BATCH_SIZE:
+            repaired += (await collection.bulk_write(operations, ordered=False)).modified_count
+            operations = []
+    if operations:
+        repaired += (await collection.bulk_write(operations, ordered=False)).modified_count
+    return repaired
+
+async def bulk_write_counters(collection, operations: list) -> int:
+    """Apply counter repairs and return how many documents they changed"""
+    if not operations:
+        return 0
+    try:
+        result = await collection.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        # An upsert racing a concurrent increment that created the row first is skipped
+        if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+            raise
+        return e.details.get("nModified", 0) + len(e.details.get("upserted", []))
+    return result.modified_count + result.upserted_count
+
+def nonzero_counts(counts: dict) -> dict:
+    return {key: count for key, count in counts.items() if count}
+
+async def reconcile_counters() -> dict:
+    """Recompute denormalized counters with aggregations and repair any drift"""
+    repaired = {}
+    
+    # Answer counts and accepted answers per question
+    stored_answer_counts = await read_counter_field(db.questions, "answer_count")
+    stored_accepted = await read_counter_field(db.questions, "has_accepted_answer")
+    answer_counts = {}
+    accepted = {}
+    async for row in db.answers.aggregate([
+        {"$group": {"_id": "$question_id", "count": {"$sum": 1}, "accepted": {"$max": "$is_accepted"}}}
+    ]):
+        answer_counts[row["_id"]] = row["count"]
+        accepted[row["_id"]] = bool(row["accepted"])
+    repaired["answer_count"] = await sync_counter_field(db.questions, "answer_count", stored_answer_counts, answer_counts, 0)
+    repaired["has_accepted_answer"] = await sync_counter_field(
+        db.questions, "has_accepted_answer", stored_accepted, accepted, False
+    )
     
-    for follow in follows:
-        notification = Notification(
-            user_id=follow["follower_id"],
-            from_user_id=user_id,
-            notification_type=NotificationType.NEW_QUIZ_FROM_FOLLOWED_USER,
-            title="New Quiz from Followed User",
-            message=f"{user_info['name']} created a new quiz: {quiz_title[:50]}...",
-            related_id=quiz_id
+    # Vote counters on questions, answers and discussions
+    stored_votes = {
+        (target_type, field): await read_counter_field(db[collection_name], field)
+        for target_type, collection_name in VOTE_TARGET_COLLECTIONS.items()
+        for field in VOTE_COUNTER_FIELDS.values()
+    }
+    vote_counts = {target_type: {VoteType.UPVOTE: {}, VoteType.DOWNVOTE: {}} for target_type in VOTE_TARGET_COLLECTIONS}
+    async for row in db.votes.aggregate([
+        {"$group": {"_id": {"target_type": "$target_type", "target_id": "$target_id", "vote_type": "$vote_type"}, "count": {"$sum": 1}}}
+    ]):
+        key = row["_id"]
+        vote_counts[VoteTargetType(key["target_type"])][VoteType(key["vote_type"])][key["target_id"]] = row["count"]
+    for target_type, collection_name in VOTE_TARGET_COLLECTIONS.items():
+        for vote_type, field in VOTE_COUNTER_FIELDS.items():
+            repaired[f"{collection_name}.{field}"] = await sync_counter_field(
+                db[collection_name], field, stored_votes[(target_type, field)], vote_counts[target_type][vote_type], 0
+            )
+    
+    # Follower and following counts from approved follows
+    for group_field, counter_field in (("following_id", "follower_count"), ("follower_id", "following_count")):
+        stored = await read_counter_field(db.users, counter_field)
+        counts = {}
+        async for row in db.follows.aggregate([
+            {"$match": {"status": FollowStatus.APPROVED}},
+            {"$group": {"_id": f"${group_field}", "count": {"$sum": 1}}}
+        ]):
+            counts[row["_id"]] = row["count"]
+        repaired[counter_field] = await sync_counter_field(db.users, counter_field, stored, counts, 0)
+    
+    # Emoji reaction counts per answer; entries decremented to zero count as absent
+    stored_reactions = await read_counter_field(db.answers, "reaction_counts")
+    reaction_counts = {}
+    async for row in db.answer_reactions.aggregate([
+        {"$group": {"_id": {"answer_id": "$answer_id", "emoji": "$emoji"}, "count": {"$sum": 1}}}
+    ]):
+        reaction_counts.setdefault(row["_id"]["answer_id"], {})[row["_id"]["emoji"]] = row["count"]
+    repaired["reaction_counts"] = await sync_counter_field(
+        db.answers, "reaction_counts", stored_reactions, reaction_counts, {}, normalize=nonzero_counts
+    )
+    
+    # Notification totals per user
+    stored_notification_counts = await db.notification_counts.find(
+        {}, {"_id": 0, "user_id": 1, "total": 1, "unread": 1}
+    ).to_list(None)
+    notification_counts = {}
+    async for row in db.notifications.aggregate([
+        {"$group": {"_id": "$user_id", "total": {"$sum": 1}, "unread": {"$sum": {"$cond": ["$is_read", 0, 1]}}}}
+    ]):
+        notification_counts[row["_id"]] = (row["total"], row["unread"])
+    operations = []
+    for row in stored_notification_counts:
+        expected = notification_counts.pop(row["user_id"], (0, 0))
+        if (row.get("total", 0), row.get("unread", 0)) != expected:
+            operations.append(UpdateOne(
+                {"user_id": row["user_id"], "total": row.get("total"), "unread": row.get("unread")},
+                {"$set": {"total": expected[0], "unread": expected[1]}}
+            ))
+    for user_id, (total, unread) in notification_counts.items():
+        # A row created during the scan already counts the notifications written since
+        operations.append(UpdateOne({"user_id": user_id}, {"$setOnInsert": {"total": total, "unread": unread}}, upsert=True))
+    repaired["notification_counts"] = await bulk_write_counters(db.notification_counts, operations)
+    
+    # Question counts per tag and subject
+    stored_facets = await db.question_facet_counts.find({}, {"_id": 0, "id": 1, "count": 1}).to_list(None)
+    facet_counts = {}
+    async for row in db.questions.aggregate([
+        {"$project": {"facets": {"$concatArrays": [
+            {"$setUnion": [{"$map": {"input": {"$ifNull": ["$tags", []]}, "in": {"$concat": ["tag:", "$$this"]}}}]},
+            {"$cond": [{"$gt": ["$subject", ""]}, [{"$concat": ["subject:", "$subject"]}], []]}
+        ]}}},
+        {"$unwind": "$facets"},
+        {"$group": {"_id": "$facets", "count": {"$sum": 1}}}
+    ]):
+        facet_counts[row["_id"]] = row["count"]
+    operations = [
+        UpdateOne({"id": row["id"], "count": row.get("count")}, {"$set": {"count": facet_counts.get(row["id"], 0)}})
+        for row in stored_facets if row.get("count") != facet_counts.get(row["id"], 0)
+    ]
+    stored_ids = {row["id"] for row in stored_facets}
+    for facet_id, count in facet_counts.items():
+        if facet_id not in stored_ids:
+            # A facet created during the scan already counts its own questions
+            facet, value = facet_id.split(":", 1)
+            operations.append(UpdateOne(
+                {"id": facet_id}, {"$setOnInsert": {"facet": facet, "value": value, "count": count}}, upsert=True
+            ))
+    repaired["question_facet_counts"] = 0
+    if operations:
+        result = await db.question_facet_counts.bulk_write(operations, ordered=False)
+        repaired["question_facet_counts"] = result.modified_count + result.upserted_count
+        tag_cloud_cache.clear()
+    repaired["user_stats"] = await rebuild_user_stats()
+    
+    total = sum(repaired.values())
+    if total:
+        logger.info(f"Counter reconciliation repaired {total} document(s): {repaired}")
+    return repaired
+
+@api_router.post("/admin/counters/reconcile")
+async def reconcile_counters_now(admin_user: User = Depends(get_admin_user)):
+    """Recompute denormalized counters immediately (admin only)"""
+    repaired = await reconcile_counters()
+    return {"message": "Counters reconciled", "repaired": repaired}
+
+# =====================================
+# VIEW COUNTERS
+# =====================================
+# Page views are counted in memory by each worker and written with one bulk $inc
+# per collection, so a view costs a dict update instead of a database write.
+# Views buffered when a worker dies uncleanly are lost, which is fine for a
+# popularity signal.
+
+VIEW_FLUSH_INTERVAL_SECONDS = 30
+VIEW_COUNTED_COLLECTIONS = ("questions", "quizzes")
+pending_views = {collection_name: {} for collection_name in VIEW_COUNTED_COLLECTIONS}
+
+def record_view(collection_name: str, doc_id: str):
+    buffer = pending_views[collection_name]
+    buffer[doc_id] = buffer.get(doc_id, 0) + 1
+
+async def flush_view_counts():
+    """Write the buffered views of this worker"""
+    for collection_name in VIEW_COUNTED_COLLECTIONS:
+        buffer = pending_views[collection_name]
+        if not buffer:
+            continue
+        pending_views[collection_name] = {}
+        try:
+            # updated_at is left alone so views do not look like edits to the sync jobs
+            await db[collection_name].bulk_write([
+                UpdateOne({"id": doc_id}, {"$inc": {"view_count": views}})
+                for doc_id, views in buffer.items()
+            ], ordered=False)
+        except Exception:
+            # Keep the views for the next flush
+            for doc_id, views in buffer.items():
+                pending_views[collection_name][doc_id] = pending_views[collection_name].get(doc_id, 0) + views
+            raise
+
+# =====================================
+# BACKGROUND JOBS
+# =====================================
+
+JOB_LEASE_SLACK_SECONDS = 60  # Lets the next run start on any worker despite timer drift
+
+background_jobs = []
+background_tasks = set()  # Strong references keep fire-and-forget tasks alive
+
+def run_in_background(name: str, coroutine):
+    """Run a coroutine after the current request without waiting for it"""
+    task = asyncio.create_task(coroutine)
+    background_tasks.add(task)
+    
+    def finished(done: asyncio.Task):
+        background_tasks.discard(done)
+        if not done.cancelled() and done.exception():
+            logger.error(f"Background task {name} failed: {str(done.exception())}")
+    
+    task.add_done_callback(finished)
+
+async def acquire_job_lease(name: str, seconds: float) -> bool:
+    """Claim a job until the lease expires; False while another worker holds it"""
+    now = datetime.utcnow()
+    try:
+        # Only an expired lease matches, so a held one makes the upsert collide on the id
+        await db.job_leases.update_one(
+            {"id": name, "expires_at": {"$lte": now}},
+            {"$set": {"expires_at": now + timedelta(seconds=seconds)}},
+            upsert=True
         )
-        await db.notifications.insert_one(notification.dict())
+    except DuplicateKeyError:
+        return False
+    return True
+
+async def run_periodically(name: str, interval_seconds: float, job, run_immediately: bool = False, exclusive: bool = False):
+    """Run a coroutine function forever at a fixed interval, logging failures
+    
+    Exclusive jobs run on one worker per interval, whichever claims the lease first.
+    """
+    if not run_immediately:
+        await asyncio.sleep(interval_seconds)
+    lease_seconds = max(interval_seconds - JOB_LEASE_SLACK_SECONDS, interval_seconds / 2)
+    while True:
+        try:
+            if not exclusive or await acquire_job_lease(name, lease_seconds):
+                await job()
+        except Exception as e:
+            logger.error(f"Background job {name} failed: {str(e)}")
+        await asyncio.sleep(interval_seconds)
+
+def start_background_jobs():
+    """Start the periodic maintenance jobs of this worker"""
+    background_jobs.append(asyncio.create_task(
+        run_periodically("recalibrate_adaptive_quizzes", CAT_CALIBRATION_INTERVAL_SECONDS, recalibrate_adaptive_quizzes)
+    ))
+    background_jobs.append(asyncio.create_task(
+        run_periodically("reconcile_counters", COUNTER_RECONCILE_INTERVAL_SECONDS, reconcile_counters, run_immediately=True, exclusive=True)
+    ))
+    background_jobs.append(asyncio.create_task(
+        run_periodically("refresh_hot_scores", HOT_SCORE_REFRESH_INTERVAL_SECONDS, refresh_hot_scores, run_immediately=True)
+    ))
+    background_jobs.append(asyncio.create_task(warm_search_index()))
+    background_jobs.append(asyncio.create_task(
+        run_periodically("rebuild_related_questions", RELATED_REBUILD_INTERVAL_SECONDS, rebuild_related_questions, run_immediately=True)
+    ))
+    background_jobs.append(asyncio.create_task(
+        run_periodically("rebuild_follow_suggestions", FOLLOW_SUGGESTION_REBUILD_INTERVAL_SECONDS, rebuild_follow_suggestions, exclusive=True)
+    ))
+    background_jobs.append(asyncio.create_task(
+        run_periodically("watch_notification_changes", NOTIFICATION_STREAM_POLL_SECONDS, watch_notification_changes, run_immediately=True)
+    ))
+    background_jobs.append(asyncio.create_task(
+        run_periodically("flush_notification_digests", NOTIFICATION_DIGEST_FLUSH_INTERVAL_SECONDS, flush_notification_digests)
+    ))
+    background_jobs.append(asyncio.create_task(
+        run_periodically("flush_view_counts", VIEW_FLUSH_INTERVAL_SECONDS, flush_view_counts)
+    ))
+    background_jobs.append(asyncio.create_task(
+        run_periodically("rebuild_autocomplete", AUTOCOMPLETE_REBUILD_INTERVAL_SECONDS, rebuild_autocomplete, run_immediately=True)
+    ))
+    background_jobs.append(asyncio.create_task(
+        run_periodically("sync_search_index", SEARCH_SYNC_INTERVAL_SECONDS, sync_search_index)
+    ))
+    background_jobs.append(asyncio.create_task(
+        run_periodically("rebuild_duplicate_index", DUPLICATE_REBUILD_INTERVAL_SECONDS, rebuild_duplicate_index, run_immediately=True)
+    ))
+    background_jobs.append(asyncio.create_task(
+        run_periodically("rebuild_search_index", SEARCH_REBUILD_INTERVAL_SECONDS, rebuild_search_index)
+    ))
+    background_jobs.append(asyncio.create_task(
+        run_periodically("save_search_snapshot", SEARCH_SNAPSHOT_INTERVAL_SECONDS, save_search_snapshot)
+    ))
+
+INDEX_NOT_FOUND_CODE = 27
+
+async def ensure_unique_index(collection, keys: list, keep_sort: dict):
+    """Create a unique index, first removing duplicates and any plain index on the keys
+    
+    Of each group of duplicates the first document in keep_sort order is kept.
+    """
+    indexes = await collection.index_information()
+    existing = {name: spec for name, spec in indexes.items() if list(spec["key"]) == keys}
+    if any(spec.get("unique") for spec in existing.values()):
+        return
+    
+    async for row in collection.aggregate([
+        {"$sort": keep_sort},
+        {"$group": {"_id": {field: f"${field}" for field, _ in keys}, "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}}
+    ], allowDiskUse=True):
+        await collection.delete_many({"_id": {"$in": row["ids"][1:]}})
+    for name in existing:
+        try:
+            await collection.drop_index(name)
+        except OperationFailure as e:
+            # Another worker starting at the same time dropped it first
+            if e.code != INDEX_NOT_FOUND_CODE:
+                raise
+    await collection.create_index(keys, unique=True)
+
+async def ensure_indexes():
+    """Create the indexes backing the denormalized collections"""
+    await db.migrations.create_index("id", unique=True)
+    await db.job_leases.create_index("id", unique=True)
+    await db.question_stats.create_index([("quiz_id", 1), ("question_id", 1)], unique=True)
+    await db.quiz_attempts.create_index([("quiz_id", 1), ("attempted_at", 1)])
+    await ensure_unique_index(db.item_parameters, [("quiz_id", 1), ("question_id", 1)], {"calibrated_at": -1})
+    await db.question_bank.create_index("id", unique=True)
+    await db.question_bank.create_index("content_hash")
+    await db.quizzes.create_index("question_ids")
+    await db.question_stats.create_index("question_id")
+    await db.users.create_index("id")
+    await db.votes.create_index([("user_id", 1), ("target_type", 1), ("target_id", 1)], unique=True)
+    await db.votes.create_index([("target_type", 1), ("target_id", 1)])
+    await db.answers.create_index("question_id")
+    for sort_field in ("created_at", "updated_at", "upvotes", "answer_count", "view_count", "hot_score"):
+        await db.questions.create_index([(sort_field, -1), ("id", -1)])
+    await db.questions.create_index([("is_pinned", -1), ("hot_score", -1), ("id", -1)])
+    await db.questions.create_index([("subject", 1), ("is_pinned", -1), ("hot_score", -1), ("id", -1)])
+    await db.questions.create_index([("tags", 1), ("created_at", -1), ("id", -1)])
+    await db.questions.create_index([("tags", 1), ("is_pinned", -1), ("hot_score", -1), ("id", -1)])
+    await db.question_facet_counts.create_index("id", unique=True)
+    await db.related_questions.create_index("question_id", unique=True)
+    await ensure_unique_index(db.activities, [("id", 1)], {"created_at": 1})
+    await db.activities.create_index("source_id")
+    await db.activities.create_index("related_id")
+    await db.activities.create_index([("user_id", 1), ("created_at", -1), ("id", -1)])
+    await db.activities.create_index([("user_id", 1), ("activity_type", 1), ("created_at", -1), ("id", -1)])
+    await db.timelines.create_index([("owner_id", 1), ("id", 1)], unique=True)
+    await db.timelines.create_index([("owner_id", 1), ("created_at", -1), ("id", -1)])
+    await db.timelines.create_index([("owner_id", 1), ("user_id", 1)])
+    await db.timelines.create_index("id")
+    await db.timelines.create_index("user_id")
+    await db.users.create_index("follower_count")
+    await db.related_questions.create_index("related.id")
+    await db.related_questions.create_index("updated_at")
+    await db.question_facet_counts.create_index([("facet", 1), ("count", -1), ("value", 1)])
+    await db.questions.create_index([("subject", 1), ("created_at", -1), ("id", -1)])
+    await db.questions.create_index([("user_id", 1), ("created_at", -1), ("id", -1)])
+    await db.answers.create_index([("user_id", 1), ("created_at", -1), ("id", -1)])
+    await db.notifications.create_index([("user_id", 1), ("created_at", -1), ("id", -1)])
+    await db.notifications.create_index([("user_id", 1), ("is_read", 1), ("created_at", -1), ("id", -1)])
+    await db.notification_counts.create_index("user_id", unique=True)
+    await db.notification_digests.create_index("id", unique=True)
+    await db.notification_digests.create_index("flush_at")
+    await db.follow_suggestions.create_index("user_id", unique=True)
+    await db.user_stats.create_index("user_id", unique=True)
+    await db.follow_suggestions.create_index("updated_at")
+    await db.quiz_attempts.create_index("attempted_at")
+    await db.bookmarks.create_index([("user_id", 1), ("created_at", -1), ("id", -1)])
+    await db.bookmarks.create_index([("user_id", 1), ("item_type", 1), ("created_at", -1), ("id", -1)])
+    await db.follows.create_index([("follower_id", 1), ("created_at", -1), ("id", -1)])
+    await db.follows.create_index([("following_id", 1), ("created_at", -1), ("id", -1)])
+    await db.follows.create_index([("follower_id", 1), ("status", 1), ("created_at", -1), ("id", -1)])
+    await db.follows.create_index([("following_id", 1), ("status", 1), ("created_at", -1), ("id", -1)])
+    await ensure_unique_index(db.answer_reactions, [("answer_id", 1), ("user_id", 1)], {"created_at": -1})
+    # Approved follows sort first, so they are the ones kept
+    await ensure_unique_index(db.follows, [("follower_id", 1), ("following_id", 1)], {"status": 1, "created_at": 1})
+    await db.follows.create_index([("following_id", 1), ("status", 1)])
+    await db.adaptive_sessions.create_index([("user_id", 1), ("quiz_id", 1), ("status", 1)])
+    await db.answers.create_index([("question_id", 1), ("created_at", -1), ("id", -1)])
+    await db.discussions.create_index("id")
+    await db.discussions.create_index([("question_id", 1), ("path", 1)])
+    await db.discussions.create_index([("question_id", 1), ("depth", 1), ("created_at", 1), ("id", 1)])
 
 @app.on_event("startup")
 async def startup_initialize():
     """Initialize application on startup"""
     logger.info("🚀 Starting Squiz application...")
     
+    await ensure_indexes()
+    await migrate_legacy_votes()
+    await migrate_discussion_threads()
+    await migrate_user_follows()
+    await backfill_activities()
+    start_background_jobs()
+    
     # Create admin user if it doesn't exist
     admin_email = "admin@squiz.com"
     existing_admin = await db.users.find_one({"email": admin_email})
@@ -5189,6 +9001,10 @@ async def startup_initialize():
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    for job in background_jobs:
+        job.cancel()
+    await flush_view_counts()
+    await save_search_snapshot()
     client.close()
 
 # Include router after all endpoints are defined
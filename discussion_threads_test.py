@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Threaded Discussion Testing for Squiz Platform
+Tests discussion trees:
+1. Replies inherit the thread and path of their parent
+2. Threads are paginated with a preview of their first replies
+3. Subtrees expand depth-first with cursor pagination
+4. Deleting a message removes its replies and updates counters
+"""
+
+import requests
+import sys
+import uuid
+
+BACKEND_URL = "http://localhost:8001/api"
+
+class DiscussionThreadsTester:
+    def __init__(self):
+        self.token = None
+        self.question_id = None
+        self.tests_run = 0
+        self.tests_passed = 0
+
+    def log_test(self, name, success, details=""):
+        self.tests_run += 1
+        if success:
+            self.tests_passed += 1
+        print(f"{'✅ PASS' if success else '❌ FAIL'}: {name}")
+        if details:
+            print(f"   Details: {details}")
+
+    def headers(self):
+        return {"Authorization": f"Bearer {self.token}", "Content-Type": "application/json"}
+
+    def setup(self):
+        email = f"threads_{uuid.uuid4().hex[:8]}@example.com"
+        requests.post(f"{BACKEND_URL}/auth/register", json={"email": email, "name": "Thread User", "password": "password123"}, timeout=10)
+        response = requests.post(f"{BACKEND_URL}/auth/login", json={"email": email, "password": "password123"}, timeout=10)
+        if response.status_code != 200:
+            print(f"❌ Login failed: {response.text}")
+            return False
+        self.token = response.json()["access_token"]
+
+        response = requests.post(
+            f"{BACKEND_URL}/questions",
+            json={"title": "Threaded discussion question", "content": "Used for discussion thread testing"},
+            headers=self.headers(),
+            timeout=10
+        )
+        if response.status_code != 200:
+            print(f"❌ Question creation failed: {response.text}")
+            return False
+        self.question_id = response.json()["id"]
+        return True
+
+    def post(self, message, reply_to_id=None):
+        response = requests.post(
+            f"{BACKEND_URL}/questions/{self.question_id}/discussions",
+            json={"message": message, "reply_to_id": reply_to_id},
+            headers=self.headers(),
+            timeout=10
+        )
+        return response.json() if response.status_code == 200 else None
+
+    def test_reply_paths(self):
+        self.root = self.post("Root message")
+        self.first = self.post("First reply", self.root["id"])
+        self.nested = self.post("Nested reply", self.first["id"])
+        self.second = self.post("Second reply", self.root["id"])
+        self.other_root = self.post("Another thread")
+
+        self.log_test(
+            "Replies inherit thread and path",
+            self.nested["thread_id"] == self.root["id"]
+            and self.nested["depth"] == 2
+            and self.nested["path"].startswith(self.first["path"]),
+            str(self.nested)
+        )
+
+        response = requests.post(
+            f"{BACKEND_URL}/questions/{self.question_id}/discussions",
+            json={"message": "Orphan", "reply_to_id": str(uuid.uuid4())},
+            headers=self.headers(),
+            timeout=10
+        )
+        self.log_test("Reply to unknown message returns 404", response.status_code == 404, f"Status: {response.status_code}")
+
+    def test_thread_page(self):
+        response = requests.get(f"{BACKEND_URL}/questions/{self.question_id}/threads?limit=1&replies=2", timeout=10)
+        data = response.json() if response.status_code == 200 else {}
+        threads = data.get("threads", [])
+        ok = (
+            len(threads) == 1
+            and threads[0]["thread"]["id"] == self.root["id"]
+            and [reply["id"] for reply in threads[0]["replies"]] == [self.first["id"], self.nested["id"]]
+            and threads[0]["has_more_replies"] is True
+            and data.get("next_cursor")
+        )
+        self.log_test("First thread page with reply preview", bool(ok), str(data)[:300])
+
+        response = requests.get(f"{BACKEND_URL}/questions/{self.question_id}/threads?limit=1&cursor={data.get('next_cursor')}", timeout=10)
+        data = response.json() if response.status_code == 200 else {}
+        ids = [thread["thread"]["id"] for thread in data.get("threads", [])]
+        self.log_test("Second thread page", ids == [self.other_root["id"]] and data.get("next_cursor") is None, str(ids))
+
+    def test_subtree_expansion(self):
+        response = requests.get(f"{BACKEND_URL}/discussions/{self.root['id']}/replies?limit=2", timeout=10)
+        data = response.json() if response.status_code == 200 else {}
+        ids = [reply["id"] for reply in data.get("replies", [])]
+        cursor = data.get("next_cursor")
+        response = requests.get(f"{BACKEND_URL}/discussions/{self.root['id']}/replies?limit=2&cursor={cursor}", timeout=10)
+        data = response.json() if response.status_code == 200 else {}
+        ids += [reply["id"] for reply in data.get("replies", [])]
+        self.log_test(
+            "Subtree expands depth-first across pages",
+            ids == [self.first["id"], self.nested["id"], self.second["id"]],
+            str(ids)
+        )
+
+    def test_delete_subtree(self):
+        requests.delete(f"{BACKEND_URL}/questions/{self.question_id}/discussions/{self.first['id']}", headers=self.headers(), timeout=10)
+        response = requests.get(f"{BACKEND_URL}/questions/{self.question_id}/threads?limit=1&replies=5", timeout=10)
+        thread = response.json()["threads"][0] if response.status_code == 200 else {}
+        ok = (
+            [reply["id"] for reply in thread.get("replies", [])] == [self.second["id"]]
+            and thread["thread"]["reply_count"] == 1
+            and thread["thread"]["thread_reply_count"] == 1
+        )
+        self.log_test("Deleting a message removes its replies", bool(ok), str(thread)[:300])
+
+    def cleanup(self):
+        if self.question_id:
+            requests.delete(f"{BACKEND_URL}/questions/{self.question_id}", headers=self.headers(), timeout=10)
+
+    def run_all_tests(self):
+        print("🚀 Starting Discussion Thread Tests")
+        if not self.setup():
+            return False
+        try:
+            self.test_reply_paths()
+            self.test_thread_page()
+            self.test_subtree_expansion()
+            self.test_delete_subtree()
+        finally:
+            self.cleanup()
+        print(f"\n📊 Tests passed: {self.tests_passed}/{self.tests_run}")
+        return self.tests_passed == self.tests_run
+
+if __name__ == "__main__":
+    tester = DiscussionThreadsTester()
+    sys.exit(0 if tester.run_all_tests() else 1)
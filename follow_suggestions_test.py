@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Follow Suggestions Ranking Testing for Squiz Platform
+Tests the "people you may know" ranking, without a running server:
+1. Friends of friends are ranked by the number of mutual follows
+2. Users already followed, and the user themselves, are never suggested
+3. Active users in the same subjects are suggested with their shared subjects
+4. Mutual follows outweigh a shared subject
+5. Only active users get suggestions, and lists are capped
+"""
+
+import os
+import sys
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "squiz_test")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import server  # noqa: E402
+
+class FollowSuggestionsTester:
+    def __init__(self):
+        self.tests_run = 0
+        self.tests_passed = 0
+
+    def log_test(self, name, success, details=""):
+        self.tests_run += 1
+        if success:
+            self.tests_passed += 1
+        print(f"{'✅ PASS' if success else '❌ FAIL'}: {name}")
+        if details:
+            print(f"   Details: {details}")
+
+    def build(self, active_ids, following, subjects=None):
+        excluded = {user_id: {user_id, *following.get(user_id, [])} for user_id in active_ids}
+        return server.build_follow_suggestions(set(active_ids), following, excluded, subjects or {})
+
+    def test_friends_of_friends(self):
+        following = {
+            "alice": ["bob", "carol"],
+            "bob": ["dave", "erin", "alice"],
+            "carol": ["dave", "bob"]
+        }
+        suggestions = self.build({"alice"}, following)["alice"]
+        ids = [item["user_id"] for item in suggestions]
+        self.log_test(
+            "Friends of friends ranked by mutual follows",
+            ids == ["dave", "erin"] and suggestions[0]["mutual_count"] == 2,
+            f"Suggestions: {suggestions}"
+        )
+        self.log_test(
+            "Followed users and the user are not suggested",
+            not {"alice", "bob", "carol"} & set(ids),
+            f"Suggested: {ids}"
+        )
+
+    def test_subject_peers(self):
+        subjects = {
+            "alice": {"Physics": 5, "Art": 1},
+            "frank": {"Physics": 9},
+            "grace": {"History": 4}
+        }
+        suggestions = self.build({"alice", "frank", "grace"}, {}, subjects)["alice"]
+        self.log_test(
+            "Subject peers are suggested with shared subjects",
+            [item["user_id"] for item in suggestions] == ["frank"] and suggestions[0]["shared_subjects"] == ["Physics"],
+            f"Suggestions: {suggestions}"
+        )
+
+    def test_mutual_outweighs_subject(self):
+        following = {"alice": ["bob"], "bob": ["dave"]}
+        subjects = {"alice": {"Physics": 3}, "frank": {"Physics": 3}}
+        suggestions = self.build({"alice", "frank"}, following, subjects)["alice"]
+        self.log_test(
+            "A mutual follow outweighs a shared subject",
+            [item["user_id"] for item in suggestions] == ["dave", "frank"],
+            f"Suggestions: {suggestions}"
+        )
+
+    def test_active_only_and_capped(self):
+        following = {"alice": ["hub"], "hub": [f"user{i}" for i in range(server.FOLLOW_SUGGESTION_COUNT + 10)]}
+        suggestions = self.build({"alice"}, following)
+        self.log_test(
+            "Only active users get capped suggestion lists",
+            set(suggestions) == {"alice"} and len(suggestions["alice"]) == server.FOLLOW_SUGGESTION_COUNT,
+            f"Users: {sorted(suggestions)}, count: {len(suggestions.get('alice', []))}"
+        )
+
+    def run_all_tests(self):
+        print("🚀 Starting Follow Suggestions Ranking Tests")
+        self.test_friends_of_friends()
+        self.test_subject_peers()
+        self.test_mutual_outweighs_subject()
+        self.test_active_only_and_capped()
+        print(f"\n📊 Tests passed: {self.tests_passed}/{self.tests_run}")
+        return self.tests_passed == self.tests_run
+
+if __name__ == "__main__":
+    tester = FollowSuggestionsTester()
+    sys.exit(0 if tester.run_all_tests() else 1)
@@ -7691,7 +7691,16 @@ function QAForum({ user }) {
       if (subcategory) url += `&subcategory=${encodeURIComponent(subcategory)}`;
       
       const response = await apiCall(url);
-      setQuestions(response.data.questions || []);
+      const fetchedQuestions = response.data.questions || [];
+      
+      // Look up the current user's votes for the whole page at once
+      if (user && fetchedQuestions.length > 0) {
+        const ids = fetchedQuestions.map(q => q.id).join(',');
+        const votesResponse = await apiCall(`/my-votes?target_type=question&ids=${encodeURIComponent(ids)}`);
+        const votes = votesResponse.data.votes || {};
+        fetchedQuestions.forEach(q => { q.my_vote = votes[q.id] || null; });
+      }
+      setQuestions(fetchedQuestions);
     } catch (error) {
       console.error('Error fetching questions:', error);
       setQuestions([]);
@@ -7941,8 +7950,8 @@ function QuestionCard({ question, onClick, currentUser }) {
   };
 
   const isOwnQuestion = currentUser && question.user && question.user.id === currentUser.id;
-  const hasUpvoted = currentUser && question.upvoted_by && question.upvoted_by.includes(currentUser.id);
-  const hasDownvoted = currentUser && question.downvoted_by && question.downvoted_by.includes(currentUser.id);
+  const hasUpvoted = currentUser && question.my_vote === 'upvote';
+  const hasDownvoted = currentUser && question.my_vote === 'downvote';
 
   return (
     <AdminPostContainer
@@ -8362,7 +8371,13 @@ function AskQuestionForm({ user, availableSubjects, onCancel, onQuestionCreated
 // Question Detail Component (placeholder for now)
 function QuestionDetail({ question, user, onBack, onQuestionUpdate }) {
   const [answers, setAnswers] = useState([]);
+  const [answersCursor, setAnswersCursor] = useState(null);
+  const [answerCount, setAnswerCount] = useState(0);
   const [discussions, setDiscussions] = useState([]);
+  const [threadsCursor, setThreadsCursor] = useState(null);
+  const [discussionCount, setDiscussionCount] = useState(0);
+  const [replyCursors, setReplyCursors] = useState({});
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [showAnswerForm, setShowAnswerForm] = useState(false);
   const [newAnswer, setNewAnswer] = useState({ content: '', image: null });
@@ -8378,14 +8393,78 @@ function QuestionDetail({ question, user, onBack, onQuestionUpdate }) {
     setLoading(true);
     try {
       const response = await apiCall(`/questions/${question.id}`);
-      setAnswers(response.data.answers || []);
-      setDiscussions(response.data.discussions || []);
+      const loadedAnswers = response.data.answers || [];
+      const loadedDiscussions = response.data.discussions || [];
+      setAnswers(loadedAnswers);
+      setAnswersCursor(response.data.answers_next_cursor || null);
+      setAnswerCount(response.data.question?.answer_count ?? loadedAnswers.length);
+      setDiscussions(loadedDiscussions);
+      setThreadsCursor(response.data.discussions_next_cursor || null);
+      setDiscussionCount(response.data.discussion_count ?? loadedDiscussions.length);
+      setReplyCursors({});
     } catch (error) {
       console.error('Error fetching question detail:', error);
     }
     setLoading(false);
   };
 
+  const loadMoreAnswers = async () => {
+    setLoadingMore(true);
+    try {
+      const response = await apiCall(`/questions/${question.id}/answers?cursor=${encodeURIComponent(answersCursor)}`);
+      setAnswers(prev => [...prev, ...response.data.answers]);
+      setAnswersCursor(response.data.next_cursor || null);
+    } catch (error) {
+      console.error('Error loading answers:', error);
+    }
+    setLoadingMore(false);
+  };
+
+  const loadMoreThreads = async () => {
+    setLoadingMore(true);
+    try {
+      const response = await apiCall(`/questions/${question.id}/threads?cursor=${encodeURIComponent(threadsCursor)}`);
+      const messages = response.data.threads.flatMap(thread => [thread.thread, ...thread.replies]);
+      // Messages posted on this page since it loaded may come back in later pages
+      setDiscussions(prev => [...prev, ...messages.filter(m => !prev.some(d => d.id === m.id))]);
+      setThreadsCursor(response.data.next_cursor || null);
+    } catch (error) {
+      console.error('Error loading discussions:', error);
+    }
+    setLoadingMore(false);
+  };
+
+  // Replies are loaded depth-first; the first page replaces the preview of the thread
+  const loadMoreReplies = async (root) => {
+    const cursor = replyCursors[root.id];
+    setLoadingMore(true);
+    try {
+      const response = await apiCall(
+        `/discussions/${root.id}/replies${cursor ? `?cursor=${encodeURIComponent(cursor)}` : ''}`
+      );
+      setDiscussions(prev => {
+        const kept = cursor ? prev : prev.filter(d => d.thread_id !== root.id || d.id === root.id);
+        const loaded = kept.filter(d => d.thread_id === root.id);
+        const insertAt = kept.indexOf(loaded[loaded.length - 1]) + 1;
+        return [...kept.slice(0, insertAt), ...response.data.replies, ...kept.slice(insertAt)];
+      });
+      setReplyCursors(prev => ({ ...prev, [root.id]: response.data.next_cursor || null }));
+    } catch (error) {
+      console.error('Error loading replies:', error);
+    }
+    setLoadingMore(false);
+  };
+
+  const hiddenReplyCount = (root) => {
+    const loaded = discussions.filter(d => d.thread_id === root.id && d.id !== root.id).length;
+    return Math.max((root.thread_reply_count || 0) - loaded, 0);
+  };
+
+  const isLastLoadedInThread = (discussion, index) => {
+    const next = discussions[index + 1];
+    return !next || next.thread_id !== discussion.thread_id;
+  };
+
   const submitAnswer = async (e) => {
     e.preventDefault();
     if (!newAnswer.content.trim()) return;
@@ -8403,6 +8482,7 @@ function QuestionDetail({ question, user, onBack, onQuestionUpdate }) {
       };
       
       setAnswers([...answers, answerWithUser]);
+      setAnswerCount(count => count + 1);
       setNewAnswer({ content: '', image: null });
       setShowAnswerForm(false);
     } catch (error) {
@@ -8429,6 +8509,7 @@ function QuestionDetail({ question, user, onBack, onQuestionUpdate }) {
       };
       
       setDiscussions([...discussions, discussionWithUser]);
+      setDiscussionCount(count => count + 1);
       setNewDiscussion({ message: '', image: null });
     } catch (error) {
       console.error('Error submitting discussion:', error);
@@ -8542,7 +8623,7 @@ function QuestionDetail({ question, user, onBack, onQuestionUpdate }) {
       <div className="bg-white rounded-lg shadow-sm p-6 mb-6">
         <div className="flex justify-between items-center mb-6">
           <h2 className="text-xl font-semibold text-gray-800">
-            {answers.length} Answer{answers.length !== 1 ? 's' : ''}
+            {answerCount} Answer{answerCount !== 1 ? 's' : ''}
           </h2>
           <button
             onClick={() => setShowAnswerForm(!showAnswerForm)}
@@ -8637,12 +8718,21 @@ function QuestionDetail({ question, user, onBack, onQuestionUpdate }) {
             </AdminPostContainer>
           ))}
         </div>
+        {answersCursor && (
+          <button
+            onClick={loadMoreAnswers}
+            disabled={loadingMore}
+            className="mt-6 w-full border border-gray-300 text-gray-700 px-4 py-2 rounded-lg hover:bg-gray-50 transition duration-200 disabled:opacity-50"
+          >
+            Load more answers
+          </button>
+        )}
       </div>
 
       {/* Discussion Section */}
       <div className="bg-white rounded-lg shadow-sm p-6">
         <h2 className="text-xl font-semibold text-gray-800 mb-6">
-          Discussion ({discussions.length})
+          Discussion ({discussionCount})
         </h2>
 
         {/* Discussion Form */}
@@ -8666,34 +8756,58 @@ function QuestionDetail({ question, user, onBack, onQuestionUpdate }) {
 
         {/* Discussion Messages */}
         <div className="space-y-4">
-          {discussions.map((discussion) => (
-            <div key={discussion.id} className="flex space-x-3">
-              <div className="flex-shrink-0">
-                <div className="w-8 h-8 bg-blue-500 rounded-full flex items-center justify-center">
-                  <span className="text-white text-xs font-semibold">
-                    {discussion.user && discussion.user.name ? discussion.user.name.charAt(0).toUpperCase() : 'U'}
-                  </span>
-                </div>
-              </div>
-              <div className="flex-1 min-w-0">
-                <div className="flex items-center space-x-2 mb-1">
-                  <span className="font-medium text-gray-800">{discussion.user ? discussion.user.name : 'Unknown User'}</span>
-                  <span className="text-xs text-gray-500">
-                    {new Date(discussion.created_at).toLocaleString()}
-                  </span>
+          {discussions.map((discussion, index) => {
+            const root = discussions.find(d => d.id === discussion.thread_id);
+            const hiddenReplies = root && isLastLoadedInThread(discussion, index) ? hiddenReplyCount(root) : 0;
+            return (
+              <React.Fragment key={discussion.id}>
+                <div className="flex space-x-3" style={{ marginLeft: `${Math.min(discussion.depth || 0, 6) * 1.5}rem` }}>
+                  <div className="flex-shrink-0">
+                    <div className="w-8 h-8 bg-blue-500 rounded-full flex items-center justify-center">
+                      <span className="text-white text-xs font-semibold">
+                        {discussion.user && discussion.user.name ? discussion.user.name.charAt(0).toUpperCase() : 'U'}
+                      </span>
+                    </div>
+                  </div>
+                  <div className="flex-1 min-w-0">
+                    <div className="flex items-center space-x-2 mb-1">
+                      <span className="font-medium text-gray-800">{discussion.user ? discussion.user.name : 'Unknown User'}</span>
+                      <span className="text-xs text-gray-500">
+                        {new Date(discussion.created_at).toLocaleString()}
+                      </span>
+                    </div>
+                    <div className="text-gray-700 text-sm whitespace-pre-wrap">{discussion.message}</div>
+                    {discussion.image && (
+                      <img
+                        src={discussion.image}
+                        alt="Discussion"
+                        className="mt-2 max-w-xs max-h-32 rounded-lg shadow-sm"
+                      />
+                    )}
+                  </div>
                 </div>
-                <div className="text-gray-700 text-sm whitespace-pre-wrap">{discussion.message}</div>
-                {discussion.image && (
-                  <img
-                    src={discussion.image}
-                    alt="Discussion"
-                    className="mt-2 max-w-xs max-h-32 rounded-lg shadow-sm"
-                  />
+                {hiddenReplies > 0 && (
+                  <button
+                    onClick={() => loadMoreReplies(root)}
+                    disabled={loadingMore}
+                    className="ml-11 text-sm text-blue-600 hover:text-blue-800 disabled:opacity-50"
+                  >
+                    Show {hiddenReplies} more repl{hiddenReplies === 1 ? 'y' : 'ies'}
+                  </button>
                 )}
-              </div>
-            </div>
-          ))}
+              </React.Fragment>
+            );
+          })}
         </div>
+        {threadsCursor && (
+          <button
+            onClick={loadMoreThreads}
+            disabled={loadingMore}
+            className="mt-6 w-full border border-gray-300 text-gray-700 px-4 py-2 rounded-lg hover:bg-gray-50 transition duration-200 disabled:opacity-50"
+          >
+            Load more messages
+          </button>
+        )}
       </div>
     </div>
   );
@@ -8711,7 +8825,7 @@ function ActivityFeed({ user }) {
   const [activities, setActivities] = useState([]);
   const [loading, setLoading] = useState(true);
   const [hasMore, setHasMore] = useState(false);
-  const [offset, setOffset] = useState(0);
+  const [nextCursor, setNextCursor] = useState(null);
   const [refreshing, setRefreshing] = useState(false);
 
   useEffect(() => {
@@ -8719,21 +8833,20 @@ function ActivityFeed({ user }) {
   }, []);
 
   const fetchActivities = async (isInitial = false) => {
-    const currentOffset = isInitial ? 0 : offset;
     setLoading(isInitial);
     
     try {
-      const response = await apiCall(`/user/activity-feed?limit=20&offset=${currentOffset}`);
+      const cursorParam = !isInitial && nextCursor ? `&cursor=${encodeURIComponent(nextCursor)}` : '';
+      const response = await apiCall(`/user/activity-feed?limit=20${cursorParam}`);
       const data = response.data;
       
       if (isInitial) {
         setActivities(data.activities);
-        setOffset(20);
       } else {
         setActivities(prev => [...prev, ...data.activities]);
-        setOffset(prev => prev + 20);
       }
       
+      setNextCursor(data.next_cursor);
       setHasMore(data.has_more);
     } catch (error) {
       console.error('Error fetching activities:', error);
@@ -9050,6 +9163,19 @@ const NotificationBell = ({ setCurrentView, currentView }) => {
   useEffect(() => {
     fetchNotificationCount();
     fetchRecentNotifications();
+
+    const token = localStorage.getItem('token');
+    if (!token || typeof EventSource === 'undefined') return;
+
+    const stream = new EventSource(`${API}/notifications/stream?token=${encodeURIComponent(token)}`);
+    stream.addEventListener('count', (event) => {
+      setNotificationCount(JSON.parse(event.data).unread_count);
+    });
+    stream.addEventListener('notification', (event) => {
+      const notification = JSON.parse(event.data);
+      setNotifications(prev => [notification, ...prev.filter(n => n.id !== notification.id)].slice(0, 5));
+    });
+    return () => stream.close();
   }, []);
 
   const fetchNotificationCount = async () => {
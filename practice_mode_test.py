@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Practice Mode Testing for Squiz Platform
+Tests single-question grading:
+1. Correct and incorrect answers are graded instantly
+2. Unknown question IDs return 404
+3. Practice grading does not record a quiz attempt
+4. Practice on draft quizzes is rejected
+"""
+
+import requests
+import sys
+import uuid
+
+BACKEND_URL = "http://localhost:8001/api"
+ADMIN_EMAIL = "admin@squiz.com"
+ADMIN_PASSWORD = "admin123"
+
+class PracticeModeTester:
+    def __init__(self):
+        self.admin_token = None
+        self.user_token = None
+        self.quiz_id = None
+        self.question_ids = []
+        self.tests_run = 0
+        self.tests_passed = 0
+
+    def log_test(self, name, success, details=""):
+        self.tests_run += 1
+        if success:
+            self.tests_passed += 1
+        print(f"{'✅ PASS' if success else '❌ FAIL'}: {name}")
+        if details:
+            print(f"   Details: {details}")
+
+    def headers(self, token):
+        return {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+
+    def setup(self):
+        response = requests.post(f"{BACKEND_URL}/auth/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD}, timeout=10)
+        if response.status_code != 200:
+            print(f"❌ Admin login failed: {response.text}")
+            return False
+        self.admin_token = response.json()["access_token"]
+
+        email = f"practice_{uuid.uuid4().hex[:8]}@example.com"
+        requests.post(f"{BACKEND_URL}/auth/register", json={"email": email, "name": "Practice User", "password": "password123"}, timeout=10)
+        response = requests.post(f"{BACKEND_URL}/auth/login", json={"email": email, "password": "password123"}, timeout=10)
+        if response.status_code != 200:
+            print(f"❌ User login failed: {response.text}")
+            return False
+        self.user_token = response.json()["access_token"]
+
+        quiz_data = {
+            "title": "Practice Mode Quiz",
+            "description": "Quiz used for practice mode testing",
+            "category": "Testing",
+            "subject": "Mathematics",
+            "questions": [
+                {
+                    "question_text": "What is 2 + 2?",
+                    "question_type": "multiple_choice",
+                    "options": [{"text": "3", "is_correct": False}, {"text": "4", "is_correct": True}],
+                    "explanation": "Two plus two is four"
+                },
+                {
+                    "question_text": "Name the capital of France",
+                    "question_type": "open_ended",
+                    "open_ended_answer": {"expected_answers": ["Paris"], "keywords": ["paris"]}
+                }
+            ]
+        }
+        response = requests.post(f"{BACKEND_URL}/admin/quiz", json=quiz_data, headers=self.headers(self.admin_token), timeout=10)
+        if response.status_code != 200:
+            print(f"❌ Quiz creation failed: {response.text}")
+            return False
+        quiz = response.json()
+        self.quiz_id = quiz["id"]
+        self.question_ids = [q["id"] for q in quiz["questions"]]
+        return True
+
+    def practice(self, question_id, answer):
+        return requests.post(
+            f"{BACKEND_URL}/quiz/{self.quiz_id}/practice",
+            json={"question_id": question_id, "answer": answer},
+            headers=self.headers(self.user_token),
+            timeout=10
+        )
+
+    def test_draft_rejected(self):
+        response = self.practice(self.question_ids[0], "4")
+        self.log_test("Practice on draft quiz is rejected", response.status_code == 404, f"Status: {response.status_code}")
+
+    def test_grading(self):
+        requests.post(f"{BACKEND_URL}/admin/quiz/{self.quiz_id}/publish", headers=self.headers(self.admin_token), timeout=10)
+
+        response = self.practice(self.question_ids[0], "4")
+        data = response.json() if response.status_code == 200 else {}
+        self.log_test("Correct multiple choice answer", data.get("is_correct") is True and data.get("explanation") == "Two plus two is four", str(data))
+
+        response = self.practice(self.question_ids[0], "3")
+        data = response.json() if response.status_code == 200 else {}
+        self.log_test("Incorrect multiple choice answer", data.get("is_correct") is False and data.get("correct_answer") == "4", str(data))
+
+        response = self.practice(self.question_ids[1], "paris")
+        data = response.json() if response.status_code == 200 else {}
+        self.log_test("Correct open-ended answer", data.get("is_correct") is True, str(data))
+
+    def test_unknown_question(self):
+        response = self.practice(str(uuid.uuid4()), "4")
+        self.log_test("Unknown question returns 404", response.status_code == 404, f"Status: {response.status_code}")
+
+    def test_no_attempt_recorded(self):
+        response = requests.get(f"{BACKEND_URL}/my-attempts", headers=self.headers(self.user_token), timeout=10)
+        attempts = [a for a in response.json() if a["quiz_id"] == self.quiz_id] if response.status_code == 200 else None
+        self.log_test("Practice does not record attempts", attempts == [], f"Attempts: {attempts}")
+
+    def cleanup(self):
+        if self.quiz_id:
+            requests.delete(f"{BACKEND_URL}/admin/quiz/{self.quiz_id}", headers=self.headers(self.admin_token), timeout=10)
+
+    def run_all_tests(self):
+        print("🚀 Starting Practice Mode Tests")
+        if not self.setup():
+            return False
+        try:
+            self.test_draft_rejected()
+            self.test_grading()
+            self.test_unknown_question()
+            self.test_no_attempt_recorded()
+        finally:
+            self.cleanup()
+        print(f"\n📊 Tests passed: {self.tests_passed}/{self.tests_run}")
+        return self.tests_passed == self.tests_run
+
+if __name__ == "__main__":
+    tester = PracticeModeTester()
+    sys.exit(0 if tester.run_all_tests() else 1)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Question Bank Testing for Squiz Platform
+Tests shared questions across quizzes:
+1. Quizzes store questions in the bank and still return them in order
+2. Identical questions created in two quizzes share one bank entry
+3. Editing a bank question is visible in every quiz using it
+4. Referenced bank questions cannot be deleted
+5. Bank imports report duplicates
+"""
+
+import requests
+import sys
+import uuid
+
+BACKEND_URL = "http://localhost:8001/api"
+ADMIN_EMAIL = "admin@squiz.com"
+ADMIN_PASSWORD = "admin123"
+
+class QuestionBankTester:
+    def __init__(self):
+        self.admin_token = None
+        self.quiz_ids = []
+        self.tests_run = 0
+        self.tests_passed = 0
+
+    def log_test(self, name, success, details=""):
+        self.tests_run += 1
+        if success:
+            self.tests_passed += 1
+        print(f"{'✅ PASS' if success else '❌ FAIL'}: {name}")
+        if details:
+            print(f"   Details: {details}")
+
+    def headers(self):
+        return {"Authorization": f"Bearer {self.admin_token}", "Content-Type": "application/json"}
+
+    def setup(self):
+        response = requests.post(f"{BACKEND_URL}/auth/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD}, timeout=10)
+        if response.status_code != 200:
+            print(f"❌ Admin login failed: {response.text}")
+            return False
+        self.admin_token = response.json()["access_token"]
+        return True
+
+    def create_quiz(self, title, questions):
+        quiz_data = {
+            "title": title,
+            "description": "Quiz used for question bank testing",
+            "category": "Testing",
+            "subject": "Mathematics",
+            "questions": questions
+        }
+        response = requests.post(f"{BACKEND_URL}/admin/quiz", json=quiz_data, headers=self.headers(), timeout=10)
+        if response.status_code != 200:
+            return None
+        quiz = response.json()
+        self.quiz_ids.append(quiz["id"])
+        return quiz
+
+    def shared_question(self):
+        return {
+            "question_text": "What is 7 x 6?",
+            "question_type": "multiple_choice",
+            "options": [{"text": "42", "is_correct": True}, {"text": "36", "is_correct": False}]
+        }
+
+    def test_shared_questions(self):
+        first = self.create_quiz("Bank Quiz A", [self.shared_question(), {
+            "question_text": "What is 3 + 4?",
+            "question_type": "multiple_choice",
+            "options": [{"text": "7", "is_correct": True}, {"text": "8", "is_correct": False}]
+        }])
+        second_question = self.shared_question()
+        second_question["question_text"] = "  what is 7 x 6 "
+        second = self.create_quiz("Bank Quiz B", [second_question])
+        if not first or not second:
+            self.log_test("Create bank-backed quizzes", False)
+            return
+
+        self.log_test("Quiz returns its questions in order", [q["question_text"] for q in first["questions"]] == ["What is 7 x 6?", "What is 3 + 4?"])
+        shared_id = first["questions"][0]["id"]
+        self.log_test("Identical questions share a bank entry", second["question_ids"] == [shared_id], str(second["question_ids"]))
+
+        edited = dict(first["questions"][0], question_text="What is 6 x 7?")
+        response = requests.put(f"{BACKEND_URL}/admin/question-bank/{shared_id}", json=edited, headers=self.headers(), timeout=10)
+        self.log_test("Edit bank question", response.status_code == 200, f"Status: {response.status_code}")
+
+        response = requests.get(f"{BACKEND_URL}/admin/quiz/{second['id']}/edit-details", headers=self.headers(), timeout=10)
+        questions = response.json().get("questions", []) if response.status_code == 200 else []
+        self.log_test("Edit is visible in other quizzes", questions and questions[0]["question_text"] == "What is 6 x 7?", str(questions))
+
+        response = requests.delete(f"{BACKEND_URL}/admin/question-bank/{shared_id}", headers=self.headers(), timeout=10)
+        self.log_test("Referenced bank question cannot be deleted", response.status_code == 400, f"Status: {response.status_code}")
+
+    def test_import_duplicates(self):
+        marker = uuid.uuid4().hex[:8]
+        questions = [
+            {"question_text": f"Import check {marker}: is 2 prime?", "question_type": "multiple_choice",
+             "options": [{"text": "Yes", "is_correct": True}, {"text": "No", "is_correct": False}]},
+            {"question_text": f"Import check {marker}: is 9 prime?", "question_type": "multiple_choice",
+             "options": [{"text": "Yes", "is_correct": False}, {"text": "No", "is_correct": True}]}
+        ]
+        payload = {"questions": questions, "subject": "Mathematics"}
+        response = requests.post(f"{BACKEND_URL}/admin/question-bank/import", json=payload, headers=self.headers(), timeout=10)
+        data = response.json() if response.status_code == 200 else {}
+        self.log_test("Import creates one entry per distinct question", data.get("imported") == 2 and data.get("duplicates") == 0, str(data))
+
+        response = requests.post(f"{BACKEND_URL}/admin/question-bank/import", json=payload, headers=self.headers(), timeout=10)
+        data = response.json() if response.status_code == 200 else {}
+        self.log_test("Re-import reports duplicates", data.get("duplicates") == 2, str(data))
+
+    def cleanup(self):
+        for quiz_id in self.quiz_ids:
+            requests.delete(f"{BACKEND_URL}/admin/quiz/{quiz_id}", headers=self.headers(), timeout=10)
+
+    def run_all_tests(self):
+        print("🚀 Starting Question Bank Tests")
+        if not self.setup():
+            return False
+        try:
+            self.test_shared_questions()
+            self.test_import_duplicates()
+        finally:
+            self.cleanup()
+        print(f"\n📊 Tests passed: {self.tests_passed}/{self.tests_run}")
+        return self.tests_passed == self.tests_run
+
+if __name__ == "__main__":
+    tester = QuestionBankTester()
+    sys.exit(0 if tester.run_all_tests() else 1)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Question Ranking Testing for Squiz Platform
+Tests hot scores and pagination cursors, without a running server:
+1. Newer questions outrank older ones with the same points
+2. More points outrank fewer at the same age, logarithmically
+3. Answers and an accepted answer add to the score, downvotes subtract
+4. Hot scores do not depend on the pin flag
+5. Cursors round-trip their sort key, group value and id
+6. Cursors are rejected for a different sort field or direction
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "squiz_test")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import server  # noqa: E402
+
+CREATED_AT = datetime(2025, 3, 1)
+
+def question(**fields):
+    return {"upvotes": 0, "downvotes": 0, "answer_count": 0, "has_accepted_answer": False, "created_at": CREATED_AT, **fields}
+
+class QuestionRankingTester:
+    def __init__(self):
+        self.tests_run = 0
+        self.tests_passed = 0
+
+    def log_test(self, name, success, details=""):
+        self.tests_run += 1
+        if success:
+            self.tests_passed += 1
+        print(f"{'✅ PASS' if success else '❌ FAIL'}: {name}")
+        if details:
+            print(f"   Details: {details}")
+
+    def test_age(self):
+        older = server.question_hot_score(question(upvotes=10))
+        newer = server.question_hot_score(question(upvotes=10, created_at=CREATED_AT + timedelta(days=1)))
+        self.log_test("Newer questions outrank older ones", newer > older, f"Older: {older}, newer: {newer}")
+
+    def test_points(self):
+        scores = [server.question_hot_score(question(upvotes=votes)) for votes in (1, 10, 100)]
+        steps = [scores[1] - scores[0], scores[2] - scores[1]]
+        self.log_test(
+            "Points count logarithmically",
+            scores[0] < scores[1] < scores[2] and abs(steps[0] - 1) < 1e-6 and abs(steps[1] - 1) < 1e-6,
+            f"Scores: {scores}"
+        )
+        # Ten times the votes is worth as much as this much extra age
+        equivalent = server.question_hot_score(question(upvotes=1, created_at=CREATED_AT + timedelta(seconds=server.HOT_SCORE_TIME_UNIT_SECONDS)))
+        self.log_test("Ten times the points equals one time unit", abs(equivalent - scores[1]) < 1e-6, f"{equivalent} vs {scores[1]}")
+
+    def test_answers_and_downvotes(self):
+        base = server.question_hot_score(question(upvotes=2))
+        answered = server.question_hot_score(question(upvotes=2, answer_count=1))
+        accepted = server.question_hot_score(question(upvotes=2, answer_count=1, has_accepted_answer=True))
+        downvoted = server.question_hot_score(question(downvotes=5))
+        self.log_test(
+            "Answers and acceptance raise the score, downvotes lower it",
+            downvoted < base < answered < accepted,
+            f"Downvoted: {downvoted}, base: {base}, answered: {answered}, accepted: {accepted}"
+        )
+
+    def test_pin_independent(self):
+        plain = server.question_hot_score(question(upvotes=3))
+        pinned = server.question_hot_score(question(upvotes=3, is_pinned=True))
+        self.log_test("Pinning does not change the score", plain == pinned, f"Plain: {plain}, pinned: {pinned}")
+
+    def test_cursor_round_trip(self):
+        cursor = server.encode_cursor("created_at", CREATED_AT, "q1")
+        decoded = server.decode_cursor(cursor, "created_at")
+        grouped = server.encode_cursor("is_pinned,hot_score", 1.25, "q2", True, direction=-1)
+        decoded_grouped = server.decode_cursor(grouped, "is_pinned,hot_score", grouped=True)
+        self.log_test(
+            "Cursors round-trip their position",
+            decoded == (CREATED_AT, "q1") and decoded_grouped == (True, 1.25, "q2"),
+            f"Decoded: {decoded}, grouped: {decoded_grouped}"
+        )
+
+    def test_cursor_rejected(self):
+        cursor = server.encode_cursor("upvotes", 3, "q1", direction=-1)
+        rejected = []
+        for sort_field, direction in (("answer_count", -1), ("upvotes", 1)):
+            try:
+                server.decode_cursor(cursor, sort_field, direction=direction)
+            except server.HTTPException as e:
+                rejected.append(e.status_code)
+        try:
+            server.decode_cursor("not-a-cursor", "upvotes")
+        except server.HTTPException as e:
+            rejected.append(e.status_code)
+        self.log_test("Mismatched and malformed cursors are rejected", rejected == [400, 400, 400], f"Statuses: {rejected}")
+
+    def run_all_tests(self):
+        print("🚀 Starting Question Ranking Tests")
+        self.test_age()
+        self.test_points()
+        self.test_answers_and_downvotes()
+        self.test_pin_independent()
+        self.test_cursor_round_trip()
+        self.test_cursor_rejected()
+        print(f"\n📊 Tests passed: {self.tests_passed}/{self.tests_run}")
+        return self.tests_passed == self.tests_run
+
+if __name__ == "__main__":
+    tester = QuestionRankingTester()
+    sys.exit(0 if tester.run_all_tests() else 1)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Related Questions Model Testing for Squiz Platform
+Tests the TF-IDF model behind related questions, without a running server:
+1. Questions on the same topic are each other's nearest neighbours
+2. A question is never its own neighbour
+3. Adding a question whose terms made no built question's strongest terms works
+4. Removed questions are no longer returned as neighbours
+5. Re-adding an edited question replaces its previous version
+"""
+
+import os
+import sys
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "squiz_test")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import server  # noqa: E402
+
+TOPICS = {
+    "python": "python list sort comprehension",
+    "calculus": "calculus derivative integral limit",
+    "chemistry": "chemistry molecule bond electron",
+    "history": "history empire treaty revolution"
+}
+
+def corpus():
+    """Three questions per topic, plus filler so topic terms stay under the document frequency cap"""
+    questions = []
+    for topic, words in TOPICS.items():
+        for i in range(3):
+            questions.append({"id": f"{topic}-{i}", "title": f"{words} {topic}{i}", "content": words, "tags": [topic]})
+    for i in range(12):
+        questions.append({"id": f"filler-{i}", "title": f"filler{i} unique{i}", "content": f"standalone{i}", "tags": []})
+    return questions
+
+class RelatedQuestionsTester:
+    def __init__(self):
+        self.tests_run = 0
+        self.tests_passed = 0
+
+    def log_test(self, name, success, details=""):
+        self.tests_run += 1
+        if success:
+            self.tests_passed += 1
+        print(f"{'✅ PASS' if success else '❌ FAIL'}: {name}")
+        if details:
+            print(f"   Details: {details}")
+
+    def neighbour_ids(self, model, question_id):
+        position = model.positions[question_id]
+        return [item["id"] for item in model.related_items(model.neighbours(model.vectors[position], exclude_position=position))]
+
+    def test_same_topic_neighbours(self):
+        model = server.RelatedQuestionsModel(corpus())
+        neighbours = self.neighbour_ids(model, "python-0")
+        self.log_test(
+            "Same-topic questions are nearest neighbours",
+            set(neighbours[:2]) == {"python-1", "python-2"},
+            f"Neighbours: {neighbours}"
+        )
+        self.log_test("A question is not its own neighbour", "python-0" not in neighbours, f"Neighbours: {neighbours}")
+
+    def test_build_matches_model(self):
+        model, related = server.build_related_questions(corpus())
+        self.log_test(
+            "Build stores neighbours of every question",
+            set(related) == set(model.ids) and {item["id"] for item in related["calculus-1"]} >= {"calculus-0", "calculus-2"},
+            f"calculus-1: {related.get('calculus-1')}"
+        )
+
+    def test_add_with_unposted_term(self):
+        # A question with more terms than are kept leaves some known to the IDF without a posting list
+        long_question = {"id": "long", "title": "glossary", "content": " ".join(f"word{i}" for i in range(40)), "tags": []}
+        model = server.RelatedQuestionsModel(corpus() + [long_question])
+        unposted = [term for term in model.idf if term not in model.postings]
+        question = {"id": "new", "title": "python list sort", "content": " ".join(unposted[:3]), "tags": ["python"]}
+        try:
+            neighbours = model.related_items(model.add(question))
+            success = bool(unposted) and any(item["id"].startswith("python-") for item in neighbours) and "new" in model.positions
+            details = f"Unposted terms: {len(unposted)}, neighbours: {neighbours}"
+        except Exception as e:
+            success, details = False, f"{type(e).__name__}: {e}"
+        self.log_test("Adding a question works for terms without postings", success, details)
+
+    def test_removed_not_returned(self):
+        model = server.RelatedQuestionsModel(corpus())
+        model.remove("python-1")
+        neighbours = self.neighbour_ids(model, "python-0")
+        self.log_test("Removed questions are not neighbours", "python-1" not in neighbours, f"Neighbours: {neighbours}")
+
+    def test_readd_replaces(self):
+        model = server.RelatedQuestionsModel(corpus())
+        model.remove("python-2")
+        model.add({"id": "python-2", "title": f"{TOPICS['chemistry']} edited", "content": TOPICS["chemistry"], "tags": ["chemistry"]})
+        neighbours = self.neighbour_ids(model, "chemistry-0")
+        python_neighbours = self.neighbour_ids(model, "python-0")
+        self.log_test(
+            "Edited question moves to its new topic",
+            "python-2" in neighbours and "python-2" not in python_neighbours and model.ids.count("python-2") == 2,
+            f"Chemistry: {neighbours}, Python: {python_neighbours}"
+        )
+
+    def run_all_tests(self):
+        print("🚀 Starting Related Questions Model Tests")
+        self.test_same_topic_neighbours()
+        self.test_build_matches_model()
+        self.test_add_with_unposted_term()
+        self.test_removed_not_returned()
+        self.test_readd_replaces()
+        print(f"\n📊 Tests passed: {self.tests_passed}/{self.tests_run}")
+        return self.tests_passed == self.tests_run
+
+if __name__ == "__main__":
+    tester = RelatedQuestionsTester()
+    sys.exit(0 if tester.run_all_tests() else 1)
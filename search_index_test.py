@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Search and Autocomplete Index Testing for Squiz Platform
+Tests the in-memory indexes, without a running server:
+1. BM25 search ranks documents with more matching terms first
+2. Re-adding a document replaces it and removing it drops it from results
+3. Restricted documents are only returned to allowed users
+4. Index snapshots restore the same results
+5. Autocomplete matches word prefixes anywhere in a label, ranked by usage
+6. Autocomplete entries disappear once their usage drops to zero
+7. Near-duplicate questions are found by MinHash and removed ones are not
+"""
+
+import os
+import sys
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "squiz_test")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import server  # noqa: E402
+
+class SearchIndexTester:
+    def __init__(self):
+        self.tests_run = 0
+        self.tests_passed = 0
+
+    def log_test(self, name, success, details=""):
+        self.tests_run += 1
+        if success:
+            self.tests_passed += 1
+        print(f"{'✅ PASS' if success else '❌ FAIL'}: {name}")
+        if details:
+            print(f"   Details: {details}")
+
+    def ranked(self, index, query, user_id=None):
+        scores = index.search(query, user_id)
+        return [doc_id for (_, doc_id), _ in sorted(scores.items(), key=lambda item: -item[1])]
+
+    def build_index(self):
+        index = server.SearchIndex()
+        documents = {
+            "derivatives": "derivative rules of calculus",
+            "integrals": "integral calculus techniques",
+            "chemistry": "chemical bonds and molecules",
+            "history": "roman empire history"
+        }
+        for doc_id, text in documents.items():
+            index.add("question", doc_id, [(text, 1.0)], {}, {"title": text})
+        return index
+
+    def test_ranking(self):
+        index = self.build_index()
+        results = self.ranked(index, "calculus derivative")
+        self.log_test("More matching terms rank first", results[:2] == ["derivatives", "integrals"], f"Results: {results}")
+        plural = self.ranked(index, "derivatives")
+        self.log_test("Plural query terms match singular text", plural == ["derivatives"], f"Results: {plural}")
+
+    def test_replace_and_remove(self):
+        index = self.build_index()
+        index.add("question", "history", [("medieval castles", 1.0)], {}, {})
+        replaced = self.ranked(index, "roman") == [] and self.ranked(index, "castles") == ["history"]
+        index.remove("question", "history")
+        self.log_test(
+            "Re-adding replaces and removing drops a document",
+            replaced and self.ranked(index, "castles") == [] and index.type_counts["question"] == 3,
+            f"Counts: {index.type_counts}"
+        )
+
+    def test_allowed_users(self):
+        index = self.build_index()
+        index.add("quiz", "private", [("calculus final exam", 1.0)], {}, {}, allowed_users=["u1"])
+        self.log_test(
+            "Restricted documents only reach allowed users",
+            "private" in self.ranked(index, "exam", "u1") and "private" not in self.ranked(index, "exam", "u2"),
+            f"u1: {self.ranked(index, 'exam', 'u1')}, u2: {self.ranked(index, 'exam', 'u2')}"
+        )
+
+    def test_snapshot(self):
+        index = self.build_index()
+        restored = server.SearchIndex.from_snapshot(index.to_snapshot())
+        self.log_test(
+            "Snapshots restore the same results",
+            index.search("calculus") == restored.search("calculus"),
+            f"Original: {index.search('calculus')}, restored: {restored.search('calculus')}"
+        )
+
+    def test_autocomplete(self):
+        index = server.PrefixIndex()
+        index.adjust("linear", "Linear Algebra", 2)
+        index.adjust("algebra", "Algebra", 5)
+        index.adjust("geometry", "Geometry", 1)
+        labels = [item["label"] for item in index.complete("alg", 10)]
+        self.log_test("Word prefixes match, ranked by usage", labels == ["Algebra", "Linear Algebra"], f"Labels: {labels}")
+        index.adjust("algebra", "Algebra", -5)
+        index.adjust("geometry", "Geometry", -1, source="other")
+        remaining = [item["label"] for item in index.complete("", 10)]
+        self.log_test(
+            "Entries disappear at zero usage",
+            remaining == ["Linear Algebra", "Geometry"] and "algebra" not in index.entries,
+            f"Remaining: {remaining}"
+        )
+
+    def test_duplicates(self):
+        index = server.DuplicateIndex()
+        index.add("q1", "How do I reverse a list in Python", "I want to reverse the order of items in a python list")
+        index.add("q2", "Roman empire trade routes", "Which trade routes did the roman empire rely on")
+        matches = index.similar("How can I reverse a list in Python", "I want to reverse the order of items in a python list", 5)
+        found = [match[0] for match in matches]
+        index.remove("q1")
+        after = index.similar("How can I reverse a list in Python", "I want to reverse the order of items in a python list", 5)
+        self.log_test(
+            "Near duplicates are found and removed ones are not",
+            found == ["q1"] and after == [],
+            f"Matches: {matches}, after removal: {after}"
+        )
+
+    def run_all_tests(self):
+        print("🚀 Starting Search and Autocomplete Index Tests")
+        self.test_ranking()
+        self.test_replace_and_remove()
+        self.test_allowed_users()
+        self.test_snapshot()
+        self.test_autocomplete()
+        self.test_duplicates()
+        print(f"\n📊 Tests passed: {self.tests_passed}/{self.tests_run}")
+        return self.tests_passed == self.tests_run
+
+if __name__ == "__main__":
+    tester = SearchIndexTester()
+    sys.exit(0 if tester.run_all_tests() else 1)